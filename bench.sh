@@ -0,0 +1,4 @@
+for bench in benchmarks/bench_*.py; do
+  echo "== $bench"
+  python3 "$bench"
+done
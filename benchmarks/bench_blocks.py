@@ -0,0 +1,51 @@
+"""
+Block parser benchmark: block type detection and conversion on a paragraph
+only corpus, compared with the detection chain used before tables, nested
+lists and footnotes were added.
+
+Run with: python3 benchmarks/bench_blocks.py
+"""
+from benchutil import best_time, report
+
+from markdown_blocks import ALLOWED_HEADINGS, block_to_block_type, markdown_to_blocks, markdown_to_html_node
+
+PARAGRAPH = ("Here's the deal, **I like Tolkien**. You can spend years studying the legendarium "
+             "and still not understand its depths, see [the blog](/blog/tom) for more.\n"
+             "It can be enjoyed by children and adults alike.")
+PARAGRAPH_COUNT = 20000
+
+
+def legacy_block_to_block_type(block: str) -> str:
+    # Detection chain before the first character dispatch, kept for comparison
+    if block.startswith(ALLOWED_HEADINGS):
+        return "heading"
+    if block.startswith("```") and block.endswith("```"):
+        return "code"
+    if all(line.startswith(">") for line in block.split("\n")):
+        return "quote"
+    if all(line.startswith("- ") for line in block.split("\n")):
+        return "unordered_list"
+    current_number = 1
+    for line in block.split("\n"):
+        if not line.startswith(f"{current_number}. "):
+            return "paragraph"
+        current_number += 1
+    return "ordered_list"
+
+
+def main():
+    blocks = markdown_to_blocks("\n\n".join([PARAGRAPH] * PARAGRAPH_COUNT))
+    markdown = "\n\n".join([PARAGRAPH] * (PARAGRAPH_COUNT // 10))
+
+    legacy = best_time(lambda: [legacy_block_to_block_type(block) for block in blocks])
+    report("detect paragraphs (legacy if chain)", legacy, PARAGRAPH_COUNT, "blocks")
+    current = best_time(lambda: [block_to_block_type(block) for block in blocks])
+    report("detect paragraphs (first character dispatch)", current, PARAGRAPH_COUNT, "blocks")
+    print(f"{'detection speedup':<48} {legacy / current:10.2f} x")
+
+    convert = best_time(lambda: markdown_to_html_node(markdown).to_html(), repeat=3)
+    report("markdown_to_html_node + to_html (paragraphs)", convert, PARAGRAPH_COUNT // 10, "blocks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Escaping benchmark: escape_text with its fast path against html.escape on
+clean and dirty text, and the cost of escaping on rendering a clean page,
+compared with rendering that does not escape at all.
+
+Run with: python3 benchmarks/bench_escape.py
+"""
+import html
+
+from benchutil import best_time, report
+
+import flatir
+from flatir import markdown_to_flat_document
+from htmlnode import escape_text
+
+CLEAN = "Here's the deal, I like Tolkien. You can spend years studying the legendarium. "
+DIRTY = "Compare a < b && b > c in <code>. "
+CALLS = 100_000
+# numbered, so that the texts of the page are distinct as in real content
+PARAGRAPH = ("Here's the deal {0}, **I like Tolkien {0}**. You can spend _{0} years_ studying the `legendarium` "
+             "and still not understand its depths, see [the blog {0}](/blog/tom) for more.")
+PARAGRAPH_COUNT = 5000
+
+
+def main():
+    for name, text in (("clean", CLEAN), ("dirty", DIRTY), ("clean x100", CLEAN * 100)):
+        report(f"escape_text, {name} text ({CALLS} calls)",
+               best_time(lambda: [escape_text(text) for _ in range(CALLS)]))
+        report(f"html.escape, {name} text ({CALLS} calls)",
+               best_time(lambda: [html.escape(text, quote=False) for _ in range(CALLS)]))
+
+    markdown = "\n\n".join(PARAGRAPH.format(i) for i in range(PARAGRAPH_COUNT))
+    document = markdown_to_flat_document(markdown)
+    escaped = best_time(document.to_html)
+    escaped_page = best_time(lambda: markdown_to_flat_document(markdown).to_html())
+    # attribute strings are cached, so only text escaping is left in the render
+    flatir.escape_text = lambda text: text
+    try:
+        unescaped = best_time(document.to_html)
+        unescaped_page = best_time(lambda: markdown_to_flat_document(markdown).to_html())
+    finally:
+        flatir.escape_text = escape_text
+    report("to_html without escaping", unescaped)
+    report("to_html with escaping", escaped)
+    report("parse + to_html without escaping", unescaped_page)
+    report("parse + to_html with escaping", escaped_page)
+    print(f"{'escaping overhead of a page render':<48} {(escaped_page / unescaped_page - 1) * 100:10.1f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Extension benchmark: parsing and rendering a mixed page with no plugins
+loaded, against the parser as it was before the extension registry (fixed
+block detector table, fixed plain text pattern), and with a plugin loaded
+whose syntax the page doesn't use, then does use.
+
+Without plugins the parser must be as fast as before; an unused plugin
+should only cost the lookups of its trigger characters.
+
+Run with: python3 benchmarks/bench_extensions.py
+"""
+from benchutil import best_time, report
+
+import inline_parser
+import markdown_blocks
+from extensions import BlockExtension, InlineRule, registry
+from htmlnode import ParentNode
+from inline_parser import PLAIN_TEXT_PATTERN, InlineParser, parse_inline
+from markdown_blocks import (BLOCK_DETECTORS, BlockScan, detect_table, markdown_to_blocks, markdown_to_html_node,
+                             scan_block, text_to_children)
+from textnode import TextNode, text_node_to_html_node
+
+SECTION = """## Section
+
+Here's the deal, **I like Tolkien**! You can spend _years_ studying the `legendarium`
+and still not understand its depths, see [the blog](/blog/tom) and ![a map](/images/map.png).
+
+- Gandalf
+- Bilbo
+  - Frodo
+
+| Name | Race |
+|------|:----:|
+| Tom | ? |
+
+> All that is gold does not glitter
+
+```
+print("hello")
+```"""
+SECTION_COUNT = 500
+PLUGIN_SECTION = SECTION + "\n\nWas ~~wrong~~ right.\n\n:::note\nA **note**\n:::"
+
+
+class LegacyInlineParser(InlineParser):
+    def parse(self) -> list[TextNode]:
+        text = self.text
+        position = 0
+        while position < len(text):
+            match = PLAIN_TEXT_PATTERN.match(text, position)
+            if match is not None:
+                self._append_text(match.group())
+                position = match.end()
+                continue
+            char = text[position]
+            if char == "\\":
+                position = self._parse_escape(position)
+            elif char == "`":
+                position = self._parse_code_span(position)
+            elif char in "*_":
+                position = self._parse_delimiter_run(position)
+            elif char == "!" and text.startswith("[", position + 1):
+                self._push_bracket(position, True)
+                position += 2
+            elif char == "[":
+                position = self._parse_open_bracket(position)
+            elif char == "]":
+                position = self._parse_close_bracket(position)
+            else:
+                self._append_text(char)
+                position += 1
+
+        self._process_emphasis(None)
+        return inline_parser._merge_text_nodes(self._detach(self.head, None))
+
+
+def legacy_scan_block(block: str) -> BlockScan:
+    scan = BlockScan(block.split("\n"))
+    detector = BLOCK_DETECTORS.get(block[:1])
+    if detector is not None and detector(scan):
+        return scan
+    if detector is not detect_table and len(scan.lines) > 1 and "|" in scan.lines[0] and "-" in scan.lines[1]:
+        detect_table(scan)
+    return scan
+
+
+def legacy_parse_inline(text: str) -> list[TextNode]:
+    return LegacyInlineParser(text).parse()
+
+
+def parse_strikethrough(text: str, position: int) -> tuple[TextNode, int] | None:
+    end = text.find("~~", position + 2) if text.startswith("~~", position) else -1
+    if end == -1:
+        return None
+    return TextNode(text[position + 2:end], STRIKETHROUGH, None, parse_inline(text[position + 2:end])), end + 2
+
+
+STRIKETHROUGH = InlineRule("strikethrough", "~", parse_strikethrough,
+                           lambda node: ParentNode("del", [text_node_to_html_node(child) for child in node.children]))
+NOTE = BlockExtension("note", ":", lambda scan: scan.lines[0] == ":::note" and scan.lines[-1] == ":::",
+                      lambda scan, context: ParentNode("aside", text_to_children(" ".join(scan.lines[1:-1]), context)))
+
+
+def render(markdown: str) -> str:
+    return markdown_to_html_node(markdown).to_html()
+
+
+def legacy_render(markdown: str) -> str:
+    markdown_blocks.scan_block = legacy_scan_block
+    markdown_blocks.parse_inline = legacy_parse_inline
+    try:
+        return markdown_to_html_node(markdown).to_html()
+    finally:
+        markdown_blocks.scan_block = scan_block
+        markdown_blocks.parse_inline = parse_inline
+
+
+def main():
+    markdown = "\n\n".join([SECTION] * SECTION_COUNT)
+    plugin_markdown = "\n\n".join([PLUGIN_SECTION] * SECTION_COUNT)
+    inline_text = " ".join(block.replace("\n", " ") for block in markdown_to_blocks(markdown)
+                           if block[:1] not in "#-|>`")
+    assert render(markdown) == legacy_render(markdown)
+    assert parse_inline(inline_text) == legacy_parse_inline(inline_text)
+
+    results = {
+        "parse_inline, before the registry": best_time(lambda: legacy_parse_inline(inline_text), repeat=7),
+        "parse_inline, no plugins": best_time(lambda: parse_inline(inline_text), repeat=7),
+        "page, before the registry": best_time(lambda: legacy_render(markdown), repeat=7),
+        "page, no plugins": best_time(lambda: render(markdown), repeat=7),
+    }
+    registry.register_inline(STRIKETHROUGH)
+    registry.register_block(NOTE)
+    try:
+        results["parse_inline, unused plugin"] = best_time(lambda: parse_inline(inline_text), repeat=7)
+        results["page, unused plugin"] = best_time(lambda: render(markdown), repeat=7)
+        results["page with plugin syntax, plugin"] = best_time(lambda: render(plugin_markdown), repeat=7)
+    finally:
+        registry.clear()
+
+    for name, seconds in results.items():
+        size = len(inline_text) if name.startswith("parse_inline") else len(markdown)
+        report(name, seconds, size, "chars")
+    for name in ("parse_inline", "page"):
+        ratio = results[f"{name}, no plugins"] / results[f"{name}, before the registry"]
+        print(f"{name + ', no plugins / before':<48} {ratio:9.3f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Document representation benchmark: the HTMLNode tree against the flat event
+stream of flatir, building and rendering a mixed page, and the memory each
+representation holds once built, measured with tracemalloc.
+
+Run with: python3 benchmarks/bench_flatir.py
+"""
+import tracemalloc
+
+from benchutil import best_time, report
+
+from flatir import markdown_to_flat_document
+from markdown_blocks import markdown_to_html_node
+
+SECTION = """## Section
+
+Here's the deal, **I like Tolkien**. You can spend _years_ studying the `legendarium`
+and still not understand its depths, see [the blog](/blog/tom) for more.
+
+- Gandalf
+- Bilbo
+  - Frodo
+
+| Name | Race |
+|------|:----:|
+| Tom | ? |
+
+> All that is gold does not glitter
+
+```
+print("hello")
+```"""
+SECTION_COUNT = 500
+
+
+def retained_bytes(build, markdown: str) -> int:
+    tracemalloc.start()
+    document = build(markdown)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del document
+    return size
+
+
+def main():
+    markdown = "\n\n".join([SECTION] * SECTION_COUNT)
+    for name, build in (("HTMLNode tree", markdown_to_html_node), ("flat event stream", markdown_to_flat_document)):
+        report(f"{name}: build", best_time(lambda: build(markdown)), len(markdown), "chars")
+        document = build(markdown)
+        report(f"{name}: to_html", best_time(document.to_html), len(markdown), "chars")
+        report(f"{name}: build + to_html", best_time(lambda: build(markdown).to_html()), len(markdown), "chars")
+        print(f"{name + ': retained memory':<48} {retained_bytes(build, markdown) / 1024:10.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
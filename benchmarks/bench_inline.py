@@ -0,0 +1,38 @@
+"""
+Inline parser benchmark: the flat text_to_textnodes splitter against the
+nesting parse_inline on regular paragraphs, plus parse_inline on
+pathological inputs that must stay linear.
+
+Run with: python3 benchmarks/bench_inline.py
+"""
+from benchutil import best_time, report
+
+from inline_parser import parse_inline
+from node_splitter import text_to_textnodes
+
+PARAGRAPH = ("Here's the deal, **I like Tolkien**. You can spend _years_ studying the `legendarium` "
+             "and still not understand its depths, see [the blog](/blog/tom) for more. ")
+PARAGRAPH_COUNT = 2000
+PATHOLOGICAL = {
+    "unmatched *": "*",
+    "alternating *a": "*a",
+    "unmatched `": "` ``",
+    "unmatched [a](": "[a](",
+}
+
+
+def main():
+    text = PARAGRAPH * PARAGRAPH_COUNT
+    report("text_to_textnodes (flat splitter)", best_time(lambda: text_to_textnodes(text)),
+           len(text), "chars")
+    report("parse_inline", best_time(lambda: parse_inline(text)), len(text), "chars")
+
+    for name, unit in PATHOLOGICAL.items():
+        for count in (10000, 40000):
+            pathological = unit * count
+            report(f"parse_inline {name} x {count}", best_time(lambda: parse_inline(pathological), repeat=3),
+                   len(pathological), "chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Memory benchmark: peak memory of rendering a large page in memory and
+writing it, against streaming it into its file, measured with tracemalloc,
+and the time both take.
+
+Run with: python3 benchmarks/bench_memory.py
+"""
+import os
+import tempfile
+import tracemalloc
+
+from benchutil import best_time, report
+
+from gencontent import render_page, save_file_to_directory, stream_page
+
+PARAGRAPH = ("Paragraph {0} about **Tom Bombadil** and _Goldberry_, see [the blog](/blog/tom) and "
+             "![Tom](/images/tom.png) for `more`.")
+PARAGRAPH_COUNT = 20_000
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" rel="stylesheet" /><article>{{ Content }}</article>'
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    markdown = "# Big page\n\n" + "\n\n".join(PARAGRAPH.format(i) for i in range(PARAGRAPH_COUNT))
+    source_size = len(markdown.encode("utf-8"))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        dest_path = os.path.join(temp_dir, "index.html")
+
+        def in_memory():
+            save_file_to_directory(render_page("/", "big.md", markdown, TEMPLATE)[1], dest_path)
+
+        def streamed():
+            stream_page("/", "big.md", markdown, TEMPLATE, dest_path)
+
+        print(f"{'source':<48} {source_size / 2 ** 20:10.1f} MB")
+        for name, func in (("in memory", in_memory), ("streamed", streamed)):
+            peak = peak_memory(func)
+            print(f"{'peak memory, ' + name:<48} {peak / 2 ** 20:10.1f} MB  ({peak / source_size:.1f}x the source)")
+        for name, func in (("in memory", in_memory), ("streamed", streamed)):
+            report(f"render and write, {name}", best_time(func, repeat=3), source_size, "bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Metadata benchmark: reading the titles and front matter of a large site
+without rendering it, cold (every page read) and warm (pages looked up in
+the metadata cache by mtime and size), next to the site scan alone.
+
+Run with: python3 benchmarks/bench_metadata.py
+"""
+import io
+import os
+import tempfile
+
+from benchutil import best_time, report
+
+import buildlog
+from buildlog import log
+from metadata import MetadataCache, scan_metadata
+from sitescan import scan_dir
+
+PAGES = 50_000
+PAGES_PER_DIR = 500
+PAGE = "---\ntitle: \"Page {0}\"\ndate: 2024-01-01\ntags: tolkien, lore\n---\n# Page {0}\n\n" + \
+       "Some **bold** and _italic_ text with `code`.\n\n" * 10
+
+
+def write_corpus(content_dir: str):
+    for i in range(PAGES):
+        page_dir = os.path.join(content_dir, f"dir{i // PAGES_PER_DIR:03}")
+        if i % PAGES_PER_DIR == 0:
+            os.makedirs(page_dir)
+        with open(os.path.join(page_dir, f"page{i:05}.md"), "w") as file:
+            file.write(PAGE.format(i))
+
+
+def main():
+    log.configure(buildlog.ERROR, stream=io.StringIO())
+    with tempfile.TemporaryDirectory() as temp_dir:
+        content_dir = os.path.join(temp_dir, "content")
+        write_corpus(content_dir)
+        cache_path = os.path.join(temp_dir, "metadata.json")
+
+        report(f"scan_dir ({PAGES} pages)", best_time(lambda: scan_dir(content_dir)), PAGES, "pages")
+        report(f"metadata, no cache ({PAGES} pages)",
+               best_time(lambda: scan_metadata(scan_dir(content_dir)), repeat=3), PAGES, "pages")
+
+        def cold():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            cache = MetadataCache(cache_path)
+            scan_metadata(scan_dir(content_dir), cache)
+            cache.save()
+
+        def warm():
+            cache = MetadataCache(cache_path)
+            scan_metadata(scan_dir(content_dir), cache)
+            cache.save()
+
+        report(f"metadata, cold cache ({PAGES} pages)", best_time(cold, repeat=3), PAGES, "pages")
+        cold()
+        report(f"metadata, warm cache ({PAGES} pages)", best_time(warm), PAGES, "pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Attribute and tag fragment benchmark: rendering a link-dense page, where
+every paragraph repeats the same navigation links, with the cached
+attribute strings and tag fragments against serializing them every time,
+as FlatDocument.to_html and the HTMLNode tree did before.
+
+Run with: python3 benchmarks/bench_props.py
+"""
+from benchutil import best_time, report
+
+import htmlnode
+from flatir import CLOSE, NONE, TEXT, FlatDocument, markdown_to_flat_document
+from htmlnode import escape_attribute, escape_text
+from markdown_blocks import markdown_to_html_node
+
+NAVIGATION = ("[Home](/) | [Blog](/blog) | [About](/about) | [Contact](/contact) | **{0}** `v{0}` "
+              "[Tom](/blog/tom) _and_ [Glorfindel](/blog/glorfindel)")
+PARAGRAPH_COUNT = 3000
+
+
+def legacy_flat_to_html(document: FlatDocument) -> str:
+    strings = document.strings
+    escaped = [escape_text(string) for string in strings]
+    props = document.props
+    parts = []
+    append = parts.append
+    for op, tag, value in zip(document.ops, document.tags, document.values):
+        if op == TEXT:
+            append(escaped[value])
+        elif op == CLOSE:
+            append(f"</{strings[tag]}>")
+        elif value == NONE:
+            append(f"<{strings[tag]}>")
+        else:
+            attributes = "".join(f' {key}="{escape_attribute(attribute)}"' for key, attribute in props[value].items())
+            append(f"<{strings[tag]}{attributes}>")
+    return "".join(parts)
+
+
+def uncached_props_to_html(props: dict[str, str]) -> str:
+    html_props = ""
+    for key, value in props.items():
+        html_props += f" {key}=\"{escape_attribute(value)}\""
+    return html_props
+
+
+def uncached_tag_fragments(tag: str) -> tuple[str, str]:
+    return f"<{tag}>", f"</{tag}>"
+
+
+def main():
+    markdown = "\n\n".join(NAVIGATION.format(i) for i in range(PARAGRAPH_COUNT))
+    document = markdown_to_flat_document(markdown)
+    tree = markdown_to_html_node(markdown)
+    expected = tree.to_html()
+    assert document.to_html() == legacy_flat_to_html(document) == expected
+
+    uncached_flat = best_time(lambda: legacy_flat_to_html(document))
+    cached_flat = best_time(document.to_html)
+    cached_tree = best_time(tree.to_html)
+    originals = (htmlnode.props_to_html, htmlnode.tag_fragments)
+    htmlnode.props_to_html, htmlnode.tag_fragments = uncached_props_to_html, uncached_tag_fragments
+    try:
+        assert tree.to_html() == expected
+        uncached_tree = best_time(tree.to_html)
+    finally:
+        htmlnode.props_to_html, htmlnode.tag_fragments = originals
+
+    size = len(expected.encode("utf-8"))
+    report("FlatDocument.to_html, serializing every tag", uncached_flat, size, "bytes")
+    report("FlatDocument.to_html, cached", cached_flat, size, "bytes")
+    report("HTMLNode tree to_html, serializing every tag", uncached_tree, size, "bytes")
+    report("HTMLNode tree to_html, cached", cached_tree, size, "bytes")
+    print(f"{'speedup, flat / tree':<48} {uncached_flat / cached_flat:9.2f}x / {uncached_tree / cached_tree:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
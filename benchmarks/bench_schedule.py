@@ -0,0 +1,84 @@
+"""
+Scheduling benchmark: makespan of a page pool on a skewed corpus, a few
+huge pages that come last in source order among many small ones, with
+pages submitted in source order (FIFO) or longest first (LPT).
+
+The makespan of JOBS workers is simulated from the measured render time of
+every page, and measured on a real pool when the machine has several CPUs.
+
+Run with: python3 benchmarks/bench_schedule.py
+"""
+import heapq
+import io
+import os
+import tempfile
+import time
+
+from benchutil import report
+
+import buildlog
+from buildlog import log
+from gencontent import generate_pages_parallel
+from schedule import PageScheduler, RenderTimes
+
+JOBS = 4
+SMALL_PAGES = 60
+HUGE_PAGES = 3
+PARAGRAPH = "Some **bold** and _italic_ text with `code` and a [link](/blog/tom).\n\n"
+
+
+class FifoScheduler(PageScheduler):
+    def order(self, pages: list[tuple[str, int]]) -> list[int]:
+        return list(range(len(pages)))
+
+
+def simulate_makespan(costs: list[float], workers: int) -> float:
+    """
+    Makespan of running the costs in order, each on the first free worker.
+    """
+    free_at = [0.0] * workers
+    for cost in costs:
+        heapq.heapreplace(free_at, free_at[0] + cost)
+    return max(free_at)
+
+
+def write_corpus(content_dir: str) -> list[tuple[str, str]]:
+    pages = []
+    for i in range(SMALL_PAGES + HUGE_PAGES):
+        paragraphs = 2000 if i >= SMALL_PAGES else 20
+        source_path = os.path.join(content_dir, f"page{i:03}.md")
+        with open(source_path, "w") as file:
+            file.write(f"# Page {i}\n\n" + PARAGRAPH * paragraphs)
+        pages.append((source_path, os.path.join(content_dir, f"page{i:03}.html")))
+    return pages
+
+
+def main():
+    log.configure(buildlog.ERROR, stream=io.StringIO())
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pages = write_corpus(temp_dir)
+        template_path = os.path.join(temp_dir, "template.html")
+        with open(template_path, "w") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+
+        render_times = RenderTimes(os.path.join(temp_dir, "render-times.json"))
+        generate_pages_parallel("/", pages, template_path, jobs=2, scheduler=PageScheduler(render_times))
+        costs = [render_times.get(source_path)[0] for source_path, _ in pages]
+        for name, ordered in (("FIFO", costs), ("LPT", sorted(costs, reverse=True))):
+            report(f"simulated makespan {name} ({JOBS} workers, {len(pages)} pages)", simulate_makespan(ordered, JOBS))
+
+        jobs = min(JOBS, os.cpu_count() or 1)
+        if jobs < 2:
+            print("build makespan skipped, it needs several CPUs")
+            return
+        for name, scheduler in (("FIFO", FifoScheduler()), ("LPT", PageScheduler(render_times))):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                generate_pages_parallel("/", pages, template_path, jobs=jobs, scheduler=scheduler)
+                best = min(best, time.perf_counter() - start)
+            report(f"build makespan {name} ({jobs} jobs, {len(pages)} pages)", best)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+CLI startup benchmark: wall time of trivial main.py commands, and the
+modules they import, measured with `python -X importtime`. Commands that
+don't build should stay in the tens of milliseconds.
+
+Run with: python3 benchmarks/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+
+from benchutil import best_time, report
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+COMMANDS = (
+    ["--help"],
+    ["list-pages"],
+    ["clean", "--help"],
+    ["build", "--help"],
+)
+
+
+def run(args: list[str], *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *options, "src/main.py", *args], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+
+def slowest_imports(args: list[str], count: int = 3) -> list[tuple[str, int]]:
+    """
+    Returns the top level imports with the largest cumulative time, in microseconds.
+    """
+    imports = []
+    for line in run(args, "-X", "importtime").stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested imports are indented
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, package = line.split("|")
+        if cumulative.strip().isdigit() and not package.startswith("  "):
+            imports.append((package.strip(), int(cumulative)))
+    return sorted(imports, key=lambda item: -item[1])[:count]
+
+
+def main():
+    report("python -c pass", best_time(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True)))
+    for args in COMMANDS:
+        command = "main.py " + " ".join(args)
+        report(command, best_time(lambda: run(args)))
+        for package, microseconds in slowest_imports(args):
+            print(f"    import {package:<40} {microseconds / 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def best_time(func, number: int = 1, repeat: int = 5) -> float:
+    """
+    Returns the best time in seconds of `number` calls to func over `repeat` runs.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def report(name: str, seconds: float, unit_count: int = None, unit: str = None):
+    line = f"{name:<48} {seconds * 1000:10.3f} ms"
+    if unit_count:
+        line += f"  ({unit_count / seconds:,.0f} {unit}/s)"
+    print(line)
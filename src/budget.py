@@ -0,0 +1,102 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+SKIP = "skip"
+FAIL = "fail"
+POLICIES = (SKIP, FAIL)
+
+
+class PageBudgetExceeded(Exception):
+    """
+    Raised when a page goes over one of the limits of its PageBudget.
+    """
+
+    def __init__(self, path: str, limit: str, message: str):
+        super().__init__(path, limit, message)
+        self.path = path
+        self.limit = limit
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class PageBudget:
+    """
+    Per-page limits on source size, render time and output size.
+
+    The render time is enforced by a watchdog: a SIGALRM timer interrupts the
+    page when it runs over, in the main thread of the build or of a pool
+    worker. Where no timer is available (other threads, Windows) the time is
+    checked once the page is rendered, so it is still reported and skipped.
+    A signal handler only runs between bytecodes, so a page stuck in C code,
+    e.g. a backtracking regular expression, isn't interrupted; in a pool the
+    build process then terminates the worker, see generate_pages_parallel.
+
+    Args:
+        max_source_bytes (int): Largest accepted Markdown source, None for no limit
+        max_render_seconds (float): Longest accepted render time, None for no limit
+        max_output_bytes (int): Largest accepted HTML page, None for no limit
+        policy (str): SKIP to report offending pages and go on, FAIL to stop the build
+    """
+
+    def __init__(self, max_source_bytes: int = None, max_render_seconds: float = None,
+                 max_output_bytes: int = None, policy: str = SKIP):
+        if policy not in POLICIES:
+            raise ValueError(f"invalid budget policy: {policy}")
+        self.max_source_bytes = max_source_bytes
+        self.max_render_seconds = max_render_seconds
+        self.max_output_bytes = max_output_bytes
+        self.policy = policy
+
+    @property
+    def fail(self) -> bool:
+        return self.policy == FAIL
+
+    def check_source(self, path: str, markdown: str):
+        size = len(markdown.encode("utf-8"))
+        if self.max_source_bytes is not None and size > self.max_source_bytes:
+            raise PageBudgetExceeded(path, "source_size",
+                                     f"{path} is {size} bytes, over the limit of {self.max_source_bytes} bytes")
+
+    def check_output(self, path: str, html: str):
+        self.check_output_size(path, len(html.encode("utf-8")))
+
+    def check_output_size(self, path: str, size: int):
+        if self.max_output_bytes is not None and size > self.max_output_bytes:
+            raise PageBudgetExceeded(path, "output_size",
+                                     f"{path} renders to {size} bytes, over the limit of {self.max_output_bytes} bytes")
+
+    def render_time_exceeded(self, path: str) -> PageBudgetExceeded:
+        return PageBudgetExceeded(path, "render_time",
+                                  f"{path} took more than {self.max_render_seconds}s to render")
+
+    @contextmanager
+    def watchdog(self, path: str):
+        """
+        Context manager raising PageBudgetExceeded when its body runs longer
+        than max_render_seconds.
+        """
+        seconds = self.max_render_seconds
+        if seconds is None:
+            yield
+            return
+        if not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+            start = time.perf_counter()
+            yield
+            if time.perf_counter() - start > seconds:
+                raise self.render_time_exceeded(path)
+            return
+
+        def on_timeout(signum, frame):
+            raise self.render_time_exceeded(path)
+
+        previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
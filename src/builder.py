@@ -0,0 +1,209 @@
+import os
+import shutil
+
+from budget import PageBudget
+from buildlog import log
+from buildmanifest import OutputHashes, output_key, write_build_manifest
+from compress import Precompressor
+from copystatic import copy_static_to_public
+from extensions import registry
+from gencontent import generate_pages
+from highlight import load_highlight_cache, save_highlight_cache
+from images import process_images, register_images
+from memory import MemoryBudget
+from metadata import MetadataCache, PageMetadata, scan_metadata
+from schedule import PageScheduler, RenderTimes
+from search import SearchIndex
+from shard import Shard, write_shard_manifest
+from sitescan import SiteScan, page_destinations, page_url, scan_site
+
+# Compressed siblings written next to an output file by the Precompressor
+OUTPUT_SUFFIXES = ("", ".gz", ".br")
+
+
+def file_state(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def remove_output(path: str):
+    for suffix in OUTPUT_SUFFIXES:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    log.info("output_removed", "Removed {path}", path=path)
+
+
+class SiteBuilder:
+    """
+    Builds the site and remembers what it built, so that repeated builds with
+    the same builder (see daemon.py) only redo the work whose inputs changed.
+
+    The first build starts from an empty public directory. Later builds copy
+    the static files again only when one of them changed, and render only
+    the pages whose source changed; every page depends on the template, the
+    build options and the processed images, so a change to any of those
+    renders all pages, as does loading a plugin. Outputs of deleted sources
+    are removed.
+
+    With a shard only that shard's pages are built, and a shard.json manifest
+    is written next to the output for shard.merge_shards.
+
+    Before any page is rendered, the metadata of all pages is read, see
+    metadata.scan_metadata, into page_metadata for site-wide structures.
+
+    Every build ends by writing build-manifest.json, the hash, size and
+    source of each output file, see buildmanifest.py.
+
+    Args:
+        static_dir (str): Directory with the static files
+        public_dir (str): Output directory
+        content_dir (str): Directory with the Markdown pages
+        template_path (str): Page template
+        cache_dir (str): Directory for the image, compression, highlight and search caches
+        shard (Shard): Shard of the pages to build, None for all pages
+    """
+
+    def __init__(self, static_dir: str, public_dir: str, content_dir: str, template_path: str, cache_dir: str,
+                 shard: Shard = None):
+        self.static_dir = static_dir
+        self.public_dir = public_dir
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.cache_dir = cache_dir
+        self.shard = shard
+        self.highlight_cache_path = os.path.join(cache_dir, "highlight.json")
+        self.render_times = RenderTimes(os.path.join(cache_dir, "render-times.json"))
+        self.metadata_cache = MetadataCache(os.path.join(cache_dir, "metadata.json"))
+        self.page_metadata: dict[str, PageMetadata] = {}
+        self.options = None
+        self.template_state = None
+        self.static_state: dict[str, tuple[int, int]] | None = None
+        self.image_manifest = None
+        self.page_state: dict[str, tuple[int, int]] = {}
+        self.page_dests: dict[str, str] = {}
+        self.search_index = None
+        self.search_index_changed = False
+        self.output_hashes = OutputHashes()
+
+    def build(self, basepath: str = "/", minify: bool = False, budget: PageBudget = None, jobs: int = 1,
+              memory: MemoryBudget = None, plugins: list[str] = ()):
+        """
+        Builds the site, incrementally after the first build.
+
+        With a memory budget, the workers and pages in flight of the page
+        generation are picked to stay under it, see gencontent.generate_pages.
+        The extension registry is set to the plugins before anything is built,
+        see extensions.ExtensionRegistry.use_plugins.
+
+        Raises:
+            PageBudgetExceeded: If a page goes over its budget with the fail policy
+            PluginError: If a plugin can't be loaded
+        """
+        registry.use_plugins(plugins)
+        if self.options is None or not os.path.isdir(self.public_dir):
+            # first build, or the output was deleted behind our back
+            self._clean()
+        options = (basepath, minify, self._budget_limits(budget), tuple(registry.plugins))
+        if options != self.options:
+            self.static_state = None
+            self.page_state.clear()
+            self.search_index = SearchIndex(self.public_dir, os.path.join(self.cache_dir, "search.json"), basepath)
+            self.search_index_changed = True
+        self.options = options
+
+        with Precompressor(os.path.join(self.cache_dir, "compressed")) as compressor:
+            scan = scan_site(self.content_dir, self.static_dir)
+            # every page, also with a shard, so that the structures cover the whole site
+            self.page_metadata = scan_metadata(scan.pages, self.metadata_cache)
+            self.metadata_cache.save()
+            self._build_static(compressor, scan, minify)
+            template_state = file_state(self.template_path)
+            if template_state != self.template_state:
+                self.page_state.clear()
+                self.template_state = template_state
+            self._build_pages(compressor, scan, basepath, minify, budget, jobs, memory)
+            if self.search_index_changed:
+                self.search_index.write(compressor)
+                self.search_index_changed = False
+            if self.shard is not None:
+                pages = {page_url(dest_path, self.public_dir): source_path
+                         for source_path, dest_path in self.page_dests.items() if source_path in self.page_state}
+                write_shard_manifest(self.public_dir, self.shard, basepath, pages, self.search_index)
+        # after the compressor is closed, so that the sidecars are complete
+        write_build_manifest(self.public_dir, self._output_sources(scan), self.output_hashes)
+        save_highlight_cache(self.highlight_cache_path)
+
+    def _output_sources(self, scan: SiteScan) -> dict[str, str]:
+        """
+        Returns the source of the static files, image variants and pages, keyed
+        by their buildmanifest.output_key.
+        """
+        sources = {output_key(file.rel_path): file.path for file in scan.static}
+        for url, entry in (self.image_manifest or {}).items():
+            rel_dir = url[1:].rpartition("/")[0]
+            for file_name, _ in entry["variants"]:
+                sources[f"{rel_dir}/{file_name}" if rel_dir else file_name] = sources.get(url[1:])
+        for source_path, dest_path in self.page_dests.items():
+            sources[output_key(os.path.relpath(dest_path, self.public_dir))] = source_path
+        return sources
+
+    def _clean(self):
+        if os.path.exists(self.public_dir):
+            shutil.rmtree(self.public_dir)
+            log.info("output_cleaned", "Deleted {path} folder", path=self.public_dir)
+        self.options = None
+        self.template_state = None
+        self.static_state = None
+        self.image_manifest = None
+        self.page_state.clear()
+        self.page_dests.clear()
+        load_highlight_cache(self.highlight_cache_path)
+
+    @staticmethod
+    def _budget_limits(budget: PageBudget | None) -> tuple | None:
+        if budget is None:
+            return None
+        return budget.max_source_bytes, budget.max_render_seconds, budget.max_output_bytes
+
+    def _build_static(self, compressor: Precompressor, scan: SiteScan, minify: bool):
+        static_state = {file.rel_path: file.state for file in scan.static}
+        if static_state == self.static_state:
+            return
+        for rel_path in (self.static_state or {}).keys() - static_state.keys():
+            remove_output(os.path.join(self.public_dir, rel_path))
+        copy_static_to_public(self.static_dir, self.public_dir, compressor, minify, scan.static)
+        image_manifest = process_images(self.static_dir, self.public_dir, os.path.join(self.cache_dir, "images"),
+                                        files=scan.static)
+        if image_manifest != self.image_manifest:
+            register_images(image_manifest)
+            self.image_manifest = image_manifest
+            self.page_state.clear()
+        self.static_state = static_state
+
+    def _build_pages(self, compressor: Precompressor, scan: SiteScan, basepath: str, minify: bool,
+                     budget: PageBudget, jobs: int, memory: MemoryBudget = None):
+        files = scan.pages if self.shard is None else self.shard.select(scan.pages)
+        pages = page_destinations(files, self.public_dir)
+        sources = {file.path: file.state for file in files}
+        for source_path in self.page_dests.keys() - sources.keys():
+            dest_path = self.page_dests[source_path]
+            remove_output(dest_path)
+            self.search_index.remove_page(self.search_index.page_url(dest_path))
+            self.search_index_changed = True
+            self.page_state.pop(source_path, None)
+        self.page_dests = dict(pages)
+
+        changed = [(source_path, dest_path) for source_path, dest_path in pages
+                   if self.page_state.get(source_path) != sources[source_path]]
+        log.info("pages_changed", "Generating {changed} of {pages} pages",
+                 changed=len(changed), pages=len(pages))
+        for source_path, _ in changed:
+            self.page_state.pop(source_path, None)
+        self.search_index_changed |= bool(changed)
+        written = generate_pages(basepath, changed, self.template_path, compressor, minify, self.search_index,
+                                 budget, jobs, PageScheduler(self.render_times), memory)
+        for source_path in written:
+            self.page_state[source_path] = sources[source_path]
+        if changed:
+            self.render_times.retain(sources)
+            self.render_times.save()
@@ -0,0 +1,104 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+PROGRESS_INTERVAL = 0.1
+
+
+class BuildLog:
+    """
+    Structured build event log shared by all build stages.
+
+    Every event has a name (e.g. "page_generated") and keyword fields. Events
+    at or above the configured level are printed as their message, a
+    str.format template over the fields (e.g. "Copied {source}") formatted
+    only once the event is printed, so callers pass the fields rather than
+    formatting the message themselves. Every event
+    is counted for the progress line and the final summary, and when an event
+    log file is configured every event is appended to it as one JSON line.
+    Events below the level with no event log cost a counter increment only.
+    """
+
+    def __init__(self):
+        self.level = INFO
+        self.stream = sys.stdout
+        self.progress = False
+        self.counts = Counter()
+        self._event_log = None
+        self._last_progress = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, level: int = INFO, stream=None, event_log_path: str = None, progress: bool = False):
+        """
+        Args:
+            level (int): Minimum level of events printed to the stream
+            stream: Text stream for printed events, defaults to stdout
+            event_log_path (str): Optional path of a JSON-lines event log
+            progress (bool): Show a running event counter on interactive streams
+        """
+        self.close()
+        self.level = level
+        self.stream = stream if stream is not None else sys.stdout
+        self.progress = progress and self.stream.isatty()
+        self.counts = Counter()
+        if event_log_path is not None:
+            self._event_log = open(event_log_path, "w", encoding="utf-8")
+
+    def event(self, name: str, message: str = None, level: int = INFO, **fields):
+        self.counts[name] += 1
+        if self._event_log is not None:
+            record = {"time": round(time.time(), 6), "level": LEVEL_NAMES[level], "event": name, **fields}
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock:
+                self._event_log.write(line)
+        if level >= self.level and message is not None:
+            self._clear_progress()
+            print(message.format_map(fields), file=self.stream)
+        elif self.progress:
+            self._show_progress()
+
+    def debug(self, name: str, message: str = None, **fields):
+        self.event(name, message, DEBUG, **fields)
+
+    def info(self, name: str, message: str = None, **fields):
+        self.event(name, message, INFO, **fields)
+
+    def warning(self, name: str, message: str = None, **fields):
+        self.event(name, message, WARNING, **fields)
+
+    def error(self, name: str, message: str = None, **fields):
+        self.event(name, message, ERROR, **fields)
+
+    def _show_progress(self):
+        now = time.monotonic()
+        if now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.stream.write(f"\r{self.summary()}")
+        self.stream.flush()
+
+    def _clear_progress(self):
+        if self._last_progress:
+            self.stream.write("\r\033[K")
+            self._last_progress = 0.0
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}: {count}" for name, count in sorted(self.counts.items()))
+
+    def close(self):
+        if self.progress:
+            self._clear_progress()
+        if self._event_log is not None:
+            self._event_log.close()
+            self._event_log = None
+
+
+log = BuildLog()
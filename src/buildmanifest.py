@@ -0,0 +1,90 @@
+import json
+import os
+
+from images import file_digest
+from sitescan import scan_dir
+
+MANIFEST_FILE_NAME = "build-manifest.json"
+MANIFEST_VERSION = 1
+
+# Compressed siblings of an output file, they come from the source of that file
+SIDECAR_SUFFIXES = (".gz", ".br")
+
+
+def output_key(rel_path: str) -> str:
+    # "/" separated, so manifests compare equal across platforms
+    return rel_path.replace(os.sep, "/")
+
+
+class OutputHashes:
+    """
+    Content hashes of the output files, kept by (mtime, size) so that a
+    long running builder (see daemon.py) only hashes the files a build
+    rewrote.
+    """
+
+    def __init__(self):
+        self.entries: dict[str, tuple[tuple[int, int], str]] = {}
+
+    def digest(self, path: str, state: tuple[int, int]) -> str:
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != state:
+            entry = self.entries[path] = (state, file_digest(path))
+        return entry[1]
+
+    def retain(self, paths):
+        self.entries = {path: self.entries[path] for path in paths if path in self.entries}
+
+
+def build_manifest(public_dir: str, sources: dict[str, str], hashes: OutputHashes = None) -> dict:
+    """
+    Lists every file below public_dir with its SHA-256, size and source.
+
+    Args:
+        public_dir (str): Output directory of a build
+        sources (dict[str, str]): Source path of the outputs, keyed by output_key of their relative path;
+            outputs without an entry, e.g. the search index, get None
+        hashes (OutputHashes): Hashes of earlier builds to reuse, None to hash every file
+
+    Returns:
+        dict: The manifest, files sorted by path
+    """
+    hashes = hashes if hashes is not None else OutputHashes()
+    outputs = scan_dir(public_dir)
+    files = {}
+    for file in outputs:
+        key = output_key(file.rel_path)
+        if key == MANIFEST_FILE_NAME:
+            continue
+        source = sources.get(key)
+        if source is None and key.endswith(SIDECAR_SUFFIXES):
+            source = sources.get(os.path.splitext(key)[0])
+        files[key] = {"hash": hashes.digest(file.path, file.state), "size": file.size,
+                      "source": None if source is None else output_key(source)}
+    hashes.retain(file.path for file in outputs)
+    return {"version": MANIFEST_VERSION, "files": files}
+
+
+def write_build_manifest(public_dir: str, sources: dict[str, str], hashes: OutputHashes = None) -> dict:
+    """
+    Writes the build_manifest of public_dir to its build-manifest.json.
+
+    The file depends only on the content of the outputs, two builds of the
+    same sources write identical manifests, so a deploy can compare the
+    manifest of a build with the deployed one to find the changed files.
+    """
+    manifest = build_manifest(public_dir, sources, hashes)
+    with open(os.path.join(public_dir, MANIFEST_FILE_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+        file.write("\n")
+    return manifest
+
+
+def load_build_manifest(path: str) -> dict:
+    """
+    Reads a build manifest, path is the file or the output directory holding it.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_FILE_NAME)
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
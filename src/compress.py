@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, without it only .gz sidecars are written
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".xml", ".txt")
+
+
+def gzip_compress(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def available_encoders() -> list[tuple[str, object]]:
+    encoders = [(".gz", gzip_compress)]
+    if brotli is not None:
+        encoders.append((".br", brotli_compress))
+    return encoders
+
+
+def is_compressible(file_path: str) -> bool:
+    return str(file_path).lower().endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+class Precompressor:
+    """
+    Writes precompressed .gz (and .br) sidecars next to output files.
+
+    Compression runs in a thread pool (zlib and brotli release the GIL), so
+    sidecars are produced while the build keeps generating pages. Compressed
+    blobs are cached by content hash, unchanged files are only copied.
+
+    Usage:
+        with Precompressor(".cache/compressed") as compressor:
+            compressor.submit("docs/index.html", html_bytes)
+    """
+
+    def __init__(self, cache_dir: str, workers: int = None):
+        self.cache_dir = cache_dir
+        self.encoders = available_encoders()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def submit(self, file_path: str, data: bytes = None):
+        """
+        Schedules sidecars for file_path, data is read from the file when not given.
+        Files that are not text assets are ignored.
+        """
+        if not is_compressible(file_path):
+            return
+        self._futures.append(self._executor.submit(self._write_sidecars, str(file_path), data))
+
+    def _write_sidecars(self, file_path: str, data: bytes | None):
+        if data is None:
+            with open(file_path, "rb") as file:
+                data = file.read()
+        digest = hashlib.sha256(data).hexdigest()
+        for extension, encoder in self.encoders:
+            cached_path = os.path.join(self.cache_dir, digest + extension)
+            if not os.path.exists(cached_path):
+                temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as file:
+                    file.write(encoder(data))
+                os.replace(temp_path, cached_path)
+            shutil.copyfile(cached_path, file_path + extension)
+
+    def close(self):
+        """
+        Waits for all scheduled sidecars and re-raises the first failure.
+        """
+        self._executor.shutdown(wait=True)
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,17 +1,46 @@
-import os.path
+import os
 import shutil
 
+from buildlog import log
+from minify import minify_css
+from sitescan import SiteFile, scan_dir
 
-def copy_static_to_public(source: str, destination: str):
-    if not os.path.exists(destination):
-        os.mkdir(destination)
 
-    items = os.listdir(source)
-    for item in items:
-        source_path = os.path.join(source, item)
-        dest_path = os.path.join(destination, item)
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
-            print(f"Copied file: {source_path} -> {dest_path}")
+def copy_static_to_public(source: str, destination: str, compressor=None, minify: bool = False,
+                          files: list[SiteFile] = None):
+    """
+    Copies the static files to the public directory, minifying CSS if asked.
+
+    Args:
+        files (list[SiteFile]): Files of a site scan of source, scanned here if None
+    """
+    if files is None:
+        files = scan_dir(source)
+    created_dirs = {destination}
+    os.makedirs(destination, exist_ok=True)
+    for file in files:
+        source_path = file.path
+        dest_path = os.path.join(destination, file.rel_path)
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir not in created_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            created_dirs.add(dest_dir)
+        if minify and source_path.endswith(".css"):
+            data = copy_minified_css(source_path, dest_path)
+            log.info("file_copied", "Minified file: {source} -> {dest}",
+                     source=source_path, dest=dest_path, minified=True)
         else:
-            copy_static_to_public(source_path, dest_path)
\ No newline at end of file
+            data = None
+            shutil.copy(source_path, dest_path)
+            log.info("file_copied", "Copied file: {source} -> {dest}",
+                     source=source_path, dest=dest_path)
+        if compressor is not None:
+            compressor.submit(dest_path, data)
+
+
+def copy_minified_css(source_path: str, dest_path: str) -> bytes:
+    with open(source_path, "r", encoding="utf-8") as file:
+        data = minify_css(file.read()).encode("utf-8")
+    with open(dest_path, "wb") as file:
+        file.write(data)
+    return data
@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+default_socket_path = "./.cache/build.sock"
+
+
+class SocketStream:
+    """
+    Text stream that sends every printed line to the client as a JSON message.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = ""
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            send_message(self.wfile, {"message": line})
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            send_message(self.wfile, {"message": self.buffer})
+            self.buffer = ""
+
+    @staticmethod
+    def isatty() -> bool:
+        return False
+
+
+def send_message(wfile, message: dict):
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        command = request.get("command")
+        if command == "build":
+            status = self.server.run_build(request["cwd"], request["args"], SocketStream(self.wfile))
+        elif command == "stop":
+            # shutdown waits for serve_forever to return, so it can't run in the serving thread
+            threading.Thread(target=self.server.shutdown).start()
+            status = 0
+        elif command == "ping":
+            status = 0
+        else:
+            send_message(self.wfile, {"message": f"unknown command: {command}"})
+            status = 2
+        send_message(self.wfile, {"status": status})
+
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """
+    Long running build server listening on a Unix socket.
+
+    The daemon imports the build modules once and keeps one SiteBuilder per
+    project directory, shard, plugin list and template, so the compiled
+    regexes, the template, the highlight cache and the state of the last
+    build stay warm: a build request only pays for the pages and static
+    files that changed since.
+    Requests are served one at a time, in the main thread, so the page
+    budget watchdog works as in a normal build.
+    """
+
+    def __init__(self, socket_path: str):
+        self.builders = {}
+        super().__init__(socket_path, BuildRequestHandler)
+
+    def run_build(self, cwd: str, argv: list[str], stream: SocketStream) -> int:
+        import main
+
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+            key = None
+            try:
+                args = main.parse_args(argv)
+                if args.command != "build":
+                    print(f"the daemon only runs builds, not {args.command}")
+                    return 2
+                key = (cwd, args.shard, args.shard_by, args.shard_dir, tuple(args.plugins),
+                       os.path.abspath(main.template_path))
+                builder = self.builders.get(key)
+                if builder is None:
+                    builder = self.builders[key] = main.create_builder(args)
+                return main.run_build(builder, args, stream)
+            except SystemExit as error:
+                # argparse exits on --help and invalid arguments
+                return error.code if isinstance(error.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                self.builders.pop(key, None)
+                return 1
+            finally:
+                stream.flush()
+
+
+def request(socket_path: str, payload: dict, stream=None) -> int:
+    """
+    Sends one request to the daemon and prints its messages.
+
+    Returns:
+        int: Exit status reported by the daemon
+
+    Raises:
+        OSError: If no daemon is listening on socket_path
+    """
+    stream = stream if stream is not None else sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        with client.makefile("r", encoding="utf-8") as responses:
+            for line in responses:
+                response = json.loads(line)
+                if "status" in response:
+                    return response["status"]
+                print(response["message"], file=stream)
+    return 1
+
+
+def is_running(socket_path: str) -> bool:
+    try:
+        return request(socket_path, {"command": "ping"}) == 0
+    except OSError:
+        return False
+
+
+def serve(socket_path: str):
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            print(f"A build daemon is already listening on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        os.remove(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    with BuildDaemon(socket_path) as server:
+        print(f"Build daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def build(socket_path: str, argv: list[str]) -> int:
+    """
+    Builds through the daemon, or in this process when no daemon is running.
+    """
+    try:
+        return request(socket_path, {"command": "build", "cwd": os.getcwd(), "args": argv})
+    except OSError:
+        import main
+
+        args = main.parse_args(argv)
+        return main.run_build(main.create_builder(args), args)
+
+
+def parse_args(argv: list[str] = None) -> tuple[argparse.Namespace, list[str]]:
+    """
+    Returns the daemon options and, for the build command, the build options.
+    """
+    parser = argparse.ArgumentParser(description="Keep a build process running and send builds to it.")
+    parser.add_argument("--socket", default=default_socket_path, help="socket path (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("start", help="run the daemon in the foreground")
+    commands.add_parser("stop", help="stop a running daemon")
+    commands.add_parser("status", help="tell whether a daemon is running")
+    commands.add_parser("build", help="build through the daemon, takes the options of main.py")
+    args, build_args = parser.parse_known_args(argv)
+    if build_args and args.command != "build":
+        parser.error(f"unrecognized arguments: {' '.join(build_args)}")
+    return args, build_args
+
+
+def main():
+    args, build_args = parse_args()
+    if args.command == "start":
+        serve(args.socket)
+    elif args.command == "build":
+        sys.exit(build(args.socket, build_args))
+    elif args.command == "status":
+        running = is_running(args.socket)
+        print(f"Build daemon {'running' if running else 'not running'} on {args.socket}")
+        sys.exit(0 if running else 1)
+    else:
+        try:
+            sys.exit(request(args.socket, {"command": "stop"}))
+        except OSError:
+            print(f"No build daemon listening on {args.socket}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
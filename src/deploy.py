@@ -0,0 +1,144 @@
+import os
+import shutil
+
+from buildmanifest import MANIFEST_FILE_NAME, SIDECAR_SUFFIXES, load_build_manifest
+from images import file_digest
+
+
+class DeployError(Exception):
+    """
+    Raised when a deploy plan can't be made or executed: a manifest is
+    missing or invalid, or the output changed since it was built.
+    """
+
+
+class DeployPlan:
+    """
+    What a deploy has to do to turn the previous build into the current one.
+
+    Args:
+        upload (list[str]): Files that are new or changed
+        delete (list[str]): Files of the previous build that are gone
+        unchanged (list[str]): Files with the same hash in both builds
+        invalidate (list[str]): URL paths to purge from caches, the previous
+            files that were changed or deleted
+    """
+
+    def __init__(self, upload: list[str], delete: list[str], unchanged: list[str], invalidate: list[str]):
+        self.upload = upload
+        self.delete = delete
+        self.unchanged = unchanged
+        self.invalidate = invalidate
+
+    def to_json(self) -> dict:
+        return {"upload": self.upload, "delete": self.delete, "unchanged": self.unchanged,
+                "invalidate": self.invalidate}
+
+
+def check_key(key: str) -> str:
+    # keys come from manifest files; one must not make a deploy write or delete outside the target
+    parts = key.split("/")
+    if key.startswith("/") or "\\" in key or any(part in ("", ".", "..") for part in parts):
+        raise DeployError(f"invalid path in build manifest: {key!r}")
+    return key
+
+
+def invalidation_paths(keys) -> list[str]:
+    """
+    Returns the URL paths serving the given files, "blog/tom/index.html.gz"
+    -> "/blog/tom/index.html" and "/blog/tom/"; sidecars are served for the
+    URL of the file they compress.
+    """
+    paths = set()
+    for key in keys:
+        if key.endswith(SIDECAR_SUFFIXES):
+            key = os.path.splitext(key)[0]
+        paths.add("/" + key)
+        if key == "index.html" or key.endswith("/index.html"):
+            paths.add("/" + key[:-len("index.html")])
+    return sorted(paths)
+
+
+def plan_deploy(current: dict, previous: dict = None) -> DeployPlan:
+    """
+    Compares two build manifests, see buildmanifest.build_manifest.
+
+    Args:
+        current (dict): Manifest of the build to deploy
+        previous (dict): Manifest of the deployed build, None when nothing is deployed
+
+    Returns:
+        DeployPlan: The plan, every list sorted
+    """
+    current_files = current["files"]
+    previous_files = previous["files"] if previous is not None else {}
+    upload = []
+    unchanged = []
+    for key in sorted(map(check_key, current_files)):
+        entry = previous_files.get(key)
+        if entry is not None and entry["hash"] == current_files[key]["hash"]:
+            unchanged.append(key)
+        else:
+            upload.append(key)
+    delete = sorted(check_key(key) for key in previous_files.keys() - current_files.keys())
+    changed = [key for key in upload if key in previous_files]
+    return DeployPlan(upload, delete, unchanged, invalidation_paths(changed + delete))
+
+
+def execute_plan(plan: DeployPlan, public_dir: str, target_dir: str, current: dict):
+    """
+    Applies a plan to a directory standing in for the deploy target.
+
+    Uploads are checked against the hashes of the current manifest before
+    anything is changed. Deletes go first, taking their emptied directories
+    with them, so a file can become a directory and back ("blog" ->
+    "blog/index.html"). Uploads go through a temporary file and the manifest
+    is copied last, so an interrupted deploy leaves the previous manifest
+    and planning again redoes what is missing.
+
+    Raises:
+        DeployError: If a file to upload doesn't match the manifest, or the
+            target can't be written
+    """
+    try:
+        _execute_plan(plan, public_dir, target_dir, current["files"])
+    except OSError as error:
+        raise DeployError(f"can't deploy to {target_dir}: {error}")
+
+
+def _execute_plan(plan: DeployPlan, public_dir: str, target_dir: str, files: dict):
+    for key in plan.upload:
+        source_path = os.path.join(public_dir, *key.split("/"))
+        if not os.path.exists(source_path) or file_digest(source_path) != files[key]["hash"]:
+            raise DeployError(f"{source_path} changed since the build, build again before deploying")
+    for key in plan.delete:
+        dest_path = os.path.join(target_dir, *key.split("/"))
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        directory = os.path.dirname(dest_path)
+        while (os.path.normpath(directory) != os.path.normpath(target_dir) and os.path.isdir(directory)
+               and not os.listdir(directory)):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+    for key in plan.upload:
+        source_path = os.path.join(public_dir, *key.split("/"))
+        dest_path = os.path.join(target_dir, *key.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        temp_path = dest_path + ".deploy.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, dest_path)
+    os.makedirs(target_dir, exist_ok=True)
+    shutil.copyfile(os.path.join(public_dir, MANIFEST_FILE_NAME), os.path.join(target_dir, MANIFEST_FILE_NAME))
+
+
+def load_manifest(path: str) -> dict:
+    """
+    Reads a build manifest for planning.
+
+    Raises:
+        DeployError: If there is none at path or it can't be read
+    """
+    try:
+        return load_build_manifest(path)
+    except (OSError, ValueError) as error:
+        raise DeployError(f"can't read the build manifest at {path}: {error}")
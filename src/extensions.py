@@ -0,0 +1,213 @@
+import importlib
+import importlib.util
+import os
+
+from buildlog import log
+
+# Characters the inline parser handles itself; inline rules can't take them over
+RESERVED_INLINE_TRIGGERS = frozenset("\\`*_[]")
+
+
+class PluginError(Exception):
+    """
+    Raised when a plugin can't be loaded.
+    """
+
+
+class BlockExtension:
+    """
+    A block type added by a plugin.
+
+    A block is offered to the extension only when it starts with one of the
+    triggers, before the built-in type of that character is tried.
+
+    Args:
+        name (str): Name of the block type
+        triggers (str): Characters a block of the type starts with
+        detect (Callable[[BlockScan], bool]): Tells whether a block is of the type; may keep
+            what it parsed in scan.items
+        render (Callable[[BlockScan, PageContext], HTMLNode | None]): Renders a block of the type,
+            None renders nothing
+    """
+
+    __slots__ = ("name", "triggers", "detect", "render")
+
+    def __init__(self, name: str, triggers: str, detect, render):
+        if not triggers:
+            raise ValueError(f"block extension {name!r} has no trigger characters")
+        self.name = name
+        self.triggers = triggers
+        self.detect = detect
+        self.render = render
+
+    def __repr__(self):
+        return f"BlockExtension({self.name!r}, {self.triggers!r})"
+
+
+class InlineRule:
+    """
+    Inline syntax added by a plugin, e.g. ~~strikethrough~~.
+
+    The parser calls the rule where it meets one of the triggers in the
+    text. The TextNodes of the rule have the rule as their text_type, and
+    the rule renders them; `value` names it like TextType.value does.
+
+    Args:
+        name (str): Name of the syntax
+        triggers (str): Characters the syntax starts with, not one of RESERVED_INLINE_TRIGGERS
+        parse (Callable[[str, int], tuple[TextNode, int] | None]): Parses the text at a trigger
+            into a node and the index after it, None when it is no match there
+        render (Callable[[TextNode], HTMLNode]): Renders a node of the rule
+    """
+
+    __slots__ = ("name", "value", "triggers", "parse", "render")
+
+    def __init__(self, name: str, triggers: str, parse, render):
+        reserved = RESERVED_INLINE_TRIGGERS.intersection(triggers)
+        if not triggers or reserved:
+            raise ValueError(f"inline rule {name!r} needs trigger characters other than {''.join(sorted(reserved))}")
+        self.name = name
+        self.value = name
+        self.triggers = triggers
+        self.parse = parse
+        self.render = render
+
+    def __repr__(self):
+        return f"InlineRule({self.name!r}, {self.triggers!r})"
+
+
+class ExtensionRegistry:
+    """
+    Block types, inline rules and post-render hooks of the loaded plugins.
+
+    The parsers don't ask the registry per block or per character: they
+    subscribe with watch and rebuild their trigger-character tables when
+    an extension is registered, so without plugins they run exactly the
+    built-in tables.
+
+    A plugin is a module with a register(registry) function. Every build
+    sets the plugins it uses with use_plugins, and pool workers load the
+    same ones, so extensions must be registered by a plugin to be used
+    with --jobs.
+    """
+
+    def __init__(self):
+        self.block_triggers: dict[str, list[BlockExtension]] = {}
+        self.inline_triggers: dict[str, list[InlineRule]] = {}
+        self.post_render_hooks = []
+        self.plugins: list[str] = []
+        self._watchers = []
+
+    def watch(self, watcher):
+        """
+        Calls watcher(registry) now and after every change of the registry.
+        """
+        self._watchers.append(watcher)
+        watcher(self)
+
+    def register_block(self, extension: BlockExtension):
+        for char in extension.triggers:
+            self.block_triggers.setdefault(char, []).append(extension)
+        self._changed()
+
+    def register_inline(self, rule: InlineRule):
+        for char in rule.triggers:
+            self.inline_triggers.setdefault(char, []).append(rule)
+        self._changed()
+
+    def register_post_render(self, hook):
+        """
+        Adds hook(html_page, source_path, context) -> html_page, run on every
+        page after the template is filled, before the basepath is applied and
+        the page is minified. Pages are then never streamed, see generate_page.
+        """
+        self.post_render_hooks.append(hook)
+        self._changed()
+
+    def use_plugins(self, plugins: list[str]):
+        """
+        Makes plugins the loaded plugins. Unless they are loaded already, the
+        registry is emptied and rebuilt from them, so that a plugin dropped
+        from the builds of a long running process is no longer applied.
+
+        Args:
+            plugins (list[str]): Module names, or paths of .py files
+
+        Raises:
+            PluginError: If a plugin can't be loaded, the registry is then empty
+        """
+        keys = list(dict.fromkeys(plugin_key(plugin) for plugin in plugins))
+        if keys == self.plugins:
+            return
+        self.clear()
+        self.load_plugins(keys)
+
+    def load_plugins(self, plugins: list[str]):
+        """
+        Imports the plugins not loaded yet and calls their register function.
+        Plugin files are told apart by their absolute path.
+
+        Args:
+            plugins (list[str]): Module names, or paths of .py files
+
+        Raises:
+            PluginError: If a plugin can't be imported, has no register function
+                or its register function fails; the registry is then empty
+        """
+        try:
+            for plugin in map(plugin_key, plugins):
+                if plugin not in self.plugins:
+                    self._load_plugin(plugin)
+        except PluginError:
+            # a failed register may have left some of its extensions behind
+            self.clear()
+            raise
+
+    def _load_plugin(self, plugin: str):
+        try:
+            module = import_plugin(plugin)
+        except PluginError:
+            raise
+        except Exception as error:
+            raise PluginError(f"can't load plugin {plugin}: {error}") from error
+        register = getattr(module, "register", None)
+        if register is None:
+            raise PluginError(f"plugin {plugin} has no register function")
+        try:
+            register(self)
+        except Exception as error:
+            raise PluginError(f"plugin {plugin} failed to register: {error}") from error
+        self.plugins.append(plugin)
+        log.info("plugin_loaded", "Loaded plugin {plugin}", plugin=plugin)
+
+    def clear(self):
+        self.block_triggers.clear()
+        self.inline_triggers.clear()
+        self.post_render_hooks.clear()
+        self.plugins.clear()
+        self._changed()
+
+    def _changed(self):
+        for watcher in self._watchers:
+            watcher(self)
+
+
+def plugin_key(plugin: str) -> str:
+    return os.path.abspath(plugin) if plugin.endswith(".py") else plugin
+
+
+def import_plugin(plugin: str):
+    if not plugin.endswith(".py"):
+        return importlib.import_module(plugin)
+    if not os.path.isfile(plugin):
+        raise PluginError(f"can't load plugin {plugin}, no such file")
+    name = os.path.splitext(os.path.basename(plugin))[0]
+    spec = importlib.util.spec_from_file_location(f"plugin_{name}", plugin)
+    if spec is None:
+        raise PluginError(f"can't load plugin {plugin}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+registry = ExtensionRegistry()
@@ -0,0 +1,208 @@
+from array import array
+
+from htmlnode import HTMLNode, ParentNode, escape_text, props_to_html, tag_fragments
+from markdown_blocks import iter_html_nodes
+from pagecontext import PageContext
+
+# Event opcodes
+OPEN = 0
+CLOSE = 1
+TEXT = 2
+
+# Value of events without props (OPEN) or without a value at all (CLOSE), tag of TEXT events
+NONE = -1
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Events per chunk of FlatDocument.html_chunks
+CHUNK_EVENTS = 8192
+
+
+class FlatDocument:
+    """
+    Flat HTML event stream, the compact alternative to a tree of HTMLNodes.
+
+    Every event is one entry of three parallel arrays: its opcode (OPEN,
+    CLOSE or TEXT), the id of its tag and its value, the id of a text or the
+    index of the props of an OPEN event. Tags and texts are interned in one
+    string table, so the document holds three machine ints per event, one
+    string per distinct text and a props dict only for the elements that
+    have attributes. Rendering and the other consumers walk the arrays.
+
+    Props are interned with their tag too: the links repeated across a
+    page share one props entry, whose open tag is serialized once per
+    render. Props dicts must not change once they are in a document.
+    """
+
+    __slots__ = ("ops", "tags", "values", "strings", "string_ids", "props", "props_ids")
+
+    def __init__(self):
+        self.ops = array("b")
+        self.tags = array("i")
+        self.values = array("i")
+        self.strings: list[str] = []
+        self.string_ids: dict[str, int] = {}
+        self.props: list[dict[str, str]] = []
+        self.props_ids: dict[tuple, int] = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def intern(self, string: str) -> int:
+        string_id = self.string_ids.get(string)
+        if string_id is None:
+            string_id = self.string_ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def open(self, tag: str, props: dict[str, str] = None):
+        self.ops.append(OPEN)
+        tag_id = self.intern(tag)
+        self.tags.append(tag_id)
+        if props:
+            key = (tag_id, *props.items())
+            props_id = self.props_ids.get(key)
+            if props_id is None:
+                props_id = self.props_ids[key] = len(self.props)
+                self.props.append(props)
+            self.values.append(props_id)
+        else:
+            self.values.append(NONE)
+
+    def close(self, tag: str):
+        self.ops.append(CLOSE)
+        self.tags.append(self.intern(tag))
+        self.values.append(NONE)
+
+    def text(self, text: str):
+        if text:
+            self.ops.append(TEXT)
+            self.tags.append(NONE)
+            self.values.append(self.intern(text))
+
+    def leaf(self, tag: str, text: str, props: dict[str, str] = None):
+        self.open(tag, props)
+        self.text(text)
+        self.close(tag)
+
+    def events(self):
+        """
+        Yields (opcode, tag, value) per event: the props dict (or None) of
+        OPEN events, the text of TEXT events, whose tag is None.
+        """
+        strings = self.strings
+        props = self.props
+        for op, tag, value in zip(self.ops, self.tags, self.values):
+            if op == TEXT:
+                yield op, None, strings[value]
+            else:
+                yield op, strings[tag], props[value] if value != NONE else None
+
+    def to_html(self) -> str:
+        # a single chunk, which join returns as is
+        return "".join(self.html_chunks(len(self.ops)))
+
+    def html_chunks(self, chunk_events: int = CHUNK_EVENTS):
+        """
+        Yields the HTML in chunks of about chunk_events events, so a large
+        document can be written out without the whole HTML in memory.
+
+        Chunks end before a tag, never inside or between texts, so text
+        found by searching each chunk is the text found in the whole HTML.
+        """
+        strings = self.strings
+        # each distinct text is escaped once, however often it occurs
+        escaped = [escape_text(string) for string in strings]
+        # open and close tags of the tags without attributes, by tag id
+        open_tags = {}
+        close_tags = {}
+        for tag in set(self.tags):
+            if tag != NONE:
+                open_tags[tag], close_tags[tag] = tag_fragments(strings[tag])
+        # open tags with attributes, by props index, each serialized on first use
+        props = self.props
+        props_open_tags = [None] * len(props)
+        ops = self.ops
+        start = 0
+        while start < len(ops):
+            end = min(start + max(chunk_events, 1), len(ops))
+            while end < len(ops) and ops[end] == TEXT:
+                end += 1
+            parts = []
+            append = parts.append
+            for op, tag, value in zip(ops[start:end], self.tags[start:end], self.values[start:end]):
+                if op == TEXT:
+                    append(escaped[value])
+                elif op == CLOSE:
+                    append(close_tags[tag])
+                elif value == NONE:
+                    append(open_tags[tag])
+                else:
+                    open_tag = props_open_tags[value]
+                    if open_tag is None:
+                        open_tag = props_open_tags[value] = f"<{strings[tag]}{props_to_html(props[value])}>"
+                    append(open_tag)
+            yield "".join(parts)
+            start = end
+
+    def links(self) -> list[str]:
+        """
+        Returns the href of every link in document order, e.g. for a link check.
+        """
+        anchor = self.string_ids.get("a")
+        props = self.props
+        return [props[value]["href"] for op, tag, value in zip(self.ops, self.tags, self.values)
+                if op == OPEN and tag == anchor and value != NONE and "href" in props[value]]
+
+    def headings(self) -> list[tuple[int, str, str]]:
+        """
+        Returns (level, id, text) of every heading, the text as rendered.
+        """
+        headings = []
+        current = None
+        for op, tag, value in self.events():
+            if current is None:
+                if op == OPEN and tag in HEADING_TAGS:
+                    current = (int(tag[1]), tag, (value or {}).get("id"), [])
+            elif op == TEXT:
+                current[3].append(value)
+            elif op == CLOSE and tag == current[1]:
+                headings.append((current[0], current[2], "".join(current[3])))
+                current = None
+        return headings
+
+    def text_chunks(self) -> list[str]:
+        strings = self.strings
+        return [strings[value] for op, value in zip(self.ops, self.values) if op == TEXT]
+
+
+def markdown_to_flat_document(markdown: str, context: PageContext = None) -> FlatDocument:
+    """
+    Parses markdown into a FlatDocument, rendering exactly like
+    markdown_to_html_node(markdown, context).to_html().
+
+    The blocks are converted by markdown_blocks, the one implementation of
+    the Markdown rules, and each block's tree is flattened into the document
+    and dropped, so only the events of the page are held at the end.
+    """
+    document = FlatDocument()
+    document.open("div")
+    for html_node in iter_html_nodes(markdown, context):
+        emit_html_node(document, html_node)
+    document.close("div")
+    return document
+
+
+def emit_html_node(document: FlatDocument, html_node: HTMLNode):
+    """
+    Emits an HTMLNode tree the way its to_html renders it.
+    """
+    if isinstance(html_node, ParentNode):
+        document.open(html_node.tag, html_node.props)
+        for child in html_node.children:
+            emit_html_node(document, child)
+        document.close(html_node.tag)
+    elif html_node.tag:
+        document.leaf(html_node.tag, html_node.value, html_node.props)
+    else:
+        document.text(html_node.value)
@@ -1,19 +1,300 @@
-from pathlib import Path
+import hashlib
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
 
+from budget import PageBudget, PageBudgetExceeded
+from buildlog import log
+from extensions import registry
+from flatir import markdown_to_flat_document
+from highlight import (highlight_cache_tokens, merge_highlight_cache_updates, take_highlight_cache_updates,
+                       use_highlight_cache_tokens)
+from htmlnode import HTMLNode, escape_text
+from images import registered_image_props, use_image_props
 from markdown_blocks import markdown_to_html_node
+from memory import MB, MemoryBudget, peak_rss, reset_peak_rss
+from metadata import split_front_matter
+from minify import minify_html
+from pagecontext import PageContext
+from schedule import PageScheduler
+from search import source_digest
+from sitescan import find_pages
 
+SRCSET_PATTERN = re.compile(r'srcset="([^"]*)"')
+# Time a pool worker gets past twice the render time limit before it is terminated
+POOL_WATCHDOG_GRACE_SECONDS = 1.0
 
-def generate_page(basepath: str, from_path: str, template_path: str, dest_path: str):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+_templates: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+class RenderedPage:
+    """
+    What a pool worker reports about a page it rendered and wrote; the HTML
+    itself only goes to the output file, so the records the build process
+    receives stay small whatever the size of the page.
+
+    Args:
+        dest_path (str): Path the page was written to
+        title (str): Title of the page
+        digest (str): SHA-256 of the written page
+        size (int): Size of the written page in bytes
+        links (list[str]): href of every link of the page, without the basepath
+        text (list[str]): Text of the page for the search index, None if not collected
+        render_seconds (float): Time spent rendering the page
+        write_seconds (float): Time spent writing the page
+        highlight_updates (tuple): Highlight cache entries added by the page
+        peak_rss (int): Peak RSS of the worker while on the page, None if not measured
+    """
+
+    __slots__ = ("dest_path", "title", "digest", "size", "links", "text", "render_seconds", "write_seconds",
+                 "highlight_updates", "peak_rss")
+
+    def __init__(self, dest_path: str, title: str, digest: str, size: int, links: list[str], text: list[str] | None,
+                 render_seconds: float, write_seconds: float, highlight_updates: tuple, peak_rss: int = None):
+        self.dest_path = dest_path
+        self.title = title
+        self.digest = digest
+        self.size = size
+        self.links = links
+        self.text = text
+        self.render_seconds = render_seconds
+        self.write_seconds = write_seconds
+        self.highlight_updates = highlight_updates
+        self.peak_rss = peak_rss
+
+
+def generate_page(basepath: str, from_path: str, template_path: str, dest_path: str, compressor=None,
+                  minify: bool = False, search_index=None, budget: PageBudget = None,
+                  memory: MemoryBudget = None) -> bool:
+    """
+    Renders one Markdown file into the template and saves it to dest_path.
+
+    With a memory budget the peak memory of the page is recorded, large
+    sources are streamed into the file, see stream_page, unless the page is
+    minified or post-render hooks need the whole page, and compressed
+    sidecars are made from the written file instead of a copy in memory.
+
+    Returns:
+        bool: True if the page was written, False if it was skipped or could not be saved
+    """
+    log.info("page_generated", "Generating page from {source} to {dest} using {template}",
+             source=from_path, dest=dest_path, template=template_path)
+    if memory is not None:
+        reset_peak_rss()
     markdown = read_file(from_path)
-    template = read_file(template_path)
-    title = extract_title(markdown)
-    html_content = markdown_to_html_node(markdown).to_html()
-    html_page = template.replace("{{ Title }}", title)
-    html_page = html_page.replace("{{ Content }}", html_content)
-    html_page = html_page.replace('href="/', f'href="{basepath}')
-    html_page = html_page.replace('src="/', f'src="{basepath}')
-    save_file_to_directory(html_page, dest_path)
+    if markdown is None:
+        return False
+    template = read_template(template_path)
+    collect_text = False
+    if search_index is not None:
+        page_url = search_index.page_url(dest_path)
+        digest = source_digest(markdown)
+        collect_text = not search_index.is_current(page_url, digest)
+    stream = (memory is not None and not minify and not registry.post_render_hooks
+              and memory.streams(len(markdown.encode("utf-8"))))
+    try:
+        if stream:
+            title, context, _, _ = stream_page(basepath, from_path, markdown, template, dest_path, collect_text,
+                                               budget)
+        else:
+            title, html_page, context = render_page(basepath, from_path, markdown, template, minify, collect_text,
+                                                    budget)
+    except PageBudgetExceeded as error:
+        report_budget_exceeded(error, budget)
+        return False
+    except OSError as e:
+        log.error("save_failed", "An unexpected error occurred: {error}", path=dest_path, error=str(e))
+        return False
+    if collect_text:
+        search_index.add_page(page_url, digest, title, context.text)
+    if stream:
+        written = True
+        if compressor is not None:
+            compressor.submit(dest_path)
+    else:
+        written = write_page(html_page, dest_path, compressor, keep_data=memory is None)
+    if memory is not None:
+        record_page_memory(memory, from_path, peak_rss())
+    return written
+
+
+def render_page(basepath: str, from_path: str, markdown: str, template: str, minify: bool = False,
+                collect_text: bool = False, budget: PageBudget = None) -> tuple[str, str, PageContext]:
+    """
+    Renders one page into the template, without its front matter.
+
+    Args:
+        basepath (str): URL path the site is served from
+        from_path (str): Path of the Markdown source, for messages
+        markdown (str): The Markdown source
+        template (str): The page template
+        minify (bool): Minify the rendered page
+        collect_text (bool): Collect the page text for the search index
+        budget (PageBudget): Optional limits of the page
+
+    Returns:
+        tuple[str, str, PageContext]: Title, HTML page and the context of the page
+
+    Raises:
+        PageBudgetExceeded: If the page goes over its budget
+    """
+    if budget is not None:
+        budget.check_source(from_path, markdown)
+    _, markdown = split_front_matter(markdown)
+    with budget.watchdog(from_path) if budget is not None else nullcontext():
+        title = extract_title(markdown)
+        context = PageContext()
+        context.collect_text = collect_text
+        html_node = markdown_to_html_node(markdown, context)
+        context.links = html_node_links(html_node)
+        html_content = html_node.to_html()
+        html_page = template.replace("{{ Title }}", escape_text(title))
+        if "{{ TOC }}" in html_page:
+            html_page = html_page.replace("{{ TOC }}", context.toc_to_html_node().to_html())
+        html_page = html_page.replace("{{ Content }}", html_content)
+        for hook in registry.post_render_hooks:
+            html_page = hook(html_page, from_path, context)
+        html_page = with_basepath(html_page, basepath)
+        if minify:
+            html_page = minify_html(html_page)
+    if budget is not None:
+        budget.check_output(from_path, html_page)
+    return title, html_page, context
+
+
+def html_node_links(html_node: HTMLNode, links: list[str] = None) -> list[str]:
+    """
+    Returns the href of every link of an HTMLNode tree in document order,
+    like FlatDocument.links.
+    """
+    links = [] if links is None else links
+    if html_node.tag == "a" and html_node.props and "href" in html_node.props:
+        links.append(html_node.props["href"])
+    for child in html_node.children or ():
+        html_node_links(child, links)
+    return links
+
+
+def stream_page(basepath: str, from_path: str, markdown: str, template: str, dest_path: str,
+                collect_text: bool = False, budget: PageBudget = None) -> tuple[str, PageContext, str, int]:
+    """
+    Renders one page like render_page, without minifying, and writes it to
+    dest_path chunk by chunk, so the HTML of the whole page is never held
+    in memory; only the compact FlatDocument of the page is. This is the
+    only place pages go through flatir, and only in the memory-bounded
+    mode, see generate_page.
+
+    The basepath is applied per chunk. Chunks end before a tag and the
+    rewritten attributes are within tags, so the page is the one
+    render_page gives. It is written to a temporary file that replaces
+    dest_path when complete, so a page over budget leaves no partial file.
+
+    Returns:
+        tuple[str, PageContext, str, int]: Title, context, SHA-256 and size of the written page
+
+    Raises:
+        PageBudgetExceeded: If the page goes over its budget
+        OSError: If the page can't be written
+    """
+    if budget is not None:
+        budget.check_source(from_path, markdown)
+    _, markdown = split_front_matter(markdown)
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = f"{dest_path}.{os.getpid()}.tmp"
+    try:
+        with budget.watchdog(from_path) if budget is not None else nullcontext(), open(temp_path, "wb") as file:
+            title = extract_title(markdown)
+            context = PageContext()
+            context.collect_text = collect_text
+            document = markdown_to_flat_document(markdown, context)
+            context.links = document.links()
+            page = template.replace("{{ Title }}", escape_text(title))
+            if "{{ TOC }}" in page:
+                page = page.replace("{{ TOC }}", context.toc_to_html_node().to_html())
+            for chunk in _page_chunks(page.split("{{ Content }}"), document):
+                data = with_basepath(chunk, basepath).encode("utf-8")
+                size += len(data)
+                if budget is not None:
+                    budget.check_output_size(from_path, size)
+                digest.update(data)
+                file.write(data)
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return title, context, digest.hexdigest(), size
+
+
+def _page_chunks(pieces: list[str], document):
+    # the template pieces around each {{ Content }} slot, with the content in every slot
+    yield pieces[0]
+    for piece in pieces[1:]:
+        yield from document.html_chunks()
+        yield piece
+
+
+def write_page(html_page: str, dest_path: str, compressor=None, keep_data: bool = True) -> bool:
+    """
+    Saves a rendered page and submits it to the compressor, with the
+    encoded page unless keep_data is False, when the compressor reads the
+    written file so that no copy of the page waits in its queue.
+    """
+    if not save_file_to_directory(html_page, dest_path):
+        return False
+    if compressor is not None:
+        compressor.submit(dest_path, html_page.encode("utf-8") if keep_data else None)
+    return True
+
+
+def with_basepath(html: str, basepath: str) -> str:
+    """
+    Points the site absolute href, src and srcset URLs of html below basepath.
+    """
+    html = html.replace('href="/', f'href="{basepath}')
+    html = html.replace('src="/', f'src="{basepath}')
+    return SRCSET_PATTERN.sub(lambda match: srcset_with_basepath(match, basepath), html)
+
+
+def report_budget_exceeded(error: PageBudgetExceeded, budget: PageBudget):
+    """
+    Logs a page that went over its budget, re-raises the error when the
+    budget policy is to fail the build.
+    """
+    if budget.fail:
+        log.error("page_over_budget", "Error: {error}", source=error.path, limit=error.limit, error=str(error))
+        raise error
+    log.warning("page_skipped", "Skipping page: {error}", source=error.path, limit=error.limit, error=str(error))
+
+
+def srcset_with_basepath(match: re.Match, basepath: str) -> str:
+    candidates = []
+    for candidate in match.group(1).split(", "):
+        if candidate.startswith("/"):
+            candidate = basepath + candidate[1:]
+        candidates.append(candidate)
+    return 'srcset="' + ", ".join(candidates) + '"'
+
+
+def read_template(template_path: str) -> str:
+    """
+    Reads the page template once per change of the file, so the pages of a
+    build and the builds of a long running process share it.
+    """
+    try:
+        stat = os.stat(template_path)
+    except OSError:
+        return read_file(template_path)
+    state = (stat.st_mtime_ns, stat.st_size)
+    cached = _templates.get(template_path)
+    if cached is None or cached[0] != state:
+        cached = (state, read_file(template_path))
+        _templates[template_path] = cached
+    return cached[1]
 
 
 def read_file(file_path: str):
@@ -22,13 +303,13 @@ def read_file(file_path: str):
             content = file.read()
         return content
     except FileNotFoundError:
-        print(f"Error: The file at {file_path} was not found.")
+        log.error("read_failed", "Error: The file at {path} was not found.", path=file_path)
         return None
     except PermissionError:
-        print(f"Error: Permission denied when trying to access {file_path}.")
+        log.error("read_failed", "Error: Permission denied when trying to access {path}.", path=file_path)
         return None
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        log.error("read_failed", "An unexpected error occurred: {error}", path=file_path, error=str(e))
         return None
 
 
@@ -37,14 +318,15 @@ def save_file_to_directory(content, file_path):
         with open(file_path, 'w', encoding='utf-8') as file:
             file.write(content)
 
-        print(f"File successfully saved to {file_path}")
+        log.debug("file_saved", "File successfully saved to {path}", path=file_path)
         return True
 
     except PermissionError:
-        print(f"Error: Permission denied when trying to create directory or write to {file_path}")
+        log.error("save_failed", "Error: Permission denied when trying to create directory or write to {path}",
+                  path=file_path)
         return False
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        log.error("save_failed", "An unexpected error occurred: {error}", path=file_path, error=str(e))
         return False
 
 
@@ -57,19 +339,261 @@ def extract_title(markdown: str) -> str:
     raise ValueError("there is no h1 title")
 
 
-def generate_pages_recursive(basepath: str, dir_path_content: str, template_path: str, dest_dir_path: str):
-    content_path = Path(dir_path_content)
-    dest_path = Path(dest_dir_path)
+def generate_pages_recursive(basepath: str, dir_path_content: str, template_path: str, dest_dir_path: str,
+                             compressor=None, minify: bool = False, search_index=None, budget: PageBudget = None,
+                             jobs: int = 1, memory: MemoryBudget = None):
+    """
+    Generates a page for every file below dir_path_content, mirroring the
+    directory structure in dest_dir_path.
 
-    if not dest_path.exists():
-        dest_path.mkdir(parents=True, exist_ok=True)
+    With jobs > 1 pages are rendered by a pool of worker processes, see
+    generate_pages_parallel; otherwise one after the other.
+    """
+    pages = find_pages(dir_path_content, dest_dir_path)
+    generate_pages(basepath, pages, template_path, compressor, minify, search_index, budget, jobs, memory=memory)
 
-    for source_item in content_path.iterdir():
-        source_path_parts = source_item.parts
-        dest_item_path = dest_path / source_path_parts[-1]
 
-        if source_item.is_file():
-            dest_path = dest_item_path.with_suffix(".html")
-            generate_page(basepath, str(source_item), template_path, dest_path)
-        else:
-            generate_pages_recursive(basepath, str(source_item), template_path, str(dest_item_path))
+def generate_pages(basepath: str, pages: list[tuple[str, str]], template_path: str, compressor=None,
+                   minify: bool = False, search_index=None, budget: PageBudget = None, jobs: int = 1,
+                   scheduler: PageScheduler = None, memory: MemoryBudget = None) -> list[str]:
+    """
+    Generates the given (source, destination) pages.
+
+    With a memory budget, the number of workers and of pages in flight are
+    picked by the budget, see MemoryBudget.plan, and the peak memory of
+    every page is logged. The time taken by every written page is recorded
+    in the scheduler's history, if it has one, whether or not pages are
+    rendered in parallel.
+
+    Returns:
+        list[str]: Source paths of the pages that were written
+    """
+    in_flight = None
+    if memory is not None and pages:
+        jobs, in_flight = memory.plan(jobs, [source_size(source_path) for source_path, _ in pages])
+        workers = "{jobs} workers, {in_flight} pages in flight" if jobs > 1 else "the build process"
+        log.info("memory_plan", "Rendering in " + workers + " for a memory budget of {max_rss_mb:.0f} MB",
+                 jobs=jobs, in_flight=in_flight, max_rss=memory.max_rss_bytes, max_rss_mb=memory.max_rss_bytes / MB)
+    if jobs > 1 and len(pages) > 1:
+        written = generate_pages_parallel(basepath, pages, template_path, compressor, minify, search_index, budget,
+                                          jobs, scheduler, memory, in_flight)
+    else:
+        render_times = scheduler.render_times if scheduler is not None else None
+        written = []
+        for source_path, dest_path in pages:
+            start = time.perf_counter()
+            if generate_page(basepath, source_path, template_path, dest_path, compressor, minify, search_index,
+                             budget, memory):
+                written.append(source_path)
+                if render_times is not None:
+                    render_times.record(source_path, time.perf_counter() - start, source_size(source_path))
+    if memory is not None and memory.largest_page is not None:
+        peak, source_path = memory.largest_page
+        log.info("memory_peak", "Largest page peak memory: {peak_rss_mb:.1f} MB ({source})",
+                 peak_rss=peak, peak_rss_mb=peak / MB, source=source_path)
+        if peak > memory.max_rss_bytes:
+            log.warning("memory_over_budget", "{source} took {peak_rss_mb:.1f} MB, over the memory budget of "
+                        "{max_rss_mb:.0f} MB", peak_rss=peak, peak_rss_mb=peak / MB, source=source_path,
+                        max_rss_mb=memory.max_rss_bytes / MB)
+    return written
+
+
+def generate_pages_parallel(basepath: str, pages: list[tuple[str, str]], template_path: str, compressor=None,
+                            minify: bool = False, search_index=None, budget: PageBudget = None,
+                            jobs: int = 2, scheduler: PageScheduler = None, memory: MemoryBudget = None,
+                            max_in_flight: int = None) -> list[str]:
+    """
+    Renders pages in a pool of `jobs` worker processes.
+
+    Pages are submitted in the order of the scheduler, longest first by
+    default, and the render time measured by the worker is recorded in the
+    scheduler's history for the next build. Workers start with the
+    registered images, the highlight cache and the plugins of this process and enforce
+    the page budget themselves, so a runaway page only stalls its worker
+    until the watchdog fires. Workers write the pages they render and send
+    back a RenderedPage; pages are compressed and indexed here as they
+    complete.
+
+    The watchdog can't interrupt a page stuck in C code, so with a render
+    time limit this process also waits on the pool with a timeout: a page
+    still running well after the limit, see _pool_deadline, is
+    reported over budget and the pool is terminated and started again for
+    the other pages in flight.
+
+    Sources are read as their pages are submitted, and at most
+    max_in_flight pages are submitted at a time, by default one running
+    and one queued per worker, so this process holds only the sources of
+    the pages in flight.
+
+    Returns:
+        list[str]: Source paths of the pages that were written, in page order
+    """
+    scheduler = scheduler if scheduler is not None else PageScheduler()
+    template = read_template(template_path)
+    sizes = [source_size(source_path) for source_path, _ in pages]
+    pending = deque(scheduler.order([(source_path, size) for (source_path, _), size in zip(pages, sizes)]))
+    max_in_flight = max_in_flight or 2 * jobs
+    max_render_seconds = budget.max_render_seconds if budget is not None else None
+    written = set()
+
+    executor = _start_page_pool(jobs)
+    try:
+        futures = {}
+        started = {}
+        while pending or futures:
+            while pending and len(futures) < max_in_flight:
+                index = pending.popleft()
+                source_path, dest_path = pages[index]
+                markdown = read_file(source_path)
+                if markdown is None:
+                    continue
+                page_url = digest = None
+                collect_text = False
+                if search_index is not None:
+                    page_url = search_index.page_url(dest_path)
+                    digest = source_digest(markdown)
+                    collect_text = not search_index.is_current(page_url, digest)
+                stream = (memory is not None and not minify and not registry.post_render_hooks
+                          and memory.streams(sizes[index]))
+                future = executor.submit(_render_page_in_worker, basepath, source_path, dest_path, markdown,
+                                         template, minify, collect_text, budget, stream, memory is not None)
+                futures[future] = (index, page_url, digest, collect_text)
+            timeout = _pool_wait_timeout(futures, started, max_render_seconds)
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                stuck = _stuck_pages(futures, started, max_render_seconds, jobs)
+                if stuck:
+                    _terminate_page_pool(executor)
+                    # the other pages in flight are lost with the pool and rendered again
+                    for future in reversed(list(futures)):
+                        if future not in stuck:
+                            pending.appendleft(futures[future][0])
+                    futures.clear()
+                    started.clear()
+                    for future in stuck:
+                        report_budget_exceeded(budget.render_time_exceeded(pages[stuck[future]][0]), budget)
+                    executor = _start_page_pool(jobs)
+                continue
+            for future in done:
+                index, page_url, digest, collect_text = futures.pop(future)
+                started.pop(future, None)
+                source_path, dest_path = pages[index]
+                try:
+                    page = future.result()
+                except PageBudgetExceeded as error:
+                    report_budget_exceeded(error, budget)
+                    continue
+                except OSError as e:
+                    log.error("save_failed", "An unexpected error occurred: {error}", path=dest_path, error=str(e))
+                    continue
+                log.info("page_generated", "Generated page from {source} to {dest} using {template}",
+                         source=source_path, dest=dest_path, template=template_path, size=page.size,
+                         hash=page.digest, links=len(page.links), seconds=round(page.render_seconds, 6))
+                if scheduler.render_times is not None:
+                    scheduler.render_times.record(source_path, page.render_seconds, sizes[index])
+                merge_highlight_cache_updates(*page.highlight_updates)
+                if collect_text:
+                    search_index.add_page(page_url, digest, page.title, page.text)
+                if compressor is not None:
+                    compressor.submit(dest_path)
+                if memory is not None:
+                    record_page_memory(memory, source_path, page.peak_rss)
+                written.add(source_path)
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return [source_path for source_path, _ in pages if source_path in written]
+
+
+def _start_page_pool(jobs: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(jobs, initializer=_init_page_worker,
+                               initargs=(registered_image_props(), highlight_cache_tokens(), registry.plugins))
+
+
+def _pool_wait_timeout(futures: dict, started: dict, max_render_seconds: float | None) -> float | None:
+    """
+    Returns how long to wait for a page to complete before checking for
+    stuck workers, None for as long as it takes when there is no render
+    time limit. Pages are timed from when they are first seen running.
+    """
+    if max_render_seconds is None:
+        return None
+    now = time.monotonic()
+    for future in futures:
+        if future not in started and future.running():
+            started[future] = now
+    deadline = _pool_deadline(max_render_seconds)
+    if not started:
+        return deadline
+    return max(0.0, min(started.values()) + deadline - now)
+
+
+def _pool_deadline(max_render_seconds: float) -> float:
+    # a page seen running may still wait for its worker to finish a page, which the watchdog stops in time
+    return 2 * max_render_seconds + POOL_WATCHDOG_GRACE_SECONDS
+
+
+def _stuck_pages(futures: dict, started: dict, max_render_seconds: float, jobs: int) -> dict:
+    """
+    Returns {future: page index} of the pages running past their deadline.
+
+    The pool marks one page more than it has workers as running, queued for
+    the next free worker; only the `jobs` pages running the longest are
+    really in a worker.
+    """
+    now = time.monotonic()
+    deadline = _pool_deadline(max_render_seconds)
+    running = sorted((future for future in started if not future.done()), key=started.get)[:jobs]
+    return {future: futures[future][0] for future in running if now - started[future] > deadline}
+
+
+def _terminate_page_pool(executor: ProcessPoolExecutor):
+    # a worker stuck in C code only stops when its process does
+    for process in list(executor._processes.values()):
+        process.terminate()
+    executor.shutdown(cancel_futures=True)
+
+
+def source_size(source_path: str) -> int:
+    try:
+        return os.path.getsize(source_path)
+    except OSError:
+        return 0
+
+
+def record_page_memory(memory: MemoryBudget, source_path: str, peak: int | None):
+    if peak is None:
+        return
+    memory.record(source_path, peak)
+    log.info("page_memory", "Peak memory of {source}: {peak_rss_mb:.1f} MB", source=source_path, peak_rss=peak,
+             peak_rss_mb=peak / MB)
+
+
+def _init_page_worker(image_props: dict, highlight_tokens: dict, plugins: list[str]):
+    use_image_props(image_props)
+    use_highlight_cache_tokens(highlight_tokens)
+    registry.use_plugins(plugins)
+
+
+def _render_page_in_worker(basepath: str, from_path: str, dest_path: str, markdown: str, template: str,
+                           minify: bool, collect_text: bool, budget: PageBudget, stream: bool = False,
+                           measure_memory: bool = False) -> RenderedPage:
+    if measure_memory:
+        reset_peak_rss()
+    start = time.perf_counter()
+    if stream:
+        title, context, digest, size = stream_page(basepath, from_path, markdown, template, dest_path, collect_text,
+                                                   budget)
+        # rendering and writing are interleaved, the time is all counted as rendering
+        rendered = written = time.perf_counter()
+    else:
+        title, html_page, context = render_page(basepath, from_path, markdown, template, minify, collect_text,
+                                                budget)
+        rendered = time.perf_counter()
+        data = html_page.encode("utf-8")
+        with open(dest_path, "wb") as file:
+            file.write(data)
+        written = time.perf_counter()
+        digest, size = hashlib.sha256(data).hexdigest(), len(data)
+    return RenderedPage(dest_path, title, digest, size, context.links, context.text if collect_text else None,
+                        rendered - start, written - rendered, take_highlight_cache_updates(),
+                        peak_rss() if measure_memory else None)
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import re
+
+from htmlnode import HTMLNode, LeafNode
+
+TOKEN_CLASS_PREFIX = "tok-"
+
+_PYTHON_KEYWORDS = (
+    "False", "None", "True", "and", "as", "assert", "async", "await", "break", "class", "continue", "def", "del",
+    "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in", "is", "lambda", "match",
+    "case", "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with", "yield",
+)
+_PYTHON_BUILTINS = (
+    "abs", "all", "any", "bool", "dict", "enumerate", "float", "int", "isinstance", "len", "list", "map", "max",
+    "min", "open", "print", "range", "repr", "set", "sorted", "str", "sum", "super", "tuple", "type", "zip",
+)
+_JAVASCRIPT_KEYWORDS = (
+    "async", "await", "break", "case", "catch", "class", "const", "continue", "default", "delete", "do", "else",
+    "export", "extends", "false", "finally", "for", "function", "if", "import", "in", "instanceof", "let", "new",
+    "null", "return", "static", "super", "switch", "this", "throw", "true", "try", "typeof", "undefined", "var",
+    "void", "while", "yield",
+)
+_GO_KEYWORDS = (
+    "break", "case", "chan", "const", "continue", "default", "defer", "else", "fallthrough", "for", "func", "go",
+    "goto", "if", "import", "interface", "map", "package", "range", "return", "select", "struct", "switch", "type",
+    "var", "true", "false", "nil",
+)
+_GO_BUILTINS = (
+    "append", "cap", "close", "copy", "delete", "error", "len", "make", "new", "panic", "print", "println",
+    "recover", "bool", "byte", "float64", "int", "int64", "rune", "string", "uint",
+)
+_BASH_KEYWORDS = (
+    "case", "do", "done", "elif", "else", "esac", "export", "fi", "for", "function", "if", "in", "local", "return",
+    "then", "until", "while",
+)
+
+
+def _words(words: tuple[str, ...]) -> str:
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+_DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+_SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+_C_COMMENT = r"//[^\n]*|/\*[\s\S]*?\*/"
+
+# Token rules per language, in priority order: the first alternative that matches wins
+GRAMMARS: dict[str, list[tuple[str, str]]] = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        ("string", r"[rbfuRBFU]{0,2}(?:'''[\s\S]*?'''|\"\"\"[\s\S]*?\"\"\"|" + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + ")"),
+        ("decorator", r"@\w+(?:\.\w+)*"),
+        ("keyword", _words(_PYTHON_KEYWORDS)),
+        ("builtin", _words(_PYTHON_BUILTINS)),
+        ("number", _NUMBER),
+    ],
+    "javascript": [
+        ("comment", _C_COMMENT),
+        ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+        ("keyword", _words(_JAVASCRIPT_KEYWORDS)),
+        ("number", _NUMBER),
+    ],
+    "go": [
+        ("comment", _C_COMMENT),
+        ("string", _DOUBLE_QUOTED + r"|`[^`]*`|'(?:\\.|[^'\\\n])+'"),
+        ("keyword", _words(_GO_KEYWORDS)),
+        ("builtin", _words(_GO_BUILTINS)),
+        ("number", _NUMBER),
+    ],
+    "bash": [
+        ("comment", r"(?<![\w$])#[^\n]*"),
+        ("string", _DOUBLE_QUOTED + r"|'[^']*'"),
+        ("variable", r"\$(?:\{[^}\n]*\}|\w+|[@#?$!*-])"),
+        ("keyword", _words(_BASH_KEYWORDS)),
+    ],
+    "json": [
+        ("property", _DOUBLE_QUOTED + r"(?=\s*:)"),
+        ("string", _DOUBLE_QUOTED),
+        ("keyword", _words(("true", "false", "null"))),
+        ("number", r"-?" + _NUMBER),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?\*/"),
+        ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED),
+        ("property", r"[\w-]+(?=\s*:[^{}]*[;}])"),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?\d*\.?\d+(?:%|[a-zA-Z]+)?"),
+    ],
+    "html": [
+        ("comment", r"<!--[\s\S]*?-->"),
+        ("tag", r"</?[\w-]+|/?>"),
+        ("attribute", r"[\w-]+(?==)"),
+        ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED),
+    ],
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python", "python3": "python",
+    "js": "javascript", "jsx": "javascript", "ts": "javascript", "typescript": "javascript",
+    "golang": "go",
+    "sh": "bash", "shell": "bash", "zsh": "bash", "console": "bash",
+    "xml": "html",
+}
+
+_compiled_grammars: dict[str, tuple[re.Pattern, dict[str, str]]] = {}
+_token_cache: dict[str, list[list[str | None]]] = {}
+_token_cache_dirty = False
+_used_cache_keys: set[str] = set()
+_new_cache_keys: set[str] = set()
+
+
+def resolve_language(language: str) -> str | None:
+    """
+    Maps a fence language tag (e.g. "py", "Shell") to a grammar name, or None if there is no grammar.
+    """
+    language = language.lower()
+    language = LANGUAGE_ALIASES.get(language, language)
+    return language if language in GRAMMARS else None
+
+
+def compile_grammar(language: str) -> tuple[re.Pattern, dict[str, str]]:
+    """
+    Compiles the rules of a grammar into a single alternation regex.
+
+    Each rule becomes a named group, so a match tells which rule fired through
+    `lastgroup`. Compiled grammars are kept for the lifetime of the process.
+    """
+    compiled = _compiled_grammars.get(language)
+    if compiled is None:
+        group_classes = {}
+        alternatives = []
+        for index, (token_class, pattern) in enumerate(GRAMMARS[language]):
+            group_name = f"t{index}"
+            group_classes[group_name] = token_class
+            alternatives.append(f"(?P<{group_name}>{pattern})")
+        compiled = (re.compile("|".join(alternatives)), group_classes)
+        _compiled_grammars[language] = compiled
+    return compiled
+
+
+def tokenize(language: str, code: str) -> list[list[str | None]]:
+    """
+    Splits code into [token_class, text] pairs, text between tokens has class None.
+
+    Args:
+        language (str): Grammar name as returned by resolve_language
+        code (str): Source code of the fenced block
+
+    Returns:
+        list[list[str | None]]: Tokens in source order, their texts concatenate to code
+    """
+    pattern, group_classes = compile_grammar(language)
+    tokens = []
+    position = 0
+    for match in pattern.finditer(code):
+        if match.start() > position:
+            tokens.append([None, code[position:match.start()]])
+        tokens.append([group_classes[match.lastgroup], match.group()])
+        position = match.end()
+    if position < len(code):
+        tokens.append([None, code[position:]])
+    return tokens
+
+
+def cached_tokenize(language: str, code: str) -> list[list[str | None]]:
+    """
+    Same as tokenize, but looked up by a hash of language and code first,
+    see load_highlight_cache for keeping the results across builds.
+    """
+    global _token_cache_dirty
+    key = hashlib.sha256(f"{language}\0{code}".encode("utf-8")).hexdigest()
+    _used_cache_keys.add(key)
+    tokens = _token_cache.get(key)
+    if tokens is None:
+        tokens = tokenize(language, code)
+        _token_cache[key] = tokens
+        _new_cache_keys.add(key)
+        _token_cache_dirty = True
+    return tokens
+
+
+def highlight_to_html_nodes(language: str, code: str) -> list[HTMLNode]:
+    """
+    Converts code into text nodes and <span class="tok-..."> nodes.
+
+    Args:
+        language (str): Grammar name as returned by resolve_language
+        code (str): Source code of the fenced block
+
+    Returns:
+        list[HTMLNode]: Leaf nodes to use as children of <code>
+    """
+    nodes = []
+    for token_class, text in cached_tokenize(language, code):
+        if token_class is None:
+            nodes.append(LeafNode(None, text))
+        else:
+            nodes.append(LeafNode("span", text, {"class": TOKEN_CLASS_PREFIX + token_class}))
+    return nodes
+
+
+def load_highlight_cache(cache_path: str):
+    global _token_cache_dirty
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as file:
+            _token_cache.update(json.load(file))
+    _token_cache_dirty = False
+    _used_cache_keys.clear()
+    _new_cache_keys.clear()
+
+
+def save_highlight_cache(cache_path: str):
+    """
+    Writes the tokens of every snippet seen since the cache was loaded,
+    snippets that no longer occur in the content are dropped.
+    """
+    global _token_cache_dirty
+    if not _token_cache_dirty and len(_used_cache_keys) == len(_token_cache):
+        return
+    used_tokens = {key: _token_cache[key] for key in _used_cache_keys}
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as file:
+        json.dump(used_tokens, file, separators=(",", ":"))
+    _token_cache_dirty = False
+
+
+def highlight_cache_tokens() -> dict[str, list[list[str | None]]]:
+    return dict(_token_cache)
+
+
+def use_highlight_cache_tokens(tokens: dict[str, list[list[str | None]]]):
+    """
+    Replaces the token cache, used to start pool workers with the cache of the build process.
+    """
+    _token_cache.clear()
+    _token_cache.update(tokens)
+    _used_cache_keys.clear()
+    _new_cache_keys.clear()
+
+
+def take_highlight_cache_updates() -> tuple[list[str], dict[str, list[list[str | None]]]]:
+    """
+    Returns the keys used and the tokens added since the last call and
+    forgets them; pool workers send these back with every page.
+    """
+    updates = list(_used_cache_keys), {key: _token_cache[key] for key in _new_cache_keys}
+    _used_cache_keys.clear()
+    _new_cache_keys.clear()
+    return updates
+
+
+def merge_highlight_cache_updates(used_keys: list[str], tokens: dict[str, list[list[str | None]]]):
+    global _token_cache_dirty
+    _used_cache_keys.update(used_keys)
+    if tokens:
+        _token_cache.update(tokens)
+        _token_cache_dirty = True
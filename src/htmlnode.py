@@ -1,3 +1,59 @@
+# Bound of the serialized attribute cache, it is emptied when full
+PROPS_CACHE_SIZE = 4096
+
+_props_html: dict[tuple, str] = {}
+_tag_fragments: dict[str, tuple[str, str]] = {}
+
+
+def escape_text(text: str) -> str:
+    """
+    Escapes &, < and > for element content.
+
+    Most text has none of them; checking with `in` first returns it as is,
+    at the cost of three substring scans and without copying it.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value: str) -> str:
+    """
+    Escapes &, <, > and " for double quoted attribute values.
+    """
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def props_to_html(props: dict[str, str]) -> str:
+    """
+    Serializes attributes, e.g. {"href": "/blog"} -> ' href="/blog"'.
+
+    Pages repeat the same attribute sets over and over (navigation links,
+    highlighted code spans, table alignments), so the strings are cached by
+    the items of the dict; the dicts must not change after rendering.
+    """
+    key = tuple(props.items())
+    html = _props_html.get(key)
+    if html is None:
+        html = "".join(f' {name}="{escape_attribute(value)}"' for name, value in key)
+        if len(_props_html) >= PROPS_CACHE_SIZE:
+            _props_html.clear()
+        _props_html[key] = html
+    return html
+
+
+def tag_fragments(tag: str) -> tuple[str, str]:
+    """
+    Returns the open and close tags of an element without attributes, "<b>" and "</b>".
+    """
+    fragments = _tag_fragments.get(tag)
+    if fragments is None:
+        fragments = _tag_fragments[tag] = (f"<{tag}>", f"</{tag}>")
+    return fragments
+
+
 class HTMLNode:
     def __init__(self, tag: str = None, value: str = None, children: list[object] = None,
                  props: dict[str, str] = None):
@@ -10,12 +66,9 @@ class HTMLNode:
         raise NotImplementedError
 
     def props_to_html(self):
-        html_props = ""
-        if self.props is None:
+        if not self.props:
             return ""
-        for key, value in self.props.items():
-            html_props += f" {key}=\"{value}\""
-        return html_props
+        return props_to_html(self.props)
 
     def __repr__(self):
         return (
@@ -31,10 +84,12 @@ class LeafNode(HTMLNode):
     def to_html(self):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
-        if self.tag is None or self.tag == "":
-            return self.value
-
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        if not self.tag:
+            return escape_text(self.value)
+        open_tag, close_tag = tag_fragments(self.tag)
+        if self.props:
+            open_tag = f"<{self.tag}{props_to_html(self.props)}>"
+        return open_tag + escape_text(self.value) + close_tag
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
@@ -50,12 +105,10 @@ class ParentNode(HTMLNode):
         if self.children is None or len(self.children) == 0:
             raise ValueError("invalid HTML: no children")
 
-        parent_node = f"<{self.tag}{self.props_to_html()}>"
-        for child in self.children:
-            parent_node += child.to_html()
-
-        parent_node += f"</{self.tag}>"
-        return parent_node
+        open_tag, close_tag = tag_fragments(self.tag)
+        if self.props:
+            open_tag = f"<{self.tag}{props_to_html(self.props)}>"
+        return open_tag + "".join([child.to_html() for child in self.children]) + close_tag
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from buildlog import log
+from sitescan import SiteFile, scan_dir
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, without it only dimensions are injected
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+VARIANT_WIDTHS = (480, 960, 1440)
+VARIANT_FORMAT = "webp"
+INDEX_FILE_NAME = "index.json"
+# Fewer images than this are encoded in the build process, a pool costs more to start
+POOL_MIN_IMAGES = 2
+
+_image_props: dict[str, dict[str, str]] = {}
+
+
+def read_image_size(file_path: str) -> tuple[int, int] | None:
+    """
+    Reads the pixel dimensions of a PNG, GIF or JPEG file from its header.
+
+    Only the bytes needed to locate the size are read, so this is cheap
+    enough to run on every image of the site without an imaging library.
+
+    Args:
+        file_path (str): Path of the image file
+
+    Returns:
+        tuple[int, int] | None: (width, height) or None if the format is not recognized or the header is truncated
+    """
+    with open(file_path, "rb") as file:
+        head = file.read(26)
+        try:
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head.startswith(b"\xff\xd8"):
+                return _read_jpeg_size(file)
+        except struct.error:
+            return None
+    return None
+
+
+def _read_jpeg_size(file) -> tuple[int, int] | None:
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) != 2 or marker[0] != 0xFF:
+            return None
+        # SOF0..SOF15 carry the frame size, except DHT, JPG and DAC markers
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            file.read(3)
+            height, width = struct.unpack(">HH", file.read(4))
+            return width, height
+        segment_length = struct.unpack(">H", file.read(2))[0]
+        if segment_length < 2:
+            return None
+        file.seek(segment_length - 2, os.SEEK_CUR)
+
+
+def file_digest(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _encode_variants(source_path: str, cache_dir: str, digest: str) -> list[list]:
+    """
+    Encodes the resized variants of one image into the cache directory.
+
+    Runs inside a worker process, so it only takes and returns plain values.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    variants = []
+    with Image.open(source_path) as image:
+        image.load()
+        widths = [width for width in VARIANT_WIDTHS if width < image.width] + [image.width]
+        for width in widths:
+            height = round(image.height * width / image.width)
+            file_name = f"{stem}-{width}w.{digest[:10]}.{VARIANT_FORMAT}"
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            resized.save(os.path.join(cache_dir, file_name), VARIANT_FORMAT.upper(), quality=80, method=4)
+            variants.append([file_name, width])
+    return variants
+
+
+def load_image_index(cache_dir: str) -> dict:
+    index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_image_index(cache_dir: str, index: dict):
+    with open(os.path.join(cache_dir, INDEX_FILE_NAME), "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=1, sort_keys=True)
+
+
+def _is_cached(entry: dict | None, digest: str, cache_dir: str) -> bool:
+    if entry is None or entry["hash"] != digest:
+        return False
+    if Image is not None and not entry["variants"]:
+        return False
+    return all(os.path.exists(os.path.join(cache_dir, name)) for name, _ in entry["variants"])
+
+
+def find_images(static_dir: str, files: list[SiteFile] = None) -> list[str]:
+    """
+    Returns the relative paths of the images below static_dir, taken from the
+    files of a site scan when given.
+    """
+    if files is None:
+        files = scan_dir(static_dir)
+    return [file.rel_path for file in files if file.rel_path.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def process_images(static_dir: str, public_dir: str, cache_dir: str, workers: int = None,
+                   files: list[SiteFile] = None) -> dict[str, dict]:
+    """
+    Generates responsive variants for every image under the static directory.
+
+    Each image is hashed and looked up in the cache index; only new or changed
+    images are encoded, in a process pool started only when there are at least
+    POOL_MIN_IMAGES of them. Encoded variants live in the cache directory and
+    are copied next to the original image in the public directory. Without
+    Pillow no variants are produced, but dimensions are still recorded. Images
+    whose size can't be read are skipped with a warning.
+
+    Args:
+        static_dir (str): Directory with the source images
+        public_dir (str): Output directory the static files were copied to
+        cache_dir (str): Directory holding encoded variants and the cache index
+        workers (int): Maximum number of encoder processes, defaults to CPU count
+        files (list[SiteFile]): Files of a site scan of static_dir, scanned here if None
+
+    Returns:
+        dict[str, dict]: Image entries keyed by site URL, e.g. "/images/tom.png"
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    index = load_image_index(cache_dir)
+    new_index = {}
+    changed = []
+
+    for rel_path in find_images(static_dir, files):
+        source_path = os.path.join(static_dir, rel_path)
+        digest = file_digest(source_path)
+        entry = index.get(rel_path)
+        if _is_cached(entry, digest, cache_dir):
+            new_index[rel_path] = entry
+            continue
+
+        size = read_image_size(source_path)
+        if size is None:
+            log.warning("image_skipped", "Skipping image {path}: unknown format or truncated header", path=rel_path)
+            continue
+        new_index[rel_path] = {"hash": digest, "width": size[0], "height": size[1], "variants": []}
+        changed.append((rel_path, source_path, digest))
+
+    if Image is not None:
+        for rel_path, variants in _encode_images(changed, cache_dir, workers):
+            new_index[rel_path]["variants"] = variants
+            log.info("image_encoded", "Encoded {variants} variants of {path}", path=rel_path, variants=len(variants))
+
+    save_image_index(cache_dir, new_index)
+
+    manifest = {}
+    for rel_path, entry in new_index.items():
+        dest_dir = os.path.dirname(os.path.join(public_dir, rel_path))
+        for file_name, _ in entry["variants"]:
+            shutil.copy(os.path.join(cache_dir, file_name), os.path.join(dest_dir, file_name))
+        manifest["/" + rel_path.replace(os.sep, "/")] = entry
+    return manifest
+
+
+def _encode_images(changed: list[tuple[str, str, str]], cache_dir: str, workers: int = None):
+    """
+    Encodes the variants of the (rel_path, source_path, digest) images,
+    yielding (rel_path, variants) in order.
+    """
+    if len(changed) < POOL_MIN_IMAGES or workers == 1:
+        for rel_path, source_path, digest in changed:
+            yield rel_path, _encode_variants(source_path, cache_dir, digest)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(changed))) as executor:
+        futures = [(rel_path, executor.submit(_encode_variants, source_path, cache_dir, digest))
+                   for rel_path, source_path, digest in changed]
+        for rel_path, future in futures:
+            yield rel_path, future.result()
+
+
+def image_entry_to_props(url: str, entry: dict) -> dict[str, str]:
+    props = {
+        "width": str(entry["width"]),
+        "height": str(entry["height"]),
+        "loading": "lazy",
+    }
+    if entry["variants"]:
+        url_dir = url.rsplit("/", 1)[0]
+        props["srcset"] = ", ".join(f"{url_dir}/{name} {width}w" for name, width in entry["variants"])
+    return props
+
+
+def register_images(manifest: dict[str, dict]):
+    """
+    Makes the processed images known to the renderer, see image_props.
+    """
+    _image_props.clear()
+    for url, entry in manifest.items():
+        _image_props[url] = image_entry_to_props(url, entry)
+
+
+def image_props(url: str) -> dict[str, str]:
+    """
+    Returns the extra <img> attributes for a processed image, or an empty
+    dict for images the pipeline does not know about (e.g. external URLs).
+    """
+    return _image_props.get(url, {})
+
+
+def registered_image_props() -> dict[str, dict[str, str]]:
+    return dict(_image_props)
+
+
+def use_image_props(props: dict[str, dict[str, str]]):
+    """
+    Replaces the registered image attributes, used to start pool workers
+    with the images registered in the build process.
+    """
+    _image_props.clear()
+    _image_props.update(props)
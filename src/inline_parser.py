@@ -0,0 +1,478 @@
+import re
+import string
+import unicodedata
+
+from extensions import ExtensionRegistry, InlineRule, registry
+from node_splitter import FOOTNOTE_REFERENCE_PATTERN
+from textnode import TextNode, TextType
+
+# Characters that may start inline syntax, everything else is consumed as plain text in one step
+INLINE_SYNTAX_CHARS = "\\`*_[]!"
+BACKTICK_RUN_PATTERN = re.compile(r"`+")
+PARENTHESIS_PATTERN = re.compile(r"[()]")
+ASCII_PUNCTUATION = frozenset(string.punctuation)
+# Deeper emphasis/link nesting is left as plain text, it only serves to exhaust the recursion of the renderers
+MAX_NESTING = 32
+
+
+class _Node:
+    """
+    Entry of the doubly linked node list built while scanning. A linked list
+    makes wrapping a span into an emphasis or link node O(1) apart from the
+    nodes that get absorbed, which keeps the whole parse linear.
+    """
+    __slots__ = ("value", "prev", "next")
+
+    def __init__(self, value: TextNode):
+        self.value = value
+        self.prev = None
+        self.next = None
+
+
+class _Delimiter:
+    """
+    A run of * or _ characters that may open and/or close emphasis.
+    """
+    __slots__ = ("char", "count", "length", "can_open", "can_close", "node", "prev", "next")
+
+    def __init__(self, char: str, length: int, can_open: bool, can_close: bool, node: _Node):
+        self.char = char
+        self.count = length
+        self.length = length
+        self.can_open = can_open
+        self.can_close = can_close
+        self.node = node
+        self.prev = None
+        self.next = None
+
+
+class _Bracket:
+    """
+    A [ or ![ that may start a link or an image.
+    """
+    __slots__ = ("node", "image", "delimiter", "start")
+
+    def __init__(self, node: _Node, image: bool, delimiter: _Delimiter | None, start: int):
+        self.node = node
+        self.image = image
+        self.delimiter = delimiter
+        self.start = start
+
+
+def plain_text_pattern(syntax_chars: str) -> re.Pattern:
+    return re.compile(f"[^{re.escape(syntax_chars)}]+")
+
+
+PLAIN_TEXT_PATTERN = plain_text_pattern(INLINE_SYNTAX_CHARS)
+
+# PLAIN_TEXT_PATTERN stopping at the triggers of the inline rules too, and the rules by trigger
+_plain_text_pattern = PLAIN_TEXT_PATTERN
+_inline_rules: dict[str, list[InlineRule]] = {}
+
+
+def use_inline_rules(extensions: ExtensionRegistry):
+    """
+    Rebuilds the plain text pattern and the rule table for the inline rules
+    of the registry. Text without any trigger is still consumed in one step,
+    and without rules the parser runs with PLAIN_TEXT_PATTERN as before.
+    """
+    global _plain_text_pattern, _inline_rules
+    _inline_rules = dict(extensions.inline_triggers)
+    triggers = "".join(char for char in _inline_rules if char not in INLINE_SYNTAX_CHARS)
+    _plain_text_pattern = plain_text_pattern(INLINE_SYNTAX_CHARS + triggers) if triggers else PLAIN_TEXT_PATTERN
+
+
+registry.watch(use_inline_rules)
+
+
+def _is_punctuation(char: str) -> bool:
+    return char in ASCII_PUNCTUATION or unicodedata.category(char)[0] in "PS"
+
+
+class InlineParser:
+    """
+    Delimiter run based inline parser, see parse_inline.
+
+    The text is scanned once. Code spans, escapes, footnote references and
+    the syntax of inline rules are resolved during the scan, * and _ runs are pushed on a delimiter stack and
+    [ / ![ on a bracket stack. Links are resolved when their ] is reached and
+    emphasis is resolved with the CommonMark "process emphasis" procedure,
+    whose openers_bottom table guarantees that no opener is searched twice.
+
+    Containers are nested at most MAX_NESTING deep; the depth of a span is
+    only looked up once some container has reached that depth.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.head = None
+        self.tail = None
+        self.delimiters = None
+        self.brackets: list[_Bracket] = []
+        self.bracket_floor = 0
+        self.backtick_runs: dict[int, list[int]] | None = None
+        self.depths: dict[int, int] = {}
+        self.max_depth = 0
+
+    def parse(self) -> list[TextNode]:
+        text = self.text
+        position = 0
+        while position < len(text):
+            match = _plain_text_pattern.match(text, position)
+            if match is not None:
+                self._append_text(match.group())
+                position = match.end()
+                continue
+            char = text[position]
+            if char == "\\":
+                position = self._parse_escape(position)
+            elif char == "`":
+                position = self._parse_code_span(position)
+            elif char in "*_":
+                position = self._parse_delimiter_run(position)
+            elif char == "!" and text.startswith("[", position + 1):
+                self._push_bracket(position, True)
+                position += 2
+            elif char == "[":
+                position = self._parse_open_bracket(position)
+            elif char == "]":
+                position = self._parse_close_bracket(position)
+            else:
+                position = self._parse_inline_rule(position)
+
+        self._process_emphasis(None)
+        return _merge_text_nodes(self._detach(self.head, None))
+
+    def _append(self, value: TextNode) -> _Node:
+        node = _Node(value)
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+            node.prev = self.tail
+        self.tail = node
+        return node
+
+    def _append_text(self, text: str) -> _Node:
+        return self._append(TextNode(text, TextType.TEXT))
+
+    def _parse_escape(self, position: int) -> int:
+        next_char = self.text[position + 1:position + 2]
+        if next_char and next_char in ASCII_PUNCTUATION:
+            self._append_text(next_char)
+            return position + 2
+        self._append_text("\\")
+        return position + 1
+
+    def _parse_code_span(self, position: int) -> int:
+        text = self.text
+        run_end = position
+        while run_end < len(text) and text[run_end] == "`":
+            run_end += 1
+        length = run_end - position
+
+        closer = self._find_backtick_run(length, run_end)
+        if closer is None:
+            self._append_text(text[position:run_end])
+            return run_end
+        code = text[run_end:closer].replace("\n", " ")
+        if len(code) > 2 and code[0] == " " and code[-1] == " " and code.strip():
+            code = code[1:-1]
+        self._append(TextNode(code, TextType.CODE))
+        return closer + length
+
+    def _find_backtick_run(self, length: int, start: int) -> int | None:
+        """
+        Finds the next backtick run of exactly `length` starting at or after start.
+
+        Runs are indexed once per text by length; consumed and skipped entries
+        are dropped, so repeated lookups (many unmatched `) stay linear overall.
+        """
+        if self.backtick_runs is None:
+            self.backtick_runs = {}
+            for match in BACKTICK_RUN_PATTERN.finditer(self.text):
+                self.backtick_runs.setdefault(len(match.group()), []).append(match.start())
+            for runs in self.backtick_runs.values():
+                runs.reverse()
+        runs = self.backtick_runs.get(length)
+        while runs and runs[-1] < start:
+            runs.pop()
+        return runs.pop() if runs else None
+
+    def _parse_delimiter_run(self, position: int) -> int:
+        text = self.text
+        char = text[position]
+        run_end = position
+        while run_end < len(text) and text[run_end] == char:
+            run_end += 1
+
+        before = text[position - 1] if position > 0 else " "
+        after = text[run_end] if run_end < len(text) else " "
+        before_space, after_space = before.isspace(), after.isspace()
+        before_punctuation, after_punctuation = _is_punctuation(before), _is_punctuation(after)
+        left_flanking = not after_space and (not after_punctuation or before_space or before_punctuation)
+        right_flanking = not before_space and (not before_punctuation or after_space or after_punctuation)
+        if char == "*":
+            can_open, can_close = left_flanking, right_flanking
+        else:
+            # intra-word underscores (snake_case_names) neither open nor close
+            can_open = left_flanking and (not right_flanking or before_punctuation)
+            can_close = right_flanking and (not left_flanking or after_punctuation)
+
+        node = self._append_text(text[position:run_end])
+        if can_open or can_close:
+            delimiter = _Delimiter(char, run_end - position, can_open, can_close, node)
+            delimiter.prev = self.delimiters
+            if self.delimiters is not None:
+                self.delimiters.next = delimiter
+            self.delimiters = delimiter
+        return run_end
+
+    def _parse_inline_rule(self, position: int) -> int:
+        # the only character left to get here without rules is a "!" not starting an image
+        for rule in _inline_rules.get(self.text[position], ()):
+            parsed = rule.parse(self.text, position)
+            if parsed is not None:
+                node, end = parsed
+                if end <= position:
+                    raise ValueError(f"inline rule {rule.name!r} consumed no text at {position}")
+                self._append(node)
+                return end
+        self._append_text(self.text[position])
+        return position + 1
+
+    def _push_bracket(self, position: int, image: bool):
+        node = self._append_text("![" if image else "[")
+        self.brackets.append(_Bracket(node, image, self.delimiters, position + (2 if image else 1)))
+
+    def _parse_open_bracket(self, position: int) -> int:
+        match = FOOTNOTE_REFERENCE_PATTERN.match(self.text, position)
+        if match is not None:
+            self._append(TextNode(match.group(1), TextType.FOOTNOTE, match.group(1)))
+            return match.end()
+        self._push_bracket(position, False)
+        return position + 1
+
+    def _parse_close_bracket(self, position: int) -> int:
+        if not self.brackets:
+            self._append_text("]")
+            return position + 1
+        bracket = self.brackets.pop()
+        if len(self.brackets) < self.bracket_floor:
+            # openers left open around a link are inactive, links may not contain other links
+            self.bracket_floor = len(self.brackets)
+            if not bracket.image:
+                self._append_text("]")
+                return position + 1
+
+        url_end = self._find_link_destination(position)
+        if url_end is None:
+            self._append_text("]")
+            return position + 1
+        url = self.text[position + 2:url_end]
+
+        if bracket.image:
+            value = TextNode(self.text[bracket.start:position], TextType.IMAGE, url)
+        else:
+            self._process_emphasis(bracket.delimiter)
+            if self._is_too_deep(bracket.node.next, None):
+                self._append_text("]")
+                return position + 1
+            children = _merge_text_nodes(self._detach(bracket.node.next, None))
+            value = self._wrap(children, TextType.LINK, url)
+            self.bracket_floor = len(self.brackets)
+        self._truncate_delimiters(bracket.delimiter)
+        self._detach(bracket.node, None)
+        self._append(value)
+        return url_end + 1
+
+    def _find_link_destination(self, position: int) -> int | None:
+        """
+        Returns the index of the ) closing "](url)" at position, or None.
+
+        Like extract_markdown_links the url may not contain parentheses. The
+        search stops at the first parenthesis, so the regions searched for
+        different ] never overlap.
+        """
+        if not self.text.startswith("(", position + 1):
+            return None
+        match = PARENTHESIS_PATTERN.search(self.text, position + 2)
+        if match is None or match.group() != ")":
+            return None
+        return match.start()
+
+    def _truncate_delimiters(self, bottom: _Delimiter | None):
+        self.delimiters = bottom
+        if bottom is not None:
+            bottom.next = None
+
+    def _detach(self, first: _Node | None, last: _Node | None) -> list[TextNode]:
+        """
+        Removes the nodes from first up to (not including) last from the list
+        and returns their values. last=None detaches up to the end.
+        """
+        if first is None or first is last:
+            return []
+        values = []
+        node = first
+        while node is not last:
+            values.append(node.value)
+            node = node.next
+        before = first.prev
+        if before is None:
+            self.head = last
+        else:
+            before.next = last
+        if last is None:
+            self.tail = before
+        else:
+            last.prev = before
+        return values
+
+    def _remove_delimiter(self, delimiter: _Delimiter):
+        if delimiter.prev is not None:
+            delimiter.prev.next = delimiter.next
+        if delimiter.next is not None:
+            delimiter.next.prev = delimiter.prev
+        else:
+            self.delimiters = delimiter.prev
+
+    def _process_emphasis(self, stack_bottom: _Delimiter | None):
+        """
+        Matches emphasis closers with openers above stack_bottom, innermost first.
+        """
+        closer = stack_bottom.next if stack_bottom is not None else self._first_delimiter()
+        openers_bottom: dict[tuple[str, bool, int], _Delimiter | None] = {}
+        while closer is not None:
+            if not closer.can_close:
+                closer = closer.next
+                continue
+
+            key = (closer.char, closer.can_open, closer.length % 3)
+            bottom = openers_bottom.get(key, stack_bottom)
+            opener = closer.prev
+            while opener is not None and opener is not stack_bottom and opener is not bottom:
+                if opener.char == closer.char and opener.can_open:
+                    odd_match = ((closer.can_open or opener.can_close)
+                                 and (opener.length + closer.length) % 3 == 0
+                                 and not (opener.length % 3 == 0 and closer.length % 3 == 0))
+                    if not odd_match:
+                        break
+                opener = opener.prev
+            else:
+                opener = None
+            if opener is not None and self._is_too_deep(opener.node.next, closer.node):
+                opener = None
+
+            if opener is None:
+                openers_bottom[key] = closer.prev
+                next_closer = closer.next
+                if not closer.can_open:
+                    self._remove_delimiter(closer)
+                closer = next_closer
+                continue
+
+            used = 2 if opener.count >= 2 and closer.count >= 2 else 1
+            opener.count -= used
+            closer.count -= used
+            opener.node.value.text = opener.node.value.text[used:]
+            closer.node.value.text = closer.node.value.text[used:]
+
+            children = _merge_text_nodes(self._detach(opener.node.next, closer.node))
+            emphasis = _Node(self._wrap(children, TextType.BOLD if used == 2 else TextType.ITALIC))
+            emphasis.prev = opener.node
+            emphasis.next = closer.node
+            opener.node.next = emphasis
+            closer.node.prev = emphasis
+
+            # delimiters between opener and closer can no longer match
+            opener.next = closer
+            closer.prev = opener
+            if opener.count == 0:
+                self._detach(opener.node, opener.node.next)
+                self._remove_delimiter(opener)
+            if closer.count == 0:
+                next_closer = closer.next
+                self._detach(closer.node, closer.node.next)
+                self._remove_delimiter(closer)
+                closer = next_closer
+
+        self._truncate_delimiters(stack_bottom)
+
+    def _is_too_deep(self, first: _Node | None, last: _Node | None) -> bool:
+        if self.max_depth < MAX_NESTING:
+            return False
+        node = first
+        while node is not last:
+            if self._depth(node.value) >= MAX_NESTING:
+                return True
+            node = node.next
+        return False
+
+    def _depth(self, node: TextNode) -> int:
+        # leaves that render as a tag (flat bold, code, images...) count as one level
+        return self.depths.get(id(node), 0 if node.text_type == TextType.TEXT else 1)
+
+    def _wrap(self, children: list[TextNode], text_type: TextType, url: str = None) -> TextNode:
+        """
+        Creates a container node; plain text content stays a flat node like the
+        ones text_to_textnodes produces, anything else keeps its children.
+        """
+        if not children:
+            return TextNode("", text_type, url)
+        if len(children) == 1 and children[0].text_type == TextType.TEXT:
+            return TextNode(children[0].text, text_type, url)
+        node = TextNode(plain_text(children), text_type, url, children)
+        depth = 1 + max(self._depth(child) for child in children)
+        self.depths[id(node)] = depth
+        self.max_depth = max(self.max_depth, depth)
+        return node
+
+    def _first_delimiter(self) -> _Delimiter | None:
+        delimiter = self.delimiters
+        while delimiter is not None and delimiter.prev is not None:
+            delimiter = delimiter.prev
+        return delimiter
+
+
+def _merge_text_nodes(nodes: list[TextNode]) -> list[TextNode]:
+    merged = []
+    pending_text = []
+    for node in nodes:
+        if node.text_type == TextType.TEXT:
+            pending_text.append(node.text)
+            continue
+        if any(pending_text):
+            merged.append(TextNode("".join(pending_text), TextType.TEXT))
+        pending_text = []
+        merged.append(node)
+    if any(pending_text):
+        merged.append(TextNode("".join(pending_text), TextType.TEXT))
+    return merged
+
+
+def plain_text(nodes: list[TextNode]) -> str:
+    return "".join(node.text for node in nodes if node.text_type not in (TextType.IMAGE, TextType.FOOTNOTE))
+
+
+def parse_inline(text: str) -> list[TextNode]:
+    """
+    Parses inline markdown into a tree of TextNodes.
+
+    Supports nested emphasis (**bold _and italic_**), code spans, links,
+    images, footnote references and backslash escapes. Underscores inside
+    words (snake_case_names) are plain text and unmatched delimiters are kept
+    as text instead of raising. Runs in linear time in the length of text.
+
+    Args:
+        text (str): Inline markdown, e.g. the text of one paragraph
+
+    Returns:
+        list[TextNode]: Top level nodes; BOLD, ITALIC and LINK nodes with
+        nested markup have `children`, plain ones are flat as before
+
+    Example:
+        >>> parse_inline("**bold _and italic_**")
+        [TextNode(bold and italic, bold, None, [TextNode(bold , text, None), TextNode(and italic, italic, None)])]
+    """
+    return InlineParser(text).parse()
@@ -1,26 +1,266 @@
-import os.path
+import argparse
+import os
 import shutil
 import sys
 
-from copystatic import copy_static_to_public
-from gencontent import generate_pages_recursive
+# Only the modules a command needs are imported, inside the command, so that
+# `main.py --help`, clean or list-pages don't pay for the parser stack.
 
 static_dir_path = "./static"
 public_dir_path = "./docs"
 content_dir_path = "./content"
 template_path = "./template.html"
+cache_dir_path = "./.cache"
+shard_dir_path = "./shards"
 default_basepath = "/"
+default_port = 8888
 
+COMMANDS = ("build", "clean", "serve", "list-pages", "merge-shards", "deploy-plan")
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """
+    Parses the command line; without a command the arguments are build
+    options, so `main.py [basepath]` keeps building the site.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in (*COMMANDS, "-h", "--help"):
+        argv = ["build", *argv]
+
+    parser = argparse.ArgumentParser(description="Generate the static site from Markdown content.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="generate the site into docs/ (default)")
+    build.set_defaults(handler=build_command)
+    add_build_arguments(build)
+
+    clean = commands.add_parser("clean", help="delete the generated site")
+    clean.set_defaults(handler=clean_command)
+    clean.add_argument("--cache", action="store_true", help="also delete the build caches in .cache/")
+
+    serve = commands.add_parser("serve", help="serve the generated site over HTTP")
+    serve.set_defaults(handler=serve_command)
+    serve.add_argument("--port", type=int, default=default_port, help="port to listen on (default: %(default)s)")
+    serve.add_argument("--bind", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+
+    list_pages = commands.add_parser("list-pages", help="print the URL, source and title of every page")
+    list_pages.set_defaults(handler=list_pages_command)
+
+    merge = commands.add_parser("merge-shards", help="merge the outputs of sharded builds into docs/")
+    merge.set_defaults(handler=merge_shards_command)
+    merge.add_argument("--shard-dir", default=shard_dir_path, metavar="DIR",
+                       help="directory holding the shard outputs (default: %(default)s)")
+
+    deploy = commands.add_parser("deploy-plan", help="compare docs/ with a deployed build and list what to upload")
+    deploy.set_defaults(handler=deploy_plan_command)
+    deploy.add_argument("--previous", metavar="PATH",
+                        help="build manifest of the deployed site, or the directory holding it "
+                             "(default: the one of --target, else everything is uploaded)")
+    deploy.add_argument("--target", metavar="DIR", help="local directory standing in for the deploy target")
+    deploy.add_argument("--execute", action="store_true", help="apply the plan to --target")
+    deploy.add_argument("--json", action="store_true", help="print the plan as JSON")
+    return parser.parse_args(argv)
+
+
+def add_build_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("basepath", nargs="?", default=default_basepath,
+                        help="URL path the site is served from (default: %(default)s)")
+    parser.add_argument("--minify", action="store_true", help="minify generated HTML and static CSS")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="only print warnings and errors, with a progress counter")
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="also print debug events")
+    parser.add_argument("--event-log", metavar="PATH", help="write every build event to PATH as JSON lines")
+    parser.add_argument("--plugin", action="append", default=[], dest="plugins", metavar="MODULE",
+                        help="load the block types, inline rules and hooks of a plugin module or .py file; "
+                             "may be repeated")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="render pages in N worker processes (default: %(default)s)")
+    # kept in sync with budget.POLICIES, which is not imported to keep --help fast
+    budget = parser.add_argument_group("page budget", "limits for a single page, unlimited by default")
+    budget.add_argument("--max-page-size", type=int, metavar="BYTES", help="largest accepted Markdown source")
+    budget.add_argument("--max-render-time", type=float, metavar="SECONDS", help="longest accepted render time")
+    budget.add_argument("--max-output-size", type=int, metavar="BYTES", help="largest accepted HTML page")
+    budget.add_argument("--on-budget-exceeded", choices=("skip", "fail"), default="skip",
+                        help="skip offending pages or fail the build (default: %(default)s)")
+    parser.add_argument("--max-memory", type=memory_size, metavar="SIZE",
+                        help="keep the build under SIZE of memory, e.g. 800M or 1G, by picking the number of "
+                             "workers, streaming large pages and reporting the peak memory of each page")
+    # kept in sync with shard.STRATEGIES
+    shards = parser.add_argument_group("sharding", "split the pages over several builds, see merge-shards")
+    shards.add_argument("--shard", type=shard_spec, metavar="I/N",
+                        help="only build the pages of shard I of N, into DIR/I-of-N")
+    shards.add_argument("--shard-by", choices=("hash", "size"), default="hash",
+                        help="assign pages by path hash or balance their source size (default: %(default)s)")
+    shards.add_argument("--shard-dir", default=shard_dir_path, metavar="DIR",
+                        help="directory for the shard outputs (default: %(default)s)")
+
+
+def shard_spec(spec: str) -> tuple[int, int]:
+    from shard import parse_shard
+
+    try:
+        return parse_shard(spec)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def memory_size(spec: str) -> int:
+    from memory import parse_size
+
+    try:
+        return parse_size(spec)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def create_builder(args: argparse.Namespace = None):
+    """
+    Returns a builder for the site, or for one shard of it when args has --shard.
+    """
+    from builder import SiteBuilder
+
+    if args is None or args.shard is None:
+        return SiteBuilder(static_dir_path, public_dir_path, content_dir_path, template_path, cache_dir_path)
+
+    from shard import Shard
+
+    shard = Shard(*args.shard, args.shard_by)
+    # shards get their own cache so that shards running side by side don't share cache files
+    return SiteBuilder(static_dir_path, os.path.join(args.shard_dir, shard.name), content_dir_path, template_path,
+                       os.path.join(cache_dir_path, "shards", shard.name), shard)
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else default_basepath
-    if os.path.exists(public_dir_path):
-        shutil.rmtree(public_dir_path)
-        print(f"Deleted {public_dir_path} folder")
 
-    copy_static_to_public(static_dir_path, public_dir_path)
+def run_build(builder, args: argparse.Namespace, stream=None) -> int:
+    """
+    Runs one build with the parsed command line options.
 
-    generate_pages_recursive(basepath, content_dir_path, template_path, public_dir_path)
+    Args:
+        builder (SiteBuilder): Builder to use, a fresh one builds everything
+        args (argparse.Namespace): Options as returned by parse_args
+        stream: Text stream for the build log, defaults to stdout
+
+    Returns:
+        int: Exit status of the build
+    """
+    import buildlog
+    from budget import PageBudget, PageBudgetExceeded
+    from buildlog import log
+    from extensions import PluginError
+    from memory import MemoryBudget
+
+    level = buildlog.WARNING if args.quiet else buildlog.DEBUG if args.verbose else buildlog.INFO
+    log.configure(level, stream, event_log_path=args.event_log, progress=args.quiet)
+    budget = PageBudget(args.max_page_size, args.max_render_time, args.max_output_size, args.on_budget_exceeded)
+    memory = MemoryBudget(args.max_memory) if args.max_memory is not None else None
+    try:
+        builder.build(args.basepath, args.minify, budget, args.jobs, memory, args.plugins)
+    except PluginError as error:
+        log.error("build_failed", "Build failed, {error}", error=str(error))
+        log.close()
+        return 1
+    except PageBudgetExceeded:
+        log.error("build_failed", "Build failed ({summary})", summary=log.summary())
+        log.close()
+        return 1
+    log.info("build_finished", "Build finished ({summary})", summary=log.summary())
+    log.close()
+    return 0
+
+
+def build_command(args: argparse.Namespace) -> int:
+    return run_build(create_builder(args), args)
+
+
+def clean_command(args: argparse.Namespace) -> int:
+    paths = [public_dir_path, cache_dir_path] if args.cache else [public_dir_path]
+    for path in paths:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+            print(f"Deleted {path} folder")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    handler = partial(SimpleHTTPRequestHandler, directory=public_dir_path)
+    with ThreadingHTTPServer((args.bind, args.port), handler) as server:
+        print(f"Serving {public_dir_path} on http://{args.bind}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def list_pages_command(args: argparse.Namespace) -> int:
+    from metadata import MetadataCache, scan_metadata
+    from sitescan import page_destinations, page_url, scan_dir
+
+    files = scan_dir(content_dir_path)
+    cache = MetadataCache(os.path.join(cache_dir_path, "metadata.json"))
+    metadata = scan_metadata(files, cache)
+    cache.save()
+    pages = page_destinations(files, public_dir_path, create_dirs=False)
+    for source_path, dest_path in sorted(pages, key=lambda page: page_url(page[1], public_dir_path)):
+        print(f"{page_url(dest_path, public_dir_path)}\t{source_path}\t{metadata[source_path].title or ''}")
+    return 0
+
+
+def merge_shards_command(args: argparse.Namespace) -> int:
+    from buildlog import log
+    from shard import ShardMergeError, merge_shards
+
+    shard_dirs = [] if not os.path.isdir(args.shard_dir) else sorted(
+        entry.path for entry in os.scandir(args.shard_dir) if entry.is_dir())
+    try:
+        merge_shards(shard_dirs, public_dir_path, cache_dir_path)
+    except ShardMergeError as error:
+        log.error("merge_failed", "Merge failed: {error}", error=str(error))
+        return 1
+    return 0
+
+
+def deploy_plan_command(args: argparse.Namespace) -> int:
+    import json
+
+    from buildmanifest import MANIFEST_FILE_NAME
+    from deploy import DeployError, execute_plan, load_manifest, plan_deploy
+
+    if args.execute and args.target is None:
+        print("deploy-plan: --execute needs a --target directory", file=sys.stderr)
+        return 2
+    previous_path = args.previous
+    if previous_path is None and args.target is not None:
+        if os.path.exists(os.path.join(args.target, MANIFEST_FILE_NAME)):
+            previous_path = args.target
+    try:
+        current = load_manifest(public_dir_path)
+        plan = plan_deploy(current, load_manifest(previous_path) if previous_path is not None else None)
+        if args.execute:
+            execute_plan(plan, public_dir_path, args.target, current)
+    except DeployError as error:
+        print(f"deploy-plan: {error}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(plan.to_json(), indent=1))
+    else:
+        for action, keys in (("upload", plan.upload), ("delete", plan.delete), ("invalidate", plan.invalidate)):
+            for key in keys:
+                print(f"{action}\t{key}")
+        done = "applied to " + args.target if args.execute else "planned"
+        print(f"{len(plan.upload)} to upload, {len(plan.delete)} to delete, {len(plan.unchanged)} unchanged, "
+              f"{len(plan.invalidate)} to invalidate ({done})", file=sys.stderr)
+    return 0
+
+
+def main():
+    args = parse_args()
+    sys.exit(args.handler(args))
 
 
-main()
+if __name__ == "__main__":
+    main()
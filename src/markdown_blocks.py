@@ -1,8 +1,12 @@
 import re
 from enum import Enum
+from typing import Iterator
 
-from htmlnode import HTMLNode, ParentNode
-from node_splitter import text_to_textnodes
+from extensions import BlockExtension, ExtensionRegistry, registry
+from highlight import highlight_to_html_nodes, resolve_language
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from inline_parser import parse_inline
+from pagecontext import PageContext, footnotes_to_html_node
 from textnode import TextNode, TextType, text_node_to_html_node
 
 
@@ -17,6 +21,8 @@ class BlockType(Enum):
         QUOTE: Blockquote prefixed with '>'
         UNORDERED_LIST: List with bullet points
         ORDERED_LIST: Numbered list
+        TABLE: GitHub flavored pipe table
+        FOOTNOTE: Footnote definitions
     """
     PARAGRAPH = "paragraph"
     HEADING = "heading"
@@ -24,9 +30,18 @@ class BlockType(Enum):
     QUOTE = "quote"
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
+    TABLE = "table"
+    FOOTNOTE = "footnote"
 
 
 ALLOWED_HEADINGS = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+LIST_ITEM_PATTERN = re.compile(r"([ \t]*)(?:- |(\d+)\. )(.*)")
+TABLE_DELIMITER_PATTERN = re.compile(r"^\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+TABLE_CELL_SEPARATOR_PATTERN = re.compile(r"(?<!\\)\|")
+FOOTNOTE_DEFINITION_PATTERN = re.compile(r"\[\^([^\]\s]+)]:\s?(.*)")
+MAX_LIST_DEPTH = 32
+CODE_FENCE_PATTERN = re.compile(r"```\w*")
+CODE_BLOCK_PATTERN = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
@@ -58,7 +73,53 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return blocks
 
 
-def block_to_block_type(block: str) -> BlockType:
+class BlockScan:
+    """
+    A markdown block split into lines once, shared by type detection and conversion.
+
+    Detection walks the lines a single time and keeps what it parsed on the way
+    (list items, table rows, footnote definitions) in `items`, so converters
+    build the HTML from it instead of splitting and matching the lines again.
+
+    Attributes:
+        lines (list[str]): Lines of the block
+        block_type (BlockType | BlockExtension): Detected type of the block
+        items (list): Parsed lines for list, table, footnote and extension blocks
+    """
+    __slots__ = ("lines", "block_type", "items")
+
+    def __init__(self, lines: list[str]):
+        self.lines = lines
+        self.block_type = BlockType.PARAGRAPH
+        self.items = None
+
+
+def scan_block(block: str) -> BlockScan:
+    """
+    Splits a block into lines and detects its type.
+
+    The first character of the block selects the only detector that can match,
+    so a plain paragraph costs a dictionary lookup no matter how many block
+    types exist, including those of extensions, see use_block_extensions.
+    Tables may also start without a pipe; that check only looks at the
+    second line of multi-line blocks.
+
+    Args:
+        block (str): A string containing a markdown block
+
+    Returns:
+        BlockScan: The lines of the block with its type and parsed items
+    """
+    scan = BlockScan(block.split("\n"))
+    detector = block_detectors.get(block[:1])
+    if detector is not None and detector(scan):
+        return scan
+    if detector is not detect_table and len(scan.lines) > 1 and "|" in scan.lines[0] and "-" in scan.lines[1]:
+        detect_table(scan)
+    return scan
+
+
+def block_to_block_type(block: str) -> BlockType | BlockExtension:
     """
     Determines the markdown block type of given string block.
 
@@ -72,13 +133,17 @@ def block_to_block_type(block: str) -> BlockType:
     Returns:
         BlockType: The identified type of the markdown block
 
-    The function checks for block types in this order:
+    The block types are recognized by their first character:
     1. Heading (starts with #)
     2. Code block (surrounded by ```)
     3. Quote (all lines start with >)
-    4. Unordered list (all lines start with "- ")
-    5. Ordered list (lines start with sequential numbers)
-    6. Defaults to paragraph if no other type is matched
+    4. Unordered list (all lines are list items, top level ones start with "- ")
+    5. Ordered list (top level lines start with sequential numbers)
+    6. Table (header row, delimiter row like |---|:-:|, body rows)
+    7. Footnote definitions ([^label]: text)
+    8. Defaults to paragraph if no other type is matched
+
+    Blocks of a registered BlockExtension have the extension as their type.
 
     Example:
         >>> block_to_block_type("# Header")
@@ -86,22 +151,177 @@ def block_to_block_type(block: str) -> BlockType:
         >>> block_to_block_type("Regular paragraph text")
         BlockType.PARAGRAPH
     """
-    if block.startswith(ALLOWED_HEADINGS):
-        return BlockType.HEADING
+    return scan_block(block).block_type
+
+
+def detect_heading(scan: BlockScan) -> bool:
+    if scan.lines[0].startswith(ALLOWED_HEADINGS):
+        scan.block_type = BlockType.HEADING
+        return True
+    return False
+
 
-    if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
+def detect_code(scan: BlockScan) -> bool:
+    lines = scan.lines
+    if len(lines) > 1 and CODE_FENCE_PATTERN.fullmatch(lines[0]) and lines[-1].endswith("```"):
+        scan.block_type = BlockType.CODE
+        return True
+    return False
 
-    if check_all_strings_start_with(block.split("\n"), ">"):
-        return BlockType.QUOTE
 
-    if check_all_strings_start_with(block.split("\n"), "- "):
-        return BlockType.UNORDERED_LIST
+def detect_quote(scan: BlockScan) -> bool:
+    if check_all_strings_start_with(scan.lines, ">"):
+        scan.block_type = BlockType.QUOTE
+        return True
+    return False
 
-    if is_ordered_list(block.split("\n")):
-        return BlockType.ORDERED_LIST
 
-    return BlockType.PARAGRAPH
+def parse_list_items(lines: list[str], ordered: bool) -> list[tuple[int, bool, int, str]] | None:
+    """
+    Parses the lines of a (possibly nested) list in one pass.
+
+    Top level lines must all use the list's own marker, ordered ones numbered
+    from 1; indented lines may be items of either kind and form sub lists,
+    at most MAX_LIST_DEPTH levels deep.
+
+    Returns:
+        list[tuple[int, bool, int, str]] | None: (indent, ordered, number, text) per line,
+        or None if the lines are not a list
+    """
+    items = []
+    current_number = 1
+    levels = []
+    for line in lines:
+        match = LIST_ITEM_PATTERN.match(line)
+        if match is None:
+            return None
+        indent = len(match.group(1).expandtabs(4))
+        while levels and levels[-1] > indent:
+            levels.pop()
+        if not levels or indent > levels[-1]:
+            if len(levels) == MAX_LIST_DEPTH:
+                # items nested deeper than the limit stay siblings at the deepest level
+                indent = levels[-1]
+            else:
+                levels.append(indent)
+        item_ordered = match.group(2) is not None
+        number = int(match.group(2)) if item_ordered else 0
+        if indent == 0:
+            if item_ordered != ordered or (ordered and number != current_number):
+                return None
+            current_number += 1
+        items.append((indent, item_ordered, number, match.group(3)))
+    return items
+
+
+def detect_unordered_list(scan: BlockScan) -> bool:
+    items = parse_list_items(scan.lines, False)
+    if items is None:
+        return False
+    scan.block_type = BlockType.UNORDERED_LIST
+    scan.items = items
+    return True
+
+
+def detect_ordered_list(scan: BlockScan) -> bool:
+    items = parse_list_items(scan.lines, True)
+    if items is None:
+        return False
+    scan.block_type = BlockType.ORDERED_LIST
+    scan.items = items
+    return True
+
+
+def split_table_row(line: str) -> list[str]:
+    """
+    Splits a table row into trimmed cells, outer pipes are optional and \\| is a literal pipe.
+    """
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in TABLE_CELL_SEPARATOR_PATTERN.split(line)]
+
+
+def detect_table(scan: BlockScan) -> bool:
+    lines = scan.lines
+    if len(lines) < 2 or TABLE_DELIMITER_PATTERN.match(lines[1]) is None:
+        return False
+    header = split_table_row(lines[0])
+    delimiters = split_table_row(lines[1])
+    if len(header) != len(delimiters):
+        return False
+    alignments = []
+    for delimiter in delimiters:
+        if delimiter.startswith(":") and delimiter.endswith(":"):
+            alignments.append("center")
+        elif delimiter.endswith(":"):
+            alignments.append("right")
+        elif delimiter.startswith(":"):
+            alignments.append("left")
+        else:
+            alignments.append(None)
+    scan.block_type = BlockType.TABLE
+    scan.items = [alignments, header] + [split_table_row(line) for line in lines[2:]]
+    return True
+
+
+def detect_footnote(scan: BlockScan) -> bool:
+    items = []
+    for line in scan.lines:
+        match = FOOTNOTE_DEFINITION_PATTERN.match(line)
+        if match is not None:
+            items.append([match.group(1), match.group(2)])
+        elif items and line[:1] in (" ", "\t"):
+            # indented continuation of the previous definition
+            items[-1][1] += " " + line.strip()
+        else:
+            return False
+    scan.block_type = BlockType.FOOTNOTE
+    scan.items = items
+    return True
+
+
+BLOCK_DETECTORS = {
+    "#": detect_heading,
+    "`": detect_code,
+    ">": detect_quote,
+    "-": detect_unordered_list,
+    "1": detect_ordered_list,
+    "|": detect_table,
+    "[": detect_footnote,
+}
+
+# BLOCK_DETECTORS with the block extensions of the registry
+block_detectors = BLOCK_DETECTORS
+
+
+def use_block_extensions(extensions: ExtensionRegistry):
+    """
+    Rebuilds block_detectors from the built-in detectors and the block
+    extensions of the registry. The detector of a trigger character tries
+    its extensions in registration order, then the built-in type; without
+    extensions the table is BLOCK_DETECTORS itself.
+    """
+    global block_detectors
+    detectors = dict(BLOCK_DETECTORS)
+    for char, block_extensions in extensions.block_triggers.items():
+        detectors[char] = extension_detector(block_extensions, BLOCK_DETECTORS.get(char))
+    block_detectors = detectors if extensions.block_triggers else BLOCK_DETECTORS
+
+
+def extension_detector(block_extensions: list[BlockExtension], builtin_detector):
+    def detect(scan: BlockScan) -> bool:
+        for extension in block_extensions:
+            if extension.detect(scan):
+                scan.block_type = extension
+                return True
+        return builtin_detector is not None and builtin_detector(scan)
+    return detect
+
+
+registry.watch(use_block_extensions)
 
 
 def check_all_strings_start_with(string_list: list[str], char: str) -> bool:
@@ -118,58 +338,52 @@ def check_all_strings_start_with(string_list: list[str], char: str) -> bool:
     return all(s.startswith(char) for s in string_list)
 
 
-def is_ordered_list(ordered_list: list[str]) -> bool:
-    """
-    Checks if all strings start with a number followed by . and space
-    Numbers must start from 1 and increment by 1 for each item in the list
+def markdown_to_html_node(markdown: str, context: PageContext = None) -> HTMLNode:
+    children = list(iter_html_nodes(markdown, context))
+    return ParentNode('div', children or [LeafNode(None, "")], None)
 
-    Args:
-        ordered_list: A list of strings.
 
-    Returns:
-        bool: True if all strings start with number in sequential order followed by . and space starting from 1.
+def iter_html_nodes(markdown: str, context: PageContext = None) -> Iterator[HTMLNode]:
     """
-    current_number = 1
-    for item in ordered_list:
-        if not item.startswith(f"{current_number}. "):
-            return False
-        current_number += 1
-    return True
+    Converts markdown block by block, the children of markdown_to_html_node.
 
+    Only the tree of the current block is alive while the caller consumes
+    it, which lets flatir.markdown_to_flat_document hold a page in its
+    compact form while rendering through the same converters.
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
+    Yields:
+        HTMLNode: The node of every block that renders, then the footnotes section if any
+    """
+    if context is None:
+        context = PageContext()
     blocks = markdown_to_blocks(markdown)
-    children = []
+    context.footnote_labels = footnote_labels(blocks)
     for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode('div', children, None)
-
-
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    if block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    if block_type == BlockType.ORDERED_LIST:
-        return ordered_list_to_html_node(block)
-    if block_type == BlockType.UNORDERED_LIST:
-        return unordered_list_to_html_node(block)
-
-
-def paragraph_to_html_node(block: str) -> ParentNode:
-    lines = block.split('\n')
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+        html_node = block_to_html_node(block, context)
+        if html_node is not None:
+            yield html_node
+    footnotes = context.footnotes_to_html_node()
+    if footnotes is not None:
+        yield footnotes
+
+
+def block_to_html_node(block, context: PageContext = None):
+    scan = scan_block(block)
+    return BLOCK_CONVERTERS.get(scan.block_type, extension_block_to_html_node)(scan, context)
+
+
+def extension_block_to_html_node(scan: BlockScan, context: PageContext = None) -> HTMLNode | None:
+    return scan.block_type.render(scan, context)
+
+
+def paragraph_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
+    paragraph = " ".join(scan.lines)
+    children = text_to_children(paragraph, context)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block: str) -> ParentNode:
+def heading_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
+    block = "\n".join(scan.lines)
     level = 0
     for char in block:
         if char == "#":
@@ -179,65 +393,166 @@ def heading_to_html_node(block: str) -> ParentNode:
     if level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1:]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    text_nodes = parse_inline(text)
+    if context is None:
+        return ParentNode(f"h{level}", text_nodes_to_children(text_nodes))
+    context.add_text_nodes(text_nodes)
+    slug = context.add_heading(level, text_nodes)
+    return ParentNode(f"h{level}", text_nodes_to_children(text_nodes, context), {"id": slug})
 
 
-def code_to_html_node(block: str) -> ParentNode:
+def code_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
+    block = "\n".join(scan.lines)
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("invalid code block")
-    pattern = r'```(?:\w*\n|\n)((?:.|\n)*?)```'
-    match = re.search(pattern, block)
-    code_text = match.group(1)
+    match = CODE_BLOCK_PATTERN.match(block)
+    if match is None:
+        raise ValueError("invalid code block")
+    language = resolve_language(match.group(1))
+    code_text = match.group(2)
+    if context is not None:
+        context.add_text(code_text)
+    if language is not None and code_text:
+        code = ParentNode("code", highlight_to_html_nodes(language, code_text), {"class": f"language-{language}"})
+        return ParentNode("pre", [code])
     raw_text_node = TextNode(code_text, TextType.TEXT)
     child = text_node_to_html_node(raw_text_node)
     code = ParentNode("code", [child])
     return ParentNode("pre", [code])
 
 
-def quote_to_html_node(block: str) -> ParentNode:
+def quote_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
     clean_lines = []
-    for line in block.split("\n"):
+    for line in scan.lines:
         if not line.startswith(">"):
             raise ValueError("invalid quote block")
         clean_lines.append(line.lstrip(">").strip())
     clean_quote = " ".join(clean_lines)
-    children = text_to_children(clean_quote)
+    children = text_to_children(clean_quote, context)
     return ParentNode("blockquote", children)
 
 
-def ordered_list_to_html_node(block: str) -> ParentNode:
-    pattern = r'^\s*\d+\.\s+(.*?)$'
-    ol_items = []
-    for item in block.split('\n'):
-        match = re.match(pattern, item)
-        text = match.group(1)
-        children = text_to_children(text)
-        ol_items.append(ParentNode("li", children))
-    return ParentNode("ol", ol_items)
+def list_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
+    html_node, _ = list_items_to_html_node(scan.items, 0, context)
+    return html_node
+
 
+def list_items_to_html_node(items: list[tuple[int, bool, int, str]], index: int,
+                            context: PageContext = None) -> tuple[ParentNode, int]:
+    """
+    Builds one <ul>/<ol> from items[index:], recursing for deeper indented items.
 
-def unordered_list_to_html_node(block: str) -> ParentNode:
+    Returns:
+        tuple[ParentNode, int]: The list node and the index of the first item after it
+    """
+    indent, ordered, number, _ = items[index]
     list_items = []
-    for item in block.split("\n"):
-        text = item.lstrip("- ")
-        children = text_to_children(text)
+    while index < len(items) and items[index][0] >= indent:
+        if items[index][0] > indent:
+            sub_list, index = list_items_to_html_node(items, index, context)
+            list_items[-1].children.append(sub_list)
+            continue
+        text = items[index][3]
+        children = text_to_children(text, context)
         list_items.append(ParentNode("li", children))
-    return ParentNode("ul", list_items)
+        index += 1
+    if not ordered:
+        return ParentNode("ul", list_items), index
+    return ParentNode("ol", list_items, {"start": str(number)} if number != 1 else None), index
 
 
-def text_to_children(text: str) -> list[HTMLNode]:
-    text_nodes = text_to_textnodes(text)
-    children = []
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        children.append(html_node)
-    return children
+def table_to_html_node(scan: BlockScan, context: PageContext = None) -> ParentNode:
+    alignments, header, *rows = scan.items
+    head = ParentNode("thead", [table_row_to_html_node(header, "th", alignments, context)])
+    if not rows:
+        return ParentNode("table", [head])
+    body = ParentNode("tbody", [table_row_to_html_node(row, "td", alignments, context) for row in rows])
+    return ParentNode("table", [head, body])
+
 
+def table_row_to_html_node(cells: list[str], tag: str, alignments: list[str | None],
+                           context: PageContext = None) -> ParentNode:
+    html_cells = []
+    for index, alignment in enumerate(alignments):
+        text = cells[index] if index < len(cells) else ""
+        props = {"style": f"text-align: {alignment}"} if alignment else None
+        children = text_to_children(text, context)
+        html_cells.append(ParentNode(tag, children, props))
+    return ParentNode("tr", html_cells)
 
-def get_quote_block_text(md_quote: str) -> str:
-    quote_lines = []
-    for quote_line in md_quote.split("\n"):
-        quote_lines.append(quote_line.lstrip("> "))
 
-    return " ".join(quote_lines)
+def footnote_to_html_node(scan: BlockScan, context: PageContext = None) -> HTMLNode | None:
+    """
+    Registers footnote definitions with the page context, which renders them
+    at the end of the page. Without a context they are rendered in place.
+    """
+    definitions = {}
+    for label, text in scan.items:
+        definitions[label] = text_to_children(text, context)
+    if context is None:
+        return footnotes_to_html_node(list(definitions), definitions)
+    for label, children in definitions.items():
+        context.add_footnote_definition(label, children)
+    return None
+
+
+BLOCK_CONVERTERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.ORDERED_LIST: list_to_html_node,
+    BlockType.UNORDERED_LIST: list_to_html_node,
+    BlockType.TABLE: table_to_html_node,
+    BlockType.FOOTNOTE: footnote_to_html_node,
+}
+
+
+def text_to_children(text: str, context: PageContext = None) -> list[HTMLNode]:
+    text_nodes = parse_inline(text)
+    if context is not None:
+        context.add_text_nodes(text_nodes)
+    return text_nodes_to_children(text_nodes, context)
+
+
+def text_nodes_to_children(text_nodes: list[TextNode], context: PageContext = None) -> list[HTMLNode]:
+    if not text_nodes:
+        # empty list items, table cells, quotes... still need a child to render
+        return [LeafNode(None, "")]
+    if context is not None:
+        number_footnotes(text_nodes, context)
+    return [text_node_to_html_node(text_node) for text_node in text_nodes]
+
+
+def footnote_labels(blocks: list[str]) -> set[str]:
+    """
+    Returns the labels of the footnotes defined in blocks; only blocks
+    starting like a definition are scanned.
+    """
+    labels = set()
+    for block in blocks:
+        if block.startswith("[^"):
+            scan = scan_block(block)
+            if scan.block_type == BlockType.FOOTNOTE:
+                labels.update(label for label, _ in scan.items)
+    return labels
+
+
+def number_footnotes(text_nodes: list[TextNode], context: PageContext):
+    """
+    Replaces the labels of footnote references, including nested ones, with
+    their numbers in order of first reference, see textnode.footnote_anchors.
+    References to footnotes that are not defined stay plain text.
+    """
+    for text_node in text_nodes:
+        if text_node.text_type == TextType.FOOTNOTE:
+            label = text_node.url
+            if not context.is_footnote_defined(label):
+                text_node.text, text_node.text_type, text_node.url = f"[^{label}]", TextType.TEXT, None
+                continue
+            number, count = context.footnote_reference(label)
+            text_node.text = str(number)
+            if count > 1:
+                text_node.url = f"{label} {count}"
+        elif text_node.children:
+            number_footnotes(text_node.children, context)
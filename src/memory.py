@@ -0,0 +1,140 @@
+import os
+
+try:
+    import resource
+except ImportError:  # not on Windows, peak memory is then not reported
+    resource = None
+
+MB = 1024 * 1024
+
+# Memory a page render takes per byte of Markdown, measured with tracemalloc
+# on the blog pages (about 9x) plus allocator overhead; a streamed page holds
+# no HTML string of the whole page, so it takes less
+PAGE_MEMORY_FACTOR = 12
+STREAMED_PAGE_MEMORY_FACTOR = 6
+
+# Sources at least this large are streamed in memory mode
+DEFAULT_STREAM_THRESHOLD = 256 * 1024
+
+SIZE_SUFFIXES = {"K": 1024, "M": MB, "G": 1024 * MB}
+
+
+def parse_size(spec: str) -> int:
+    """
+    Parses a byte size, "800M" -> 838860800, as used by --max-memory.
+    """
+    spec = spec.strip().upper().removesuffix("B")
+    factor = SIZE_SUFFIXES.get(spec[-1:], 1)
+    number = spec[:-1] if spec[-1:] in SIZE_SUFFIXES else spec
+    try:
+        size = int(float(number) * factor)
+    except ValueError:
+        raise ValueError(f"invalid size {spec!r}, expected bytes or a number with K, M or G")
+    if size <= 0:
+        raise ValueError(f"invalid size {spec!r}, must be positive")
+    return size
+
+
+def current_rss() -> int | None:
+    """
+    Returns the resident set size of this process, None where it can't be read.
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak RSS of this process, so that peak_rss measures from now.
+    Only Linux can; elsewhere peak_rss stays the peak of the whole process.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> int | None:
+    """
+    Returns the peak RSS since reset_peak_rss, or since the process started.
+    """
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class MemoryBudget:
+    """
+    RSS ceiling of a build, for small CI runners.
+
+    The build process and every worker of a parallel build each hold an
+    interpreter with the build modules loaded, about the RSS of the build
+    process when the pages start, plus the page they render. The budget
+    starts as many workers as fit with the largest page each, and lets
+    the build process hold the sources of only a few pages waiting for a
+    worker. Sources over stream_threshold are rendered into their file
+    chunk by chunk, without the HTML of the whole page in memory.
+
+    Args:
+        max_rss_bytes (int): Ceiling of the summed RSS of the build and its workers
+        stream_threshold (int): Size of the sources to stream, in bytes
+    """
+
+    def __init__(self, max_rss_bytes: int, stream_threshold: int = DEFAULT_STREAM_THRESHOLD):
+        self.max_rss_bytes = max_rss_bytes
+        self.stream_threshold = stream_threshold
+        self.largest_page: tuple[int, str] | None = None
+
+    def record(self, source_path: str, peak: int):
+        """
+        Records the peak RSS measured while rendering a page.
+        """
+        if self.largest_page is None or peak > self.largest_page[0]:
+            self.largest_page = (peak, source_path)
+
+    def streams(self, source_size: int) -> bool:
+        return source_size >= self.stream_threshold
+
+    def page_memory(self, source_size: int) -> int:
+        factor = STREAMED_PAGE_MEMORY_FACTOR if self.streams(source_size) else PAGE_MEMORY_FACTOR
+        return source_size * factor
+
+    def plan(self, jobs: int, source_sizes: list[int], process_rss: int = None) -> tuple[int, int]:
+        """
+        Picks the number of workers and of pages in flight for the pages.
+
+        Args:
+            jobs (int): Workers asked for, the most the plan uses
+            source_sizes (list[int]): Source sizes of the pages to render
+            process_rss (int): RSS of the build process, measured when None
+
+        Returns:
+            tuple[int, int]: Workers, 1 to render in the build process, and
+                the pages submitted to them at a time
+        """
+        process_rss = process_rss if process_rss is not None else current_rss() or 0
+        largest_source = max(source_sizes, default=0)
+        largest = self.page_memory(largest_source)
+        headroom = self.max_rss_bytes - process_rss
+        workers = min(jobs, len(source_sizes), headroom // (process_rss + largest))
+        if workers <= 1:
+            return 1, 1
+        # besides the running pages, queue one per worker while the build process has room for
+        # its source and the pickled copy sent to the worker
+        spare = headroom - workers * (process_rss + largest)
+        queued = min(workers, spare // max(2 * largest_source, 1))
+        return workers, workers + queued
@@ -0,0 +1,176 @@
+import json
+import os
+
+from buildlog import log
+from sitescan import SiteFile
+
+FRONT_MATTER_DELIMITER = "---"
+
+
+class PageMetadata:
+    """
+    What the site needs to know about a page without rendering it.
+
+    Args:
+        title (str): Text of the first "# " heading, None if the page has none
+        front_matter (dict[str, str]): Fields of the front matter, empty without one
+    """
+
+    __slots__ = ("title", "front_matter")
+
+    def __init__(self, title: str | None, front_matter: dict[str, str]):
+        self.title = title
+        self.front_matter = front_matter
+
+    def __eq__(self, other):
+        return (isinstance(other, PageMetadata) and self.title == other.title
+                and self.front_matter == other.front_matter)
+
+    def __repr__(self):
+        return f"PageMetadata({self.title!r}, {self.front_matter!r})"
+
+
+def parse_front_matter_line(line: str, fields: dict[str, str]):
+    """
+    Adds a "key: value" line to fields, quotes around the value are dropped;
+    blank lines, comments and lines without a colon are ignored.
+    """
+    key, colon, value = line.partition(":")
+    key = key.strip()
+    if not colon or not key or key.startswith("#"):
+        return
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        value = value[1:-1]
+    fields[key] = value
+
+
+def split_front_matter(markdown: str) -> tuple[dict[str, str], str]:
+    """
+    Splits a page into its front matter, the "key: value" lines between a
+    "---" first line and the next "---" line, and the Markdown after it.
+
+    Returns:
+        tuple[dict[str, str], str]: The fields, and the page without its front matter;
+            pages without a closed front matter are returned whole
+    """
+    if markdown.partition("\n")[0].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    lines = markdown.split("\n")
+    for index in range(1, len(lines)):
+        if lines[index].rstrip() == FRONT_MATTER_DELIMITER:
+            fields = {}
+            for line in lines[1:index]:
+                parse_front_matter_line(line, fields)
+            return fields, "\n".join(lines[index + 1:])
+    return {}, markdown
+
+
+def title_of_line(line: str) -> str | None:
+    # the same rule as gencontent.extract_title
+    line = line.strip()
+    return line[2:] if line.startswith("# ") else None
+
+
+def read_page_metadata(path: str) -> PageMetadata:
+    """
+    Reads the metadata of a page from the head of its file: the front matter
+    and the lines up to the first "# " heading, where it stops reading.
+    """
+    fields = {}
+    with open(path, "r", encoding="utf-8") as file:
+        first_line = file.readline()
+        if first_line.rstrip() == FRONT_MATTER_DELIMITER:
+            front_matter_lines = []
+            for line in file:
+                if line.rstrip() == FRONT_MATTER_DELIMITER:
+                    for front_matter_line in front_matter_lines:
+                        parse_front_matter_line(front_matter_line, fields)
+                    break
+                front_matter_lines.append(line)
+            else:
+                # never closed, so it is content like the rest of the page
+                for line in [first_line, *front_matter_lines]:
+                    title = title_of_line(line)
+                    if title is not None:
+                        return PageMetadata(title, {})
+                return PageMetadata(None, {})
+        else:
+            title = title_of_line(first_line)
+            if title is not None:
+                return PageMetadata(title, fields)
+        for line in file:
+            title = title_of_line(line)
+            if title is not None:
+                return PageMetadata(title, fields)
+    return PageMetadata(None, fields)
+
+
+class MetadataCache:
+    """
+    Metadata of the pages kept in the build cache by (mtime, size) of their
+    source, so that only new and changed pages are read again.
+
+    Args:
+        path (str): JSON file holding the cache
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, list] = {}
+        self.changed = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def get(self, file: SiteFile) -> PageMetadata:
+        entry = self.entries.get(file.path)
+        if entry is not None and entry[0] == file.mtime_ns and entry[1] == file.size:
+            return PageMetadata(entry[2], entry[3])
+        metadata = read_page_metadata(file.path)
+        self.entries[file.path] = [file.mtime_ns, file.size, metadata.title, metadata.front_matter]
+        self.changed = True
+        return metadata
+
+    def retain(self, source_paths):
+        """
+        Forgets the pages that are not in source_paths, e.g. deleted ones.
+        Every page in source_paths must have been looked up with get.
+        """
+        if len(self.entries) == len(source_paths):
+            return
+        entries = {source_path: self.entries[source_path] for source_path in source_paths
+                   if source_path in self.entries}
+        self.changed |= len(entries) != len(self.entries)
+        self.entries = entries
+
+    def save(self):
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # json.dumps encodes in one pass in C, json.dump streams through the pure Python encoder
+        data = json.dumps(self.entries, separators=(",", ":"))
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(data)
+        self.changed = False
+
+
+def scan_metadata(files: list[SiteFile], cache: MetadataCache = None) -> dict[str, PageMetadata]:
+    """
+    Reads the metadata of every page, before and without rendering any, e.g.
+    for listings, navigation or a sitemap.
+
+    Args:
+        files (list[SiteFile]): Pages of a site scan
+        cache (MetadataCache): Cache to look pages up in and to update, None to read every page
+
+    Returns:
+        dict[str, PageMetadata]: Metadata keyed by source path, in the order of files
+    """
+    pages = {}
+    for file in files:
+        pages[file.path] = cache.get(file) if cache is not None else read_page_metadata(file.path)
+    if cache is not None:
+        cache.retain(pages)
+    log.debug("metadata_scanned", "Read the metadata of {pages} pages", pages=len(pages))
+    return pages
@@ -0,0 +1,116 @@
+import re
+from typing import Iterator
+
+# Elements whose content is whitespace sensitive and must pass through untouched
+PRESERVED_HTML_PATTERN = re.compile(
+    r"(<(pre|code|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+HTML_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+WHITESPACE_BETWEEN_TAGS_PATTERN = re.compile(r"(</?(!?[a-zA-Z][\w-]*)[^<>]*>)\s+(?=</?(!?[a-zA-Z][\w-]*))")
+LEADING_WHITESPACE_PATTERN = re.compile(r"\A\s+(?=</?(!?[a-zA-Z][\w-]*)|\Z)")
+TRAILING_WHITESPACE_PATTERN = re.compile(r"(?:</?(!?[a-zA-Z][\w-]*)[^<>]*>|\A)\s+\Z")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# A whole tag, whose quoted attribute values may hold < and >, or a whitespace run outside of tags
+TAG_OR_WHITESPACE_PATTERN = re.compile(r"""(<[!/]?[a-zA-Z](?:"[^"]*"|'[^']*'|[^<>"'])*>)|\s+""")
+QUOTED_OR_WHITESPACE_PATTERN = re.compile(r"""("[^"]*"|'[^']*')|\s+""")
+
+# Elements whitespace between which never renders: block-level elements and
+# the ones of <head>. Whitespace between any other tags renders as a space.
+BLOCK_TAGS = frozenset({
+    "!doctype", "address", "article", "aside", "base", "blockquote", "body", "dd", "details", "div", "dl",
+    "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head",
+    "header", "hr", "html", "li", "link", "main", "meta", "nav", "ol", "p", "pre", "script", "section",
+    "style", "summary", "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+})
+
+CSS_TOKEN_PATTERN = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.DOTALL)
+CSS_SPACE_AROUND_PATTERN = re.compile(r"\s*([{};,>])\s*")
+CSS_SPACE_AFTER_COLON_PATTERN = re.compile(r":\s+")
+CSS_LAST_SEMICOLON_PATTERN = re.compile(r";}")
+
+
+def iter_minified_html(html: str) -> Iterator[str]:
+    """
+    Minifies HTML chunk by chunk, leaving <pre>, <code> and friends untouched.
+
+    Comments are dropped, whitespace runs between two block-level tags are
+    removed (template indentation) and all other whitespace runs are
+    collapsed to a single space, which keeps inline spacing intact. Quoted
+    attribute values, such as title and alt texts, are kept as they are.
+
+    Args:
+        html (str): A complete HTML document or fragment
+
+    Yields:
+        str: Chunks of minified HTML, in document order
+    """
+    position = 0
+    previous_tag = None
+    for match in PRESERVED_HTML_PATTERN.finditer(html):
+        yield _collapse_html(html[position:match.start()], previous_tag, match.group(2))
+        yield match.group(1)
+        position = match.end()
+        previous_tag = match.group(2)
+    yield _collapse_html(html[position:], previous_tag, None)
+
+
+def _is_block(tag: str | None) -> bool:
+    return tag is not None and tag.lower() in BLOCK_TAGS
+
+
+def _join_tags(match: re.Match) -> str:
+    if _is_block(match.group(2)) and _is_block(match.group(3)):
+        return match.group(1)
+    return match.group(1) + " "
+
+
+def _collapse_html(fragment: str, previous_tag: str | None, next_tag: str | None) -> str:
+    fragment = HTML_COMMENT_PATTERN.sub("", fragment)
+    fragment = WHITESPACE_BETWEEN_TAGS_PATTERN.sub(_join_tags, fragment)
+    # Fragments border preserved elements, which both start and end with a tag
+    match = LEADING_WHITESPACE_PATTERN.match(fragment)
+    if match is not None and _is_block(previous_tag) and _is_block(match.group(1) or next_tag):
+        fragment = fragment.lstrip()
+    match = TRAILING_WHITESPACE_PATTERN.search(fragment)
+    if match is not None and _is_block(next_tag) and _is_block(match.group(1) or previous_tag):
+        fragment = fragment.rstrip()
+    return TAG_OR_WHITESPACE_PATTERN.sub(_collapse_whitespace, fragment)
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    tag = match.group(1)
+    if tag is None:
+        return " "
+    return QUOTED_OR_WHITESPACE_PATTERN.sub(_keep_quoted, tag)
+
+
+def _keep_quoted(match: re.Match) -> str:
+    return match.group(1) or " "
+
+
+def iter_minified_css(css: str) -> Iterator[str]:
+    """
+    Minifies CSS chunk by chunk: comments are removed and whitespace around
+    punctuation is dropped, string literals are passed through as they are.
+    """
+    position = 0
+    for match in CSS_TOKEN_PATTERN.finditer(css):
+        yield _collapse_css(css[position:match.start()])
+        if match.group(1):
+            yield match.group(1)
+        position = match.end()
+    yield _collapse_css(css[position:])
+
+
+def _collapse_css(fragment: str) -> str:
+    fragment = WHITESPACE_PATTERN.sub(" ", fragment)
+    fragment = CSS_SPACE_AROUND_PATTERN.sub(r"\1", fragment)
+    fragment = CSS_SPACE_AFTER_COLON_PATTERN.sub(":", fragment)
+    return CSS_LAST_SEMICOLON_PATTERN.sub("}", fragment)
+
+
+def minify_html(html: str) -> str:
+    return "".join(iter_minified_html(html)).strip()
+
+
+def minify_css(css: str) -> str:
+    return "".join(iter_minified_css(css)).strip()
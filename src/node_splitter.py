@@ -2,6 +2,10 @@ import re
 
 from textnode import TextNode, TextType
 
+FOOTNOTE_REFERENCE_PATTERN = re.compile(r"\[\^([^\]\s]+)]")
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)]\(([^()]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)]\(([^()]*)\)")
+
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -36,7 +40,7 @@ def extract_markdown_images(text: str):
     :param text: str
     :return: list
     """
-    return re.findall(r"!\[([^\[\]]*)]\(([^()]*)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text: str):
@@ -61,7 +65,28 @@ def extract_markdown_links(text: str):
     :param text: str
     :return: list
     """
-    return re.findall(r"(?<!!)\[([^\[\]]*)]\(([^()]*)\)", text)
+    return LINK_PATTERN.findall(text)
+
+
+def split_text_at_matches(text: str, pattern: re.Pattern, text_type: TextType) -> list[TextNode]:
+    """
+    Splits text at the matches of an image or link pattern.
+
+    The text between matches is sliced by match position in a single pass, so
+    a line with thousands of links is not re-split (and copied) once per link.
+    """
+    nodes = []
+    position = 0
+    for match in pattern.finditer(text):
+        if match.start() > position:
+            nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+        nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+        position = match.end()
+    if position == 0:
+        return [TextNode(text, TextType.TEXT)]
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
+    return nodes
 
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
@@ -91,36 +116,7 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
             new_nodes.append(old_node)
             continue
 
-        extracted_images = extract_markdown_images(old_node.text)
-
-        if len(extracted_images) == 0:
-            new_nodes.append(old_node)
-            continue
-
-        current_text = old_node.text
-
-        for image_alt, image_link in extracted_images:
-            image_markdown = f"![{image_alt}]({image_link})"
-            # Split at the image markdown, max 1 split
-            parts = current_text.split(image_markdown, 1)
-
-            if len(parts) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            # Add text before the image if not empty
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-
-            # Add the image node
-            new_nodes.append(TextNode(image_alt, TextType.IMAGE, image_link))
-
-            # Update current_text to be everything after the image
-            if len(parts) > 1:
-                current_text = parts[1]
-            else:
-                current_text = ""
-
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+        new_nodes.extend(split_text_at_matches(old_node.text, IMAGE_PATTERN, TextType.IMAGE))
 
     return new_nodes
 
@@ -152,37 +148,7 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
             new_nodes.append(old_node)
             continue
 
-        extracted_links = extract_markdown_links(old_node.text)
-
-        if len(extracted_links) == 0:
-            new_nodes.append(old_node)
-            continue
-
-        current_text = old_node.text
-
-        for link_text, link_url in extracted_links:
-            link_markdown = f"[{link_text}]({link_url})"
-
-            # Split at the link markdown, max 1 split
-            parts = current_text.split(link_markdown, 1)
-            if len(parts) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-
-            # Add text before the link if not empty
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-
-            # Add the link node
-            new_nodes.append(TextNode(link_text, TextType.LINK, link_url))
-
-            # Update current_text to be everything after the link
-            if len(parts) > 1:
-                current_text = parts[1]
-            else:
-                current_text = ""
-
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+        new_nodes.extend(split_text_at_matches(old_node.text, LINK_PATTERN, TextType.LINK))
 
     return new_nodes
 
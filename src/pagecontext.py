@@ -0,0 +1,155 @@
+import re
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SPACE_PATTERN = re.compile(r"[\s-]+")
+DEFAULT_SLUG = "section"
+
+
+def slugify(text: str) -> str:
+    """
+    Converts heading text into an anchor slug, e.g. "Why Tom? (Part 2)" -> "why-tom-part-2".
+    """
+    slug = SLUG_STRIP_PATTERN.sub("", text.lower()).strip()
+    slug = SLUG_SPACE_PATTERN.sub("-", slug)
+    return slug or DEFAULT_SLUG
+
+
+class PageContext:
+    """
+    Collects per page data while markdown_to_html_node builds the HTML tree,
+    so later stages (e.g. the search index, the table of contents) don't need
+    another pass over the page.
+
+    Attributes:
+        collect_text (bool): Whether plain text is gathered for indexing
+        text (list[str]): Text of the page in document order
+        headings (list[tuple[int, str, str]]): (level, slug, text) of every heading
+        footnote_numbers (dict[str, int]): Footnote number per label, in order of first reference
+        footnote_references (dict[str, int]): Number of references per label
+        footnote_labels (set[str] | None): Labels of the footnotes defined on the page, None
+            when unknown, every reference then counts as defined
+        footnote_definitions (dict[str, list[HTMLNode]]): Rendered footnote text per label
+        links (list[str]): href of every link of the page, set by gencontent.render_page
+    """
+
+    def __init__(self, collect_text: bool = False):
+        self.collect_text = collect_text
+        self.text: list[str] = []
+        self.headings: list[tuple[int, str, str]] = []
+        self._slug_counts: dict[str, int] = {}
+        self.footnote_numbers: dict[str, int] = {}
+        self.footnote_references: dict[str, int] = {}
+        self.footnote_labels: set[str] | None = None
+        self.footnote_definitions: dict[str, list[HTMLNode]] = {}
+        self.links: list[str] = []
+
+    def add_text_nodes(self, text_nodes: list[TextNode]):
+        if not self.collect_text:
+            return
+        for text_node in text_nodes:
+            if text_node.text_type not in (TextType.IMAGE, TextType.FOOTNOTE):
+                self.text.append(text_node.text)
+
+    def add_text(self, text: str):
+        if self.collect_text:
+            self.text.append(text)
+
+    def add_heading(self, level: int, text_nodes: list[TextNode]) -> str:
+        """
+        Records a heading and returns its unique slug, repeated slugs get a
+        numeric suffix ("usage", "usage-1", "usage-2", ...).
+        """
+        text = "".join(node.text for node in text_nodes if node.text_type != TextType.IMAGE)
+        base_slug = slugify(text)
+        slug = base_slug
+        count = self._slug_counts.get(base_slug, 0)
+        while slug in self._slug_counts:
+            count += 1
+            slug = f"{base_slug}-{count}"
+        self._slug_counts[base_slug] = count
+        self._slug_counts[slug] = 0
+        self.headings.append((level, slug, text))
+        return slug
+
+    def toc_to_html_node(self) -> HTMLNode:
+        """
+        Builds the table of contents as nested lists of links to the headings.
+
+        Headings are processed with a stack of open lists, so this is linear in
+        the number of headings; a level jump (h2 -> h4) nests only one list deeper.
+        """
+        root = []
+        stack = [(0, root)]
+        for level, slug, text in self.headings:
+            while len(stack) > 1 and stack[-1][0] >= level:
+                stack.pop()
+            item_children = [LeafNode("a", text, {"href": f"#{slug}"})]
+            stack[-1][1].append(item_children)
+            stack.append((level, item_children))
+        if not root:
+            return LeafNode(None, "")
+        return ParentNode("nav", [_toc_list_node(root)], {"class": "toc"})
+
+    def is_footnote_defined(self, label: str) -> bool:
+        return self.footnote_labels is None or label in self.footnote_labels
+
+    def footnote_reference(self, label: str) -> tuple[int, int]:
+        """
+        Records a reference to a footnote.
+
+        Returns:
+            tuple[int, int]: The number of the footnote, and the count of its
+                references so far, 1 for the first
+        """
+        count = self.footnote_references.get(label, 0) + 1
+        self.footnote_references[label] = count
+        return self.footnote_number(label), count
+
+    def footnote_number(self, label: str) -> int:
+        number = self.footnote_numbers.get(label)
+        if number is None:
+            number = len(self.footnote_numbers) + 1
+            self.footnote_numbers[label] = number
+        return number
+
+    def add_footnote_definition(self, label: str, children: list[HTMLNode]):
+        self.footnote_definitions[label] = children
+
+    def footnotes_to_html_node(self) -> HTMLNode | None:
+        """
+        Builds the footnote section, referenced footnotes first in reference
+        order, then unreferenced definitions in document order.
+        """
+        if not self.footnote_definitions:
+            return None
+        return footnotes_to_html_node(self.ordered_footnote_labels(self.footnote_definitions), self.footnote_definitions)
+
+    def ordered_footnote_labels(self, definitions) -> list[str]:
+        """
+        Orders the labels of the defined footnotes, see footnotes_to_html_node.
+        """
+        labels = [label for label in self.footnote_numbers if label in definitions]
+        labels += [label for label in definitions if label not in self.footnote_numbers]
+        return labels
+
+
+def footnotes_to_html_node(labels: list[str], definitions: dict[str, list[HTMLNode]]) -> HTMLNode:
+    items = []
+    for label in labels:
+        back_link = LeafNode("a", "\u21a9", {"href": f"#fnref-{label}", "class": "footnote-back"})
+        items.append(ParentNode("li", definitions[label] + [LeafNode(None, " "), back_link], {"id": f"fn-{label}"}))
+    return ParentNode("section", [ParentNode("ol", items)], {"class": "footnotes"})
+
+
+def _toc_list_node(items: list[list[HTMLNode]]) -> ParentNode:
+    list_items = []
+    for item_children in items:
+        # item_children holds the link followed by the items of its sub list
+        children = [item_children[0]]
+        if len(item_children) > 1:
+            children.append(_toc_list_node(item_children[1:]))
+        list_items.append(ParentNode("li", children))
+    return ParentNode("ul", list_items)
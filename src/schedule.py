@@ -0,0 +1,84 @@
+import json
+import os
+
+# Render cost of a byte of Markdown until the history tells better
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+
+class RenderTimes:
+    """
+    Render time history of the pages, kept in the build cache so that each
+    build schedules with the times measured by the previous ones.
+
+    Args:
+        path (str): JSON file holding the history
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.times: dict[str, list] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.times = json.load(file)
+
+    def record(self, source_path: str, seconds: float, size: int):
+        self.times[source_path] = [seconds, size]
+
+    def get(self, source_path: str) -> tuple[float, int] | None:
+        entry = self.times.get(source_path)
+        return None if entry is None else (entry[0], entry[1])
+
+    def retain(self, source_paths):
+        """
+        Forgets the pages that are not in source_paths, e.g. deleted ones.
+        """
+        self.times = {source_path: self.times[source_path] for source_path in source_paths
+                      if source_path in self.times}
+
+    def seconds_per_byte(self) -> float:
+        seconds = sum(entry[0] for entry in self.times.values())
+        size = sum(entry[1] for entry in self.times.values())
+        return seconds / size if seconds > 0 and size > 0 else DEFAULT_SECONDS_PER_BYTE
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.times, file, separators=(",", ":"), sort_keys=True)
+
+
+class PageScheduler:
+    """
+    Orders pages for a worker pool, longest estimated render first (LPT).
+
+    Submitted in source order, a large page that comes last starts when the
+    other workers are nearly done and becomes the tail of the build. Started
+    first, it runs while the other workers go through the small pages, which
+    idle workers take from the pool's shared queue as they finish, so no
+    worker waits while pages are left.
+
+    A page is estimated by its last measured render time, scaled by the
+    change of its size, or else by its size at the average cost per byte
+    of the measured pages.
+
+    Args:
+        render_times (RenderTimes): History of render times, None to use sizes only
+    """
+
+    def __init__(self, render_times: RenderTimes = None):
+        self.render_times = render_times
+        self.seconds_per_byte = render_times.seconds_per_byte() if render_times else DEFAULT_SECONDS_PER_BYTE
+
+    def estimate(self, source_path: str, size: int) -> float:
+        measured = self.render_times.get(source_path) if self.render_times is not None else None
+        if measured is None or measured[1] == 0:
+            return size * self.seconds_per_byte
+        seconds, measured_size = measured
+        return seconds * size / measured_size
+
+    def order(self, pages: list[tuple[str, int]]) -> list[int]:
+        """
+        Returns the indexes of the (source path, size) pages in dispatch order,
+        pages with equal estimates stay in their given order.
+        """
+        costs = [self.estimate(source_path, size) for source_path, size in pages]
+        return sorted(range(len(pages)), key=lambda index: -costs[index])
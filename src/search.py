@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from buildlog import log
+from sitescan import page_url
+
+# A term is a run of two or more letters, digits or underscores, lowercased. Python's
+# unicode \w is exactly [\p{L}\p{N}_], the spelling static/search.js uses for queries.
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+CLIENT_TOKEN_PATTERN = r"[\p{L}\p{N}_]{2,}"
+SEARCH_DIR_NAME = "search"
+
+
+def tokenize_text(chunks: list[str]) -> Counter:
+    """
+    Counts the lowercase word terms of the given text chunks.
+
+    Args:
+        chunks (list[str]): Text of a page, as collected by PageContext
+
+    Returns:
+        Counter: Term frequencies of the page
+    """
+    terms = Counter()
+    for chunk in chunks:
+        terms.update(TOKEN_PATTERN.findall(chunk.lower()))
+    return terms
+
+
+def shard_key(term: str) -> str:
+    first = term[0]
+    return first if first.isascii() and first.isalnum() else "_"
+
+
+def source_digest(markdown: str) -> str:
+    return hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """
+    Incrementally built inverted index of all generated pages.
+
+    Per page postings (term frequencies) are cached by the hash of the page
+    source, so pages that did not change are not tokenized again; their cached
+    postings are merged with the fresh ones when the index is written.
+
+    The index is written to <public_dir>/search/ as docs.json (page list) and
+    one index-<c>.json shard per first character of the terms, so the client
+    only downloads the shards for the terms it looks up.
+    """
+
+    def __init__(self, public_dir: str, cache_path: str, basepath: str = "/"):
+        self.public_dir = public_dir
+        self.basepath = basepath
+        self.cache_path = cache_path
+        self.cached_pages = self._load_cache()
+        self.pages: dict[str, dict] = {}
+
+    def _load_cache(self) -> dict[str, dict]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        with open(self.cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def page_url(self, dest_path: str) -> str:
+        return page_url(dest_path, self.public_dir)
+
+    def is_current(self, url: str, digest: str) -> bool:
+        """
+        Reuses the cached postings of an unchanged page, returns False when
+        the page has to be tokenized and added with add_page.
+        """
+        cached = self.cached_pages.get(url)
+        if cached is None or cached["hash"] != digest:
+            return False
+        self.pages[url] = cached
+        return True
+
+    def add_page(self, url: str, digest: str, title: str, chunks: list[str]):
+        self.pages[url] = {"hash": digest, "title": title, "terms": dict(tokenize_text(chunks))}
+
+    def remove_page(self, url: str):
+        self.pages.pop(url, None)
+
+    def write(self, compressor=None) -> list[str]:
+        """
+        Merges the page postings into the sharded index and saves the cache.
+
+        Returns:
+            list[str]: Paths of the written index files
+        """
+        urls = sorted(self.pages)
+        shards: dict[str, dict[str, list[int]]] = {}
+        for doc_id, url in enumerate(urls):
+            for term, frequency in self.pages[url]["terms"].items():
+                shard = shards.setdefault(shard_key(term), {})
+                shard.setdefault(term, []).extend((doc_id, frequency))
+
+        search_dir = os.path.join(self.public_dir, SEARCH_DIR_NAME)
+        os.makedirs(search_dir, exist_ok=True)
+        docs = [[self.basepath + url[1:], self.pages[url]["title"]] for url in urls]
+        written = [self._write_json(os.path.join(search_dir, "docs.json"), docs)]
+        for key in sorted(shards):
+            postings = {term: shards[key][term] for term in sorted(shards[key])}
+            written.append(self._write_json(os.path.join(search_dir, f"index-{key}.json"), postings))
+        if compressor is not None:
+            for path in written:
+                compressor.submit(path)
+
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as file:
+            json.dump(self.pages, file, separators=(",", ":"))
+
+        log.info("search_index_written", "Wrote search index for {pages} pages to {path}",
+                 pages=len(urls), shards=len(shards), path=search_dir)
+        return written
+
+    @staticmethod
+    def _write_json(path: str, data) -> str:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+        return path
@@ -0,0 +1,197 @@
+import filecmp
+import json
+import os
+import shutil
+import zlib
+
+from buildlog import log
+from buildmanifest import MANIFEST_FILE_NAME as BUILD_MANIFEST_FILE_NAME, load_build_manifest, write_build_manifest
+from compress import Precompressor
+from search import SEARCH_DIR_NAME, SearchIndex
+from sitescan import SiteFile, scan_dir
+
+HASH = "hash"
+SIZE = "size"
+STRATEGIES = (HASH, SIZE)
+MANIFEST_FILE_NAME = "shard.json"
+
+
+class ShardMergeError(Exception):
+    """
+    Raised when shard outputs can't be merged: a shard is missing, they come
+    from different builds, or two shards wrote different files to one path.
+    """
+
+
+class Shard:
+    """
+    One of count shards of the pages of a site, numbered from 1.
+
+    Pages are partitioned deterministically from the content manifest alone,
+    so shards built on different machines from the same checkout never
+    overlap and together cover every page.
+
+    Args:
+        index (int): Number of this shard, 1 to count
+        count (int): Number of shards
+        strategy (str): HASH assigns pages by a hash of their path, which keeps
+            a page on its shard as others are added; SIZE balances the total
+            source size of the shards, a proxy for their render cost
+    """
+
+    def __init__(self, index: int, count: int, strategy: str = HASH):
+        if not 1 <= index <= count:
+            raise ValueError(f"invalid shard {index}/{count}")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"invalid shard strategy: {strategy}")
+        self.index = index
+        self.count = count
+        self.strategy = strategy
+
+    @property
+    def name(self) -> str:
+        return f"{self.index}-of-{self.count}"
+
+    def select(self, files: list[SiteFile]) -> list[SiteFile]:
+        return partition(files, self.count, self.strategy)[self.index - 1]
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parses a "i/N" shard spec, e.g. "2/4", as used by --shard.
+    """
+    index, _, count = spec.partition("/")
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ValueError(f"invalid shard {spec!r}, expected i/N with 1 <= i <= N")
+    return int(index), int(count)
+
+
+def path_hash(rel_path: str) -> int:
+    # crc32 of the "/" separated path, stable across processes and platforms unlike hash()
+    return zlib.crc32(rel_path.replace(os.sep, "/").encode("utf-8"))
+
+
+def partition(files: list[SiteFile], count: int, strategy: str = HASH) -> list[list[SiteFile]]:
+    """
+    Splits files into count shards, each sorted by relative path.
+    """
+    shards = [[] for _ in range(count)]
+    if strategy == HASH:
+        for file in files:
+            shards[path_hash(file.rel_path) % count].append(file)
+    else:
+        # largest first onto the lightest shard, ties go to the lowest shard
+        loads = [0] * count
+        for file in sorted(files, key=lambda file: (-file.size, file.rel_path)):
+            lightest = min(range(count), key=lambda shard: (loads[shard], shard))
+            shards[lightest].append(file)
+            loads[lightest] += file.size
+    for shard in shards:
+        shard.sort(key=lambda file: file.rel_path)
+    return shards
+
+
+def write_shard_manifest(public_dir: str, shard: Shard, basepath: str, pages: dict[str, str],
+                         search_index: SearchIndex):
+    """
+    Records what a shard built next to its output, for merge_shards.
+
+    Args:
+        pages (dict[str, str]): Source path of every page of the shard, keyed by URL
+        search_index (SearchIndex): Index holding the postings of the shard's pages
+    """
+    manifest = {
+        "index": shard.index,
+        "count": shard.count,
+        "strategy": shard.strategy,
+        "basepath": basepath,
+        "pages": pages,
+        "search": search_index.pages,
+    }
+    with open(os.path.join(public_dir, MANIFEST_FILE_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, separators=(",", ":"), sort_keys=True)
+
+
+def load_shard_manifests(shard_dirs: list[str]) -> list[dict]:
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest_path = os.path.join(shard_dir, MANIFEST_FILE_NAME)
+        if not os.path.exists(manifest_path):
+            raise ShardMergeError(f"{shard_dir} has no {MANIFEST_FILE_NAME}, it is not a finished shard build")
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        manifest["dir"] = shard_dir
+        manifests.append(manifest)
+
+    if not manifests:
+        raise ShardMergeError("no shard outputs to merge")
+    first = manifests[0]
+    for manifest in manifests:
+        for key in ("count", "strategy", "basepath"):
+            if manifest[key] != first[key]:
+                raise ShardMergeError(f"{manifest['dir']} has {key} {manifest[key]!r}, "
+                                      f"{first['dir']} has {first[key]!r}")
+    indexes = sorted(manifest["index"] for manifest in manifests)
+    if indexes != list(range(1, first["count"] + 1)):
+        missing = sorted(set(range(1, first["count"] + 1)) - set(indexes))
+        raise ShardMergeError(f"expected shards 1 to {first['count']} once each, missing {missing}, "
+                              f"got {indexes}")
+    return sorted(manifests, key=lambda manifest: manifest["index"])
+
+
+def merge_shards(shard_dirs: list[str], public_dir: str, cache_dir: str) -> dict[str, str]:
+    """
+    Combines the outputs of shard builds into public_dir.
+
+    Every shard copies the static files, so files found in several shards
+    must be identical. The shards' search indexes are rebuilt into one from
+    the postings recorded in their manifests, and their build manifests are
+    combined into the one of the merged output.
+
+    Args:
+        shard_dirs (list[str]): Output directories of all the shards of one build
+        public_dir (str): Directory to merge into, replaced by the merge
+        cache_dir (str): Directory for the compression and search caches
+
+    Returns:
+        dict[str, str]: Source path of every merged page, keyed by URL
+
+    Raises:
+        ShardMergeError: If the shards don't form one complete build
+    """
+    manifests = load_shard_manifests(shard_dirs)
+    if os.path.exists(public_dir):
+        shutil.rmtree(public_dir)
+
+    pages = {}
+    search_pages = {}
+    sources = {}
+    output_sources = {}
+    with Precompressor(os.path.join(cache_dir, "compressed")) as compressor:
+        for manifest in manifests:
+            for file in scan_dir(manifest["dir"]):
+                if (file.rel_path in (MANIFEST_FILE_NAME, BUILD_MANIFEST_FILE_NAME)
+                        or file.rel_path.startswith(SEARCH_DIR_NAME + os.sep)):
+                    continue
+                dest_path = os.path.join(public_dir, file.rel_path)
+                if file.rel_path in sources:
+                    if not filecmp.cmp(sources[file.rel_path], file.path, shallow=False):
+                        raise ShardMergeError(f"{sources[file.rel_path]} and {file.path} differ")
+                    continue
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copyfile(file.path, dest_path)
+                sources[file.rel_path] = file.path
+            pages.update(manifest["pages"])
+            search_pages.update(manifest["search"])
+            if os.path.exists(os.path.join(manifest["dir"], BUILD_MANIFEST_FILE_NAME)):
+                for key, entry in load_build_manifest(manifest["dir"])["files"].items():
+                    output_sources[key] = entry["source"]
+
+        search_index = SearchIndex(public_dir, os.path.join(cache_dir, "search.json"), manifests[0]["basepath"])
+        search_index.pages = search_pages
+        search_index.write(compressor)
+    write_build_manifest(public_dir, output_sources)
+
+    log.info("shards_merged", "Merged {shards} shards with {pages} pages into {path}",
+             shards=len(manifests), pages=len(pages), path=public_dir)
+    return dict(sorted(pages.items()))
@@ -0,0 +1,109 @@
+import os
+
+
+class SiteFile:
+    """
+    A file found by the site scan, with the stat info of its directory entry.
+
+    Args:
+        path (str): Path of the file, below the scanned directory
+        rel_path (str): Path relative to the scanned directory
+        mtime_ns (int): Modification time in nanoseconds
+        size (int): Size in bytes
+    """
+
+    __slots__ = ("path", "rel_path", "mtime_ns", "size")
+
+    def __init__(self, path: str, rel_path: str, mtime_ns: int, size: int):
+        self.path = path
+        self.rel_path = rel_path
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+    @property
+    def state(self) -> tuple[int, int]:
+        return self.mtime_ns, self.size
+
+    def __repr__(self):
+        return f"SiteFile({self.path!r}, {self.rel_path!r}, {self.mtime_ns}, {self.size})"
+
+
+class SiteScan:
+    """
+    Manifest of the site sources, shared by page generation, static copying
+    and the incremental diffing of the builder so the trees are walked once.
+
+    Args:
+        pages (list[SiteFile]): Files below the content directory, sorted by relative path
+        static (list[SiteFile]): Files below the static directory, sorted by relative path
+    """
+
+    def __init__(self, pages: list[SiteFile], static: list[SiteFile]):
+        self.pages = pages
+        self.static = static
+
+
+def scan_dir(directory: str) -> list[SiteFile]:
+    """
+    Lists the files below directory with a single os.scandir walk.
+
+    Directories are told apart by the entry type reported by scandir, so the
+    only stat call per file is the one giving its mtime and size, which the
+    entry caches for every later stage.
+
+    Returns:
+        list[SiteFile]: Files sorted by relative path
+    """
+    files = []
+    pending = [(os.path.normpath(directory), "")]
+    while pending:
+        dir_path, rel_dir = pending.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir():
+                    pending.append((entry.path, rel_path))
+                else:
+                    stat = entry.stat()
+                    files.append(SiteFile(entry.path, rel_path, stat.st_mtime_ns, stat.st_size))
+    files.sort(key=lambda file: file.rel_path)
+    return files
+
+
+def scan_site(content_dir: str, static_dir: str) -> SiteScan:
+    return SiteScan(scan_dir(content_dir), scan_dir(static_dir))
+
+
+def page_destinations(files: list[SiteFile], dest_dir_path: str,
+                      create_dirs: bool = True) -> list[tuple[str, str]]:
+    """
+    Maps content files to (source, destination) page paths, "blog/tom/index.md"
+    -> "docs/blog/tom/index.html", and unless create_dirs is False creates the
+    destination directories.
+    """
+    dest_dir_path = os.path.normpath(dest_dir_path)
+    pages = []
+    for file in files:
+        pages.append((file.path, os.path.join(dest_dir_path, os.path.splitext(file.rel_path)[0] + ".html")))
+    if create_dirs:
+        for directory in {dest_dir_path, *(os.path.dirname(dest_path) for _, dest_path in pages)}:
+            os.makedirs(directory, exist_ok=True)
+    return pages
+
+
+def find_pages(dir_path_content: str, dest_dir_path: str, create_dirs: bool = True) -> list[tuple[str, str]]:
+    """
+    Lists (source, destination) paths of the pages below dir_path_content and,
+    unless create_dirs is False, creates the destination directories.
+    """
+    return page_destinations(scan_dir(dir_path_content), dest_dir_path, create_dirs)
+
+
+def page_url(dest_path: str, public_dir: str) -> str:
+    """
+    Returns the site URL of an output file, "docs/blog/tom/index.html" -> "/blog/tom/".
+    """
+    url = "/" + os.path.relpath(dest_path, public_dir).replace(os.sep, "/")
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return url
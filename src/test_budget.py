@@ -0,0 +1,78 @@
+import pickle
+import threading
+import time
+import unittest
+
+from budget import FAIL, PageBudget, PageBudgetExceeded
+
+
+class TestPageBudget(unittest.TestCase):
+    def test_no_limits(self):
+        budget = PageBudget()
+        budget.check_source("a.md", "x" * 100000)
+        budget.check_output("a.md", "x" * 100000)
+        with budget.watchdog("a.md"):
+            pass
+
+    def test_source_size(self):
+        budget = PageBudget(max_source_bytes=4)
+        budget.check_source("a.md", "abcd")
+        with self.assertRaises(PageBudgetExceeded) as context:
+            # sizes are counted in encoded bytes
+            budget.check_source("a.md", "abcé")
+        self.assertEqual("source_size", context.exception.limit)
+        self.assertEqual("a.md", context.exception.path)
+
+    def test_output_size(self):
+        budget = PageBudget(max_output_bytes=10)
+        budget.check_output("a.md", "<p>abc</p>")
+        with self.assertRaises(PageBudgetExceeded) as context:
+            budget.check_output("a.md", "<p>abcd</p>")
+        self.assertEqual("output_size", context.exception.limit)
+
+    def test_watchdog_interrupts_runaway_page(self):
+        budget = PageBudget(max_render_seconds=0.05)
+        start = time.perf_counter()
+        with self.assertRaises(PageBudgetExceeded) as context:
+            with budget.watchdog("a.md"):
+                while True:
+                    pass
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual("render_time", context.exception.limit)
+
+    def test_watchdog_outside_main_thread(self):
+        budget = PageBudget(max_render_seconds=0.01)
+        errors = []
+
+        def render():
+            try:
+                with budget.watchdog("a.md"):
+                    time.sleep(0.05)
+            except PageBudgetExceeded as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=render)
+        thread.start()
+        thread.join()
+        self.assertEqual(["render_time"], [error.limit for error in errors])
+
+    def test_watchdog_is_disarmed(self):
+        budget = PageBudget(max_render_seconds=0.05)
+        with budget.watchdog("a.md"):
+            pass
+        time.sleep(0.1)
+
+    def test_policy(self):
+        self.assertFalse(PageBudget().fail)
+        self.assertTrue(PageBudget(policy=FAIL).fail)
+        with self.assertRaises(ValueError):
+            PageBudget(policy="ignore")
+
+    def test_error_survives_pickling(self):
+        # pool workers send the error back to the build process
+        error = pickle.loads(pickle.dumps(PageBudgetExceeded("a.md", "render_time", "too slow")))
+        self.assertEqual(("a.md", "render_time", "too slow"), (error.path, error.limit, str(error)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+import unittest
+
+import buildlog
+from builder import SiteBuilder
+from buildlog import log
+from extensions import registry
+from schedule import RenderTimes
+from testutil import TempDirTestCase
+
+
+class TestSiteBuilder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        log.configure(buildlog.INFO, stream=io.StringIO())
+        self.public_dir = os.path.join(self.root, "docs")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body { color: red; }")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post.md", "# Post")
+        self.builder = SiteBuilder(os.path.join(self.root, "static"), self.public_dir,
+                                   os.path.join(self.root, "content"), os.path.join(self.root, "template.html"),
+                                   os.path.join(self.root, ".cache"))
+
+    def tearDown(self):
+        registry.clear()
+        log.configure(buildlog.INFO)
+
+    def build(self, plugins: list[str] = ()) -> int:
+        """
+        Builds and returns the number of pages generated.
+        """
+        log.counts.clear()
+        self.builder.build("/", plugins=plugins)
+        return log.counts["page_generated"]
+
+    def read_output(self, name: str) -> str:
+        with open(os.path.join(self.public_dir, name)) as file:
+            return file.read()
+
+    def test_first_build_generates_everything(self):
+        self.assertEqual(2, self.build())
+        self.assertEqual(1, log.counts["file_copied"])
+        self.assertEqual('<title>Home</title><div><h1 id="home">Home</h1></div>', self.read_output("index.html"))
+
+    def test_unchanged_build_does_nothing(self):
+        self.build()
+        self.assertEqual(0, self.build())
+        self.assertEqual(0, log.counts["file_copied"])
+        self.assertEqual(0, log.counts["search_index_written"])
+
+    def test_changed_page_is_regenerated(self):
+        self.build()
+        self.write("content/blog/post.md", "# Changed")
+        self.assertEqual(1, self.build())
+        self.assertIn("Changed", self.read_output("blog/post.html"))
+
+    def test_deleted_page_is_removed(self):
+        self.build()
+        os.remove(os.path.join(self.root, "content/blog/post.md"))
+        self.assertEqual(0, self.build())
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "blog/post.html")))
+        self.assertEqual(1, log.counts["search_index_written"])
+
+    def test_template_change_regenerates_all_pages(self):
+        self.build()
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(2, self.build())
+
+    def test_dropped_plugin_is_no_longer_applied(self):
+        self.write("plugins/shout.py", "def register(registry):\n"
+                   "    registry.register_post_render(lambda html, source_path, context: html.upper())\n")
+        self.assertEqual(2, self.build([os.path.join(self.root, "plugins/shout.py")]))
+        self.assertIn("<TITLE>HOME</TITLE>", self.read_output("index.html"))
+        self.assertEqual(2, self.build())
+        self.assertEqual([], registry.plugins)
+        self.assertIn("<title>Home</title>", self.read_output("index.html"))
+
+    def test_render_times_are_saved_without_workers(self):
+        self.build()
+        render_times = RenderTimes(self.path(".cache/render-times.json"))
+        self.assertIsNotNone(render_times.get(self.path("content/index.md")))
+        self.assertIsNotNone(render_times.get(self.path("content/blog/post.md")))
+
+    def test_changed_static_file_is_copied(self):
+        self.build()
+        self.write("static/index.css", "body { color: blue; }")
+        self.assertEqual(0, self.build())
+        self.assertEqual(1, log.counts["file_copied"])
+        self.assertIn("blue", self.read_output("index.css"))
+
+    def test_option_change_regenerates_all_pages(self):
+        self.build()
+        log.counts.clear()
+        self.builder.build("/site/")
+        self.assertEqual(2, log.counts["page_generated"])
+
+    def test_deleted_output_starts_over(self):
+        self.build()
+        shutil.rmtree(self.public_dir)
+        self.assertEqual(2, self.build())
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import buildlog
+from buildlog import BuildLog
+
+
+class TestBuildLog(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.log = BuildLog()
+
+    def tearDown(self):
+        self.log.close()
+
+    def test_prints_events_at_or_above_level(self):
+        self.log.configure(buildlog.INFO, stream=self.stream)
+        self.log.debug("file_saved", "saved")
+        self.log.info("page_generated", "generated")
+        self.log.error("read_failed", "failed")
+        self.assertEqual("generated\nfailed\n", self.stream.getvalue())
+
+    def test_quiet_mode_still_counts(self):
+        self.log.configure(buildlog.WARNING, stream=self.stream)
+        for _ in range(3):
+            self.log.info("page_generated", "generated")
+        self.log.info("file_copied", "copied")
+        self.assertEqual("", self.stream.getvalue())
+        self.assertEqual(3, self.log.counts["page_generated"])
+        self.assertEqual("file_copied: 1, page_generated: 3", self.log.summary())
+
+    def test_message_is_formatted_from_fields_when_printed(self):
+        class Unformattable:
+            def __format__(self, spec):
+                raise AssertionError("formatted a filtered event")
+
+        self.log.configure(buildlog.INFO, stream=self.stream)
+        self.log.debug("file_saved", "saved {path}", path=Unformattable())
+        self.log.info("page_generated", "generated {source} in {seconds:.1f}s", source="{index}.md", seconds=0.25)
+        self.assertEqual("generated {index}.md in 0.2s\n", self.stream.getvalue())
+
+    def test_progress_disabled_on_non_interactive_stream(self):
+        self.log.configure(buildlog.WARNING, stream=self.stream, progress=True)
+        self.log.info("page_generated", "generated")
+        self.assertFalse(self.log.progress)
+        self.assertEqual("", self.stream.getvalue())
+
+    def test_event_log_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "events.jsonl")
+            self.log.configure(buildlog.WARNING, stream=self.stream, event_log_path=path)
+            self.log.info("page_generated", "generated", source="content/index.md")
+            self.log.debug("file_saved", path="docs/index.html")
+            self.log.close()
+
+            with open(path, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual(["page_generated", "file_saved"], [record["event"] for record in records])
+        self.assertEqual("info", records[0]["level"])
+        self.assertEqual("content/index.md", records[0]["source"])
+        self.assertEqual("docs/index.html", records[1]["path"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import os
+import unittest
+
+import buildlog
+from builder import SiteBuilder
+from buildlog import log
+from buildmanifest import MANIFEST_FILE_NAME, OutputHashes, build_manifest, load_build_manifest
+from images import file_digest
+from sitescan import scan_dir
+from testutil import TempDirTestCase
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        log.configure(buildlog.INFO, stream=io.StringIO())
+
+    def tearDown(self):
+        log.configure(buildlog.INFO)
+
+    def build(self, public_dir: str) -> SiteBuilder:
+        builder = SiteBuilder(self.path("static"), public_dir, self.path("content"), self.path("template.html"),
+                              self.path(".cache"))
+        builder.build("/")
+        return builder
+
+    def test_files_hashes_and_sources(self):
+        self.write("docs/index.html", "<p>Home</p>")
+        self.write("docs/index.html.gz", "compressed")
+        self.write("docs/search/docs.json", "[]")
+        self.write(f"docs/{MANIFEST_FILE_NAME}", "{}")
+        manifest = build_manifest(self.path("docs"), {"index.html": os.path.join("content", "index.md")})
+
+        self.assertEqual(["index.html", "index.html.gz", "search/docs.json"], list(manifest["files"]))
+        self.assertEqual({"hash": file_digest(self.path("docs/index.html")), "size": 11,
+                          "source": "content/index.md"}, manifest["files"]["index.html"])
+        self.assertEqual("content/index.md", manifest["files"]["index.html.gz"]["source"])
+        self.assertIsNone(manifest["files"]["search/docs.json"]["source"])
+
+    def test_hashes_are_reused_until_the_file_changes(self):
+        self.write("docs/index.html", "<p>Home</p>")
+        hashes = OutputHashes()
+        build_manifest(self.path("docs"), {}, hashes)
+        path = self.path("docs/index.html")
+        hashes.entries[path] = (hashes.entries[path][0], "stale")
+        self.assertEqual("stale", build_manifest(self.path("docs"), {}, hashes)["files"]["index.html"]["hash"])
+
+        self.write("docs/index.html", "<p>Home page</p>")
+        self.assertEqual(file_digest(path), build_manifest(self.path("docs"), {}, hashes)["files"]["index.html"]["hash"])
+        os.remove(path)
+        build_manifest(self.path("docs"), {}, hashes)
+        self.assertEqual({}, hashes.entries)
+
+    def test_builds_are_reproducible(self):
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body { color: red; }")
+        for i in range(5):
+            self.write(f"content/blog/post{i}/index.md", f"# Post {i}\n\nAbout [hobbits](/blog/) number {i}.")
+        self.build(self.path("first"))
+        self.build(self.path("second"))
+
+        trees = []
+        for directory in ("first", "second"):
+            tree = {}
+            for file in scan_dir(self.path(directory)):
+                with open(file.path, "rb") as handle:
+                    tree[file.rel_path] = handle.read()
+            trees.append(tree)
+        self.assertEqual(trees[0], trees[1])
+
+        files = load_build_manifest(self.path("first"))["files"]
+        self.assertEqual(sorted(files), list(files))
+        self.assertEqual(self.path("static/index.css").replace(os.sep, "/"), files["index.css"]["source"])
+        self.assertEqual(self.path("content/blog/post3/index.md").replace(os.sep, "/"),
+                         files["blog/post3/index.html"]["source"])
+        self.assertNotIn(MANIFEST_FILE_NAME, files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import gzip
+import os
+import unittest
+
+import compress
+from compress import Precompressor, is_compressible
+from testutil import TempDirTestCase
+
+
+class TestPrecompressor(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.path("cache")
+
+    def test_writes_gzip_sidecar(self):
+        data = b"<html><body>" + b"<p>Tolkien</p>" * 100 + b"</body></html>"
+        with Precompressor(self.cache_dir) as compressor:
+            compressor.submit(self.path("index.html"), data)
+
+        with open(self.path("index.html.gz"), "rb") as file:
+            self.assertEqual(data, gzip.decompress(file.read()))
+
+    def test_reads_file_when_no_data_given(self):
+        with open(self.path("index.css"), "wb") as file:
+            file.write(b"body { color: red; }")
+        with Precompressor(self.cache_dir) as compressor:
+            compressor.submit(self.path("index.css"))
+
+        with open(self.path("index.css.gz"), "rb") as file:
+            self.assertEqual(b"body { color: red; }", gzip.decompress(file.read()))
+
+    def test_skips_binary_files(self):
+        with Precompressor(self.cache_dir) as compressor:
+            compressor.submit(self.path("tom.png"), b"\x89PNG")
+        self.assertFalse(os.path.exists(self.path("tom.png.gz")))
+
+    def test_unchanged_content_is_not_recompressed(self):
+        calls = []
+
+        def counting_gzip(data):
+            calls.append(data)
+            return compress.gzip_compress(data)
+
+        with Precompressor(self.cache_dir, workers=1) as compressor:
+            compressor.encoders = [(".gz", counting_gzip)]
+            compressor.submit(self.path("a.html"), b"<p>same</p>")
+            compressor.submit(self.path("b.html"), b"<p>same</p>")
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(os.path.exists(self.path("b.html.gz")))
+
+    def test_gzip_output_is_deterministic(self):
+        self.assertEqual(compress.gzip_compress(b"abc" * 50), compress.gzip_compress(b"abc" * 50))
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("docs/index.HTML"))
+        self.assertTrue(is_compressible("docs/index.css"))
+        self.assertFalse(is_compressible("docs/images/tom.png"))
+
+
+if __name__ == '__main__':
+    unittest.main()
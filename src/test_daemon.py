@@ -0,0 +1,81 @@
+import io
+import os
+import threading
+import unittest
+
+import buildlog
+from buildlog import log
+from daemon import BuildDaemon, is_running, parse_args, request
+from extensions import registry
+from testutil import TempDirTestCase
+
+
+class TestBuildDaemon(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cwd = os.getcwd()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body {}")
+        self.write("content/index.md", "# Home")
+        self.socket_path = self.path("build.sock")
+        self.server = BuildDaemon(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        os.chdir(self.cwd)
+        registry.clear()
+        log.configure(buildlog.INFO)
+
+    def build(self, *args: str) -> tuple[int, str]:
+        output = io.StringIO()
+        status = request(self.socket_path, {"command": "build", "cwd": self.root, "args": list(args)}, output)
+        return status, output.getvalue()
+
+    def test_ping(self):
+        self.assertTrue(is_running(self.socket_path))
+        self.assertFalse(is_running(os.path.join(self.root, "missing.sock")))
+
+    def test_builds_are_incremental(self):
+        status, output = self.build()
+        self.assertEqual(0, status)
+        self.assertIn("Generating 1 of 1 pages", output)
+        with open(os.path.join(self.root, "docs", "index.html")) as file:
+            self.assertEqual('<title>Home</title><div><h1 id="home">Home</h1></div>', file.read())
+
+        status, output = self.build()
+        self.assertEqual(0, status)
+        self.assertIn("Generating 0 of 1 pages", output)
+
+    def test_plugins_get_their_own_builder(self):
+        plugin_path = self.write("plugins/shout.py", "def register(registry):\n"
+                                 "    registry.register_post_render(lambda html, source_path, context: html.upper())\n")
+        self.assertEqual(0, self.build()[0])
+        status, output = self.build("--plugin", plugin_path)
+        self.assertEqual(0, status)
+        self.assertIn("Generating 1 of 1 pages", output)
+        self.assertEqual(2, len(self.server.builders))
+        self.assertIn("Generating 0 of 1 pages", self.build("--plugin", plugin_path)[1])
+
+    def test_invalid_arguments(self):
+        status, output = self.build("--no-such-option")
+        self.assertEqual(2, status)
+        self.assertIn("unrecognized arguments", output)
+
+    def test_unknown_command(self):
+        output = io.StringIO()
+        self.assertEqual(2, request(self.socket_path, {"command": "reboot"}, output))
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_build_options_are_passed_on(self):
+        args, build_args = parse_args(["build", "-q", "/site/", "--minify"])
+        self.assertEqual("build", args.command)
+        self.assertEqual(["-q", "/site/", "--minify"], build_args)
+
+
+if __name__ == "__main__":
+    unittest.main()
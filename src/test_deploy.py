@@ -0,0 +1,105 @@
+import os
+import shutil
+import unittest
+
+from buildmanifest import MANIFEST_FILE_NAME, write_build_manifest
+from deploy import DeployError, execute_plan, invalidation_paths, load_manifest, plan_deploy
+from sitescan import scan_dir
+from testutil import TempDirTestCase
+
+
+def manifest(hashes: dict[str, str]) -> dict:
+    return {"version": 1, "files": {key: {"hash": digest, "size": 1, "source": None}
+                                    for key, digest in hashes.items()}}
+
+
+class TestPlanDeploy(unittest.TestCase):
+    def test_plan(self):
+        previous = manifest({"index.html": "a", "about/index.html": "b", "old.css": "c"})
+        current = manifest({"index.html": "a", "about/index.html": "x", "new.css": "d"})
+        plan = plan_deploy(current, previous)
+        self.assertEqual(["about/index.html", "new.css"], plan.upload)
+        self.assertEqual(["old.css"], plan.delete)
+        self.assertEqual(["index.html"], plan.unchanged)
+        self.assertEqual(["/about/", "/about/index.html", "/old.css"], plan.invalidate)
+
+    def test_first_deploy_uploads_everything(self):
+        plan = plan_deploy(manifest({"a": "1", "b": "2"}))
+        self.assertEqual(["a", "b"], plan.upload)
+        self.assertEqual([], plan.delete + plan.unchanged + plan.invalidate)
+
+    def test_invalidation_paths(self):
+        self.assertEqual(["/", "/blog/tom/", "/blog/tom/index.html", "/index.css", "/index.html"],
+                         invalidation_paths(["blog/tom/index.html.gz", "blog/tom/index.html", "index.html",
+                                             "index.css.br"]))
+
+    def test_paths_outside_the_target_are_rejected(self):
+        for key in ("../etc/passwd", "/etc/passwd", "a//b", "a/./b"):
+            with self.assertRaises(DeployError):
+                plan_deploy(manifest({}), {"files": {key: {"hash": "x"}}})
+
+
+class TestExecutePlan(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public_dir = self.path("docs")
+        self.target_dir = self.path("target")
+
+    def deploy(self) -> list[str]:
+        current = write_build_manifest(self.public_dir, {})
+        previous = load_manifest(self.target_dir) if os.path.isdir(self.target_dir) else None
+        plan = plan_deploy(current, previous)
+        execute_plan(plan, self.public_dir, self.target_dir, current)
+        return plan.upload
+
+    def read_tree(self, directory: str) -> dict[str, bytes]:
+        tree = {}
+        for file in scan_dir(directory):
+            with open(file.path, "rb") as handle:
+                tree[file.rel_path] = handle.read()
+        return tree
+
+    def test_target_follows_the_builds(self):
+        self.write("docs/index.html", "home")
+        self.write("docs/blog/tom/index.html", "tom")
+        self.assertEqual(["blog/tom/index.html", "index.html"], self.deploy())
+        self.assertEqual(self.read_tree(self.public_dir), self.read_tree(self.target_dir))
+
+        os.remove(os.path.join(self.public_dir, "blog", "tom", "index.html"))
+        self.write("docs/index.html", "new home")
+        self.assertEqual(["index.html"], self.deploy())
+        self.assertEqual(self.read_tree(self.public_dir), self.read_tree(self.target_dir))
+        self.assertFalse(os.path.exists(os.path.join(self.target_dir, "blog")))
+        self.assertEqual([], self.deploy())
+
+    def test_file_becomes_a_directory_and_back(self):
+        self.write("docs/blog", "blog")
+        self.deploy()
+        os.remove(os.path.join(self.public_dir, "blog"))
+        self.write("docs/blog/index.html", "tom")
+        self.assertEqual(["blog/index.html"], self.deploy())
+        self.assertEqual(self.read_tree(self.public_dir), self.read_tree(self.target_dir))
+        shutil.rmtree(os.path.join(self.public_dir, "blog"))
+        self.write("docs/blog", "blog again")
+        self.assertEqual(["blog"], self.deploy())
+        self.assertEqual(self.read_tree(self.public_dir), self.read_tree(self.target_dir))
+
+    def test_unwritable_target_fails(self):
+        self.write("docs/index.html", "home")
+        with open(self.target_dir, "w") as file:
+            file.write("not a directory")
+        current = write_build_manifest(self.public_dir, {})
+        with self.assertRaises(DeployError):
+            execute_plan(plan_deploy(current), self.public_dir, self.target_dir, current)
+
+    def test_output_changed_after_the_build_fails(self):
+        self.write("docs/index.html", "home")
+        current = write_build_manifest(self.public_dir, {})
+        self.write("docs/index.html", "edited")
+        with self.assertRaises(DeployError):
+            execute_plan(plan_deploy(current), self.public_dir, self.target_dir, current)
+        self.assertFalse(os.path.exists(os.path.join(self.target_dir, MANIFEST_FILE_NAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
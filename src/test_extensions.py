@@ -0,0 +1,211 @@
+import io
+import os
+import tempfile
+import unittest
+
+import buildlog
+import inline_parser
+import markdown_blocks
+from buildlog import log
+from extensions import BlockExtension, InlineRule, PluginError, registry
+from flatir import markdown_to_flat_document
+from gencontent import render_page
+from htmlnode import LeafNode, ParentNode
+from inline_parser import parse_inline
+from markdown_blocks import BlockScan, block_to_block_type, markdown_to_html_node, text_to_children
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+def parse_strikethrough(text: str, position: int) -> tuple[TextNode, int] | None:
+    if not text.startswith("~~", position):
+        return None
+    end = text.find("~~", position + 2)
+    if end == -1:
+        return None
+    children = parse_inline(text[position + 2:end])
+    return TextNode(text[position + 2:end], STRIKETHROUGH, None, children), end + 2
+
+
+def render_strikethrough(text_node: TextNode) -> ParentNode:
+    return ParentNode("del", [text_node_to_html_node(child) for child in text_node.children])
+
+
+def detect_note(scan: BlockScan) -> bool:
+    return scan.lines[0] == ":::note" and scan.lines[-1] == ":::"
+
+
+def render_note(scan: BlockScan, context=None) -> ParentNode:
+    return ParentNode("aside", text_to_children(" ".join(scan.lines[1:-1]), context), {"class": "note"})
+
+
+STRIKETHROUGH = InlineRule("strikethrough", "~", parse_strikethrough, render_strikethrough)
+NOTE = BlockExtension("note", ":", detect_note, render_note)
+
+
+def register(extensions):
+    # this module is also a plugin, see TestLoadPlugins
+    extensions.register_inline(STRIKETHROUGH)
+    extensions.register_block(NOTE)
+
+
+def render_both(markdown: str) -> str:
+    html = markdown_to_html_node(markdown).to_html()
+    assert markdown_to_flat_document(markdown).to_html() == html
+    return html
+
+
+class ExtensionTestCase(unittest.TestCase):
+    def setUp(self):
+        log.configure(buildlog.INFO, stream=io.StringIO())
+
+    def tearDown(self):
+        registry.clear()
+        log.configure(buildlog.INFO)
+
+
+class TestWithoutExtensions(ExtensionTestCase):
+    def test_builtin_tables(self):
+        self.assertIs(markdown_blocks.BLOCK_DETECTORS, markdown_blocks.block_detectors)
+        self.assertIs(inline_parser.PLAIN_TEXT_PATTERN, inline_parser._plain_text_pattern)
+        register(registry)
+        registry.clear()
+        self.assertIs(markdown_blocks.BLOCK_DETECTORS, markdown_blocks.block_detectors)
+        self.assertIs(inline_parser.PLAIN_TEXT_PATTERN, inline_parser._plain_text_pattern)
+
+    def test_syntax_is_text(self):
+        self.assertEqual("<div><p>~~struck~~ wow!</p><p>:::note Text :::</p></div>",
+                         render_both("~~struck~~ wow!\n\n:::note\nText\n:::"))
+
+
+class TestInlineRules(ExtensionTestCase):
+    def setUp(self):
+        super().setUp()
+        registry.register_inline(STRIKETHROUGH)
+
+    def test_rule(self):
+        self.assertEqual([TextNode("a ", TextType.TEXT),
+                          TextNode("b **c**", STRIKETHROUGH, None, [TextNode("b ", TextType.TEXT),
+                                                                   TextNode("c", TextType.BOLD)]),
+                          TextNode(" d~ e!", TextType.TEXT)],
+                         parse_inline("a ~~b **c**~~ d~ e!"))
+
+    def test_render(self):
+        self.assertEqual("<div><p>Was <del>wrong <b>badly</b></del> right, <i><del>not</del></i>.</p></div>",
+                         render_both("Was ~~wrong **badly**~~ right, _~~not~~_."))
+
+    def test_reserved_triggers(self):
+        for triggers in ("", "*", "~`"):
+            with self.assertRaises(ValueError):
+                InlineRule("bad", triggers, parse_strikethrough, render_strikethrough)
+
+    def test_rule_must_consume_text(self):
+        registry.register_inline(InlineRule("empty", "=", lambda text, position: (TextNode("", TextType.TEXT),
+                                                                                    position), None))
+        with self.assertRaises(ValueError):
+            parse_inline("a = b")
+
+
+class TestBlockExtensions(ExtensionTestCase):
+    def setUp(self):
+        super().setUp()
+        registry.register_block(NOTE)
+
+    def test_block_type(self):
+        self.assertIs(NOTE, block_to_block_type(":::note\nText\n:::"))
+        self.assertEqual(markdown_blocks.BlockType.PARAGRAPH, block_to_block_type(":::tip\nText\n:::"))
+
+    def test_render(self):
+        self.assertEqual('<div><h1 id="tom">Tom</h1><aside class="note">Old <b>Tom</b> Bombadil</aside>'
+                         '<p>:: not a note</p></div>',
+                         render_both("# Tom\n\n:::note\nOld **Tom**\nBombadil\n:::\n\n:: not a note"))
+
+    def test_extension_before_builtin(self):
+        callout = BlockExtension("callout", ">", lambda scan: scan.lines[0] == "> [!NOTE]",
+                                 lambda scan, context=None: LeafNode("aside", scan.lines[1][2:]))
+        registry.register_block(callout)
+        self.assertEqual("<div><aside>Text</aside><blockquote>Quote</blockquote></div>",
+                         render_both("> [!NOTE]\n> Text\n\n> Quote"))
+
+    def test_render_nothing(self):
+        registry.register_block(BlockExtension("comment", "%", lambda scan: True, lambda scan, context=None: None))
+        self.assertEqual("<div><p>Text</p></div>", render_both("% hidden\n\nText"))
+
+
+class TestPostRenderHooks(ExtensionTestCase):
+    def test_hook(self):
+        registry.register_post_render(lambda html, source_path, context: html.replace("</body>", "<hr></body>"))
+        _, html, _ = render_page("/site/", "a.md", "# Tom", '<body><a href="/">{{ Title }}</a></body>')
+        self.assertEqual('<body><a href="/site/">Tom</a><hr></body>', html)
+
+
+class TestLoadPlugins(ExtensionTestCase):
+    def test_module(self):
+        registry.load_plugins(["test_extensions", "test_extensions"])
+        self.assertEqual(["test_extensions"], registry.plugins)
+        self.assertEqual('<div><p><del>Tom</del></p><aside class="note">Note</aside></div>',
+                         render_both("~~Tom~~\n\n:::note\nNote\n:::"))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "shout.py")
+            with open(path, "w") as file:
+                file.write("def register(registry):\n"
+                           "    registry.register_post_render(lambda html, source_path, context: html.upper())\n")
+            registry.load_plugins([path])
+            self.assertEqual("TOM", render_page("/", "a.md", "# Tom", "{{ Title }}")[1])
+
+            with open(os.path.join(temp_dir, "empty.py"), "w") as file:
+                file.write("")
+            for plugin in (os.path.join(temp_dir, "empty.py"), os.path.join(temp_dir, "missing.py"),
+                           "no_such_plugin_module"):
+                with self.assertRaises(PluginError):
+                    registry.load_plugins([plugin])
+
+    def test_use_plugins_replaces_the_loaded_plugins(self):
+        registry.use_plugins(["test_extensions"])
+        self.assertEqual("<div><p><del>Tom</del></p></div>", render_both("~~Tom~~"))
+        registry.use_plugins([])
+        self.assertEqual([], registry.plugins)
+        self.assertIs(markdown_blocks.BLOCK_DETECTORS, markdown_blocks.block_detectors)
+        self.assertEqual("<div><p>~~Tom~~</p></div>", render_both("~~Tom~~"))
+        with self.assertRaises(PluginError):
+            registry.use_plugins(["test_extensions", "no_such_plugin_module"])
+        self.assertEqual([], registry.plugins)
+        self.assertIs(inline_parser.PLAIN_TEXT_PATTERN, inline_parser._plain_text_pattern)
+
+    def test_failing_register_leaves_the_registry_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "broken.py")
+            with open(path, "w") as file:
+                file.write("import test_extensions\n\n\n"
+                           "def register(registry):\n"
+                           "    registry.register_inline(test_extensions.STRIKETHROUGH)\n"
+                           "    raise KeyError('config')\n")
+            with self.assertRaises(PluginError) as context:
+                registry.use_plugins(["test_extensions", path])
+        self.assertIn("failed to register", str(context.exception))
+        self.assertEqual([], registry.plugins)
+        self.assertEqual({}, registry.inline_triggers)
+        self.assertIs(markdown_blocks.BLOCK_DETECTORS, markdown_blocks.block_detectors)
+        self.assertEqual("<div><p>~~Tom~~</p></div>", render_both("~~Tom~~"))
+
+    def test_plugin_files_are_told_apart_by_absolute_path(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                for site in ("a", "b"):
+                    os.makedirs(os.path.join(temp_dir, site, "plugins"))
+                    os.chdir(os.path.join(temp_dir, site))
+                    with open("plugins/mark.py", "w") as file:
+                        file.write("def register(registry):\n"
+                                   "    registry.register_post_render(lambda html, source_path, context: "
+                                   f"html + {site!r})\n")
+                    registry.use_plugins(["plugins/mark.py"])
+                    self.assertEqual([os.path.abspath("plugins/mark.py")], registry.plugins)
+                    self.assertEqual("Tom" + site, render_page("/", "a.md", "# Tom", "{{ Title }}")[1])
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
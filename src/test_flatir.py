@@ -0,0 +1,140 @@
+import os
+import random
+import unittest
+
+from flatir import CLOSE, OPEN, TEXT, FlatDocument, markdown_to_flat_document
+from gencontent import html_node_links
+from markdown_blocks import markdown_to_html_node
+from metadata import split_front_matter
+from pagecontext import PageContext
+from sitescan import scan_dir
+from test_fuzz import FUZZ_TOKENS
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+
+MARKDOWN = """# Title
+
+Some **bold _nested_** text with a [link](/blog) and a footnote[^a].
+
+## Title
+
+- one
+- two
+  1. nested
+
+| a | b |
+|:--|--:|
+| 1 | 2 |
+
+> quoted `code`
+
+```python
+x = 1
+```
+
+[^a]: The **note**, see [home](/)."""
+
+
+def render_tree(markdown: str) -> tuple:
+    context = PageContext(collect_text=True)
+    try:
+        html = markdown_to_html_node(markdown, context).to_html()
+    except Exception as error:
+        return type(error), None
+    return html, context.text, context.headings
+
+
+def render_flat(markdown: str) -> tuple:
+    context = PageContext(collect_text=True)
+    try:
+        html = markdown_to_flat_document(markdown, context).to_html()
+    except Exception as error:
+        return type(error), None
+    return html, context.text, context.headings
+
+
+class TestFlatDocument(unittest.TestCase):
+    def test_events(self):
+        document = FlatDocument()
+        document.open("p")
+        document.text("Hi ")
+        document.leaf("a", "there", {"href": "/x"})
+        document.text("")
+        document.close("p")
+        self.assertEqual([
+            (OPEN, "p", None),
+            (TEXT, None, "Hi "),
+            (OPEN, "a", {"href": "/x"}),
+            (TEXT, None, "there"),
+            (CLOSE, "a", None),
+            (CLOSE, "p", None),
+        ], list(document.events()))
+        self.assertEqual('<p>Hi <a href="/x">there</a></p>', document.to_html())
+        self.assertEqual(["/x"], document.links())
+
+    def test_strings_are_interned(self):
+        document = markdown_to_flat_document("\n\n".join(["**word**"] * 100))
+        self.assertEqual(["div", "p", "b", "word"], document.strings)
+        self.assertEqual(len(document.ops), len(document.tags))
+        self.assertEqual(len(document.ops), len(document.values))
+        self.assertEqual([], document.props)
+
+    def test_html_chunks_end_before_tags(self):
+        document = markdown_to_flat_document(MARKDOWN)
+        for chunk_events in (1, 2, 7, 100):
+            chunks = list(document.html_chunks(chunk_events))
+            self.assertEqual(document.to_html(), "".join(chunks))
+            self.assertTrue(all(chunk.startswith("<") for chunk in chunks))
+        self.assertEqual([], list(FlatDocument().html_chunks()))
+
+    def test_props_are_interned_per_tag(self):
+        document = FlatDocument()
+        for tag in ("a", "a", "link", "a"):
+            document.leaf(tag, "x", {"href": "/blog"})
+        document.leaf("a", "y", {"href": "/"})
+        self.assertEqual([{"href": "/blog"}, {"href": "/blog"}, {"href": "/"}], document.props)
+        self.assertEqual('<a href="/blog">x</a><a href="/blog">x</a><link href="/blog">x</link>'
+                         '<a href="/blog">x</a><a href="/">y</a>', document.to_html())
+        self.assertEqual(["/blog", "/blog", "/blog", "/"], document.links())
+
+    def test_renders_like_the_tree(self):
+        self.assertEqual(render_tree(MARKDOWN), render_flat(MARKDOWN))
+        self.assertEqual(render_tree(""), render_flat(""))
+        footnotes = "a[^1] b[^1] c[^x]\n\n[^1]: note[^1] [^2]\n\n[^2]: other"
+        self.assertEqual(render_tree(footnotes), render_flat(footnotes))
+
+    def test_content_renders_like_the_tree(self):
+        files = scan_dir(CONTENT_DIR)
+        self.assertTrue(files)
+        for file in files:
+            with self.subTest(file.rel_path):
+                with open(file.path, encoding="utf-8") as handle:
+                    _, markdown = split_front_matter(handle.read())
+                self.assertEqual(render_tree(markdown), render_flat(markdown))
+                self.assertEqual(html_node_links(markdown_to_html_node(markdown)),
+                                 markdown_to_flat_document(markdown).links())
+
+    def test_random_documents_render_like_the_tree(self):
+        rng = random.Random(43)
+        for _ in range(1000):
+            markdown = "".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 40)))
+            self.assertEqual(render_tree(markdown), render_flat(markdown), repr(markdown))
+
+    def test_text_code_and_attributes_are_escaped(self):
+        markdown = '# A <b> & "c"\n\n[< Back](/a?b=1&c="2") `<i>`\n\n```html\n<p class="x">&amp;</p>\n```'
+        html = markdown_to_flat_document(markdown).to_html()
+        self.assertEqual(render_tree(markdown)[0], html)
+        self.assertIn('<h1 id="a-b-c">A &lt;b&gt; &amp; "c"</h1>', html)
+        self.assertIn('<a href="/a?b=1&amp;c=&quot;2&quot;">&lt; Back</a> <code>&lt;i&gt;</code>', html)
+        self.assertNotIn("<p class", html)
+        self.assertIn("&amp;amp;", html)
+
+    def test_consumers(self):
+        document = markdown_to_flat_document(MARKDOWN)
+        self.assertEqual(["/blog", "#fn-a", "/", "#fnref-a"], document.links())
+        self.assertEqual([(1, "title", "Title"), (2, "title-1", "Title")], document.headings())
+        self.assertIn("nested", document.text_chunks())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import gc
+import random
+import re
+import time
+import unittest
+
+from flatir import markdown_to_flat_document
+from inline_parser import parse_inline
+from markdown_blocks import markdown_to_html_node
+from node_splitter import split_nodes_image, split_nodes_link
+from textnode import TextNode, TextType
+
+# Worst case inputs, each a function of a repeat count n that grows the input linearly in n
+PATHOLOGICAL_MARKDOWN = {
+    "unmatched asterisks": lambda n: "*" * n,
+    "unmatched underscores": lambda n: "a _" * n,
+    "alternating delimiters": lambda n: "*a _b " * n + "c* d_ " * n,
+    "deep emphasis": lambda n: "*" * n + "a" + "*" * n,
+    "deep mixed emphasis": lambda n: "**x _y " * n + "a" + " y_ x**" * n,
+    "unmatched backticks": lambda n: "` ``" * n,
+    "deep brackets": lambda n: "[" * n + "a" + "]" * n,
+    "deep link text": lambda n: "[" * n + "a](/u)",
+    "unclosed link destinations": lambda n: "[a](" * n,
+    "unclosed images": lambda n: "![a](/u " * n,
+    "links in one line": lambda n: "[a](/u) " * n,
+    "images in one line": lambda n: "![a](/u.png) " * n,
+    "emphasis around links": lambda n: "**[" * n + "a" + "](/u)**" * n,
+    "footnote references": lambda n: "x[^a] " * n,
+    "unterminated fence": lambda n: "```python\n" + "x = 1\n" * n,
+    "fence of backticks": lambda n: "```\n" + "`" * n + "\n```",
+    "deeply nested list": lambda n: "\n".join("  " * (i % 64) + "- a" for i in range(n)),
+    "long quote": lambda n: "\n".join("> a *b*" for _ in range(n)),
+    "wide table": lambda n: "|" + "a|" * n + "\n|" + "-|" * n,
+    "broken table delimiter": lambda n: "a|b\n" + "| - " * n + "x",
+    "many blocks": lambda n: "a\n\n" * n,
+}
+
+# Pieces random documents are made of, biased towards syntax characters
+FUZZ_TOKENS = ["*", "**", "_", "`", "```", "```py\n", "[", "]", "(", ")", "![", "[^", "]:", "\\", "#", "# ",
+               "> ", "- ", "1. ", "|", "-", ":", " ", "  ", "\t", "\n", "\n\n", "a", "word", "x_y", "/u", "é"]
+
+
+def best_time(func, argument) -> float:
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            func(argument)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        gc.enable()
+
+
+def render(markdown: str) -> str:
+    return markdown_to_html_node(markdown).to_html()
+
+
+def render_flat(markdown: str) -> str:
+    return markdown_to_flat_document(markdown).to_html()
+
+
+# Both ways pages are rendered, see gencontent.render_page and stream_page
+RENDERERS = {"tree": render, "flat": render_flat}
+
+
+def max_nesting(html: str, tag: str) -> int:
+    depth = deepest = 0
+    for match in re.finditer(f"<(/?){tag}>", html):
+        depth += -1 if match.group(1) else 1
+        deepest = max(deepest, depth)
+    return deepest
+
+
+class TestPathologicalInputs(unittest.TestCase):
+    def assert_linear(self, func, make_input, n: int = 1000):
+        """
+        Asserts func takes well under 16 times as long on an input 4 times as
+        large, which quadratic behaviour would.
+        """
+        small_time = best_time(func, make_input(n))
+        large_time = best_time(func, make_input(n * 4))
+        # the floor keeps timer noise on tiny inputs from failing the test
+        self.assertLess(large_time, max(small_time, 0.01) * 10)
+
+    def test_markdown_to_html(self):
+        for renderer, func in RENDERERS.items():
+            for name, make_input in PATHOLOGICAL_MARKDOWN.items():
+                with self.subTest(renderer=renderer, input=name):
+                    self.assert_linear(func, make_input)
+
+    def test_parse_inline(self):
+        for name in ("unmatched asterisks", "deep emphasis", "deep brackets", "unclosed link destinations"):
+            with self.subTest(name):
+                self.assert_linear(parse_inline, PATHOLOGICAL_MARKDOWN[name])
+
+    def test_split_nodes_link(self):
+        self.assert_linear(lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]),
+                           PATHOLOGICAL_MARKDOWN["links in one line"])
+
+    def test_split_nodes_image(self):
+        self.assert_linear(lambda text: split_nodes_image([TextNode(text, TextType.TEXT)]),
+                           PATHOLOGICAL_MARKDOWN["images in one line"])
+
+    def test_deep_nesting_is_capped(self):
+        for renderer, func in RENDERERS.items():
+            with self.subTest(renderer):
+                html = func(PATHOLOGICAL_MARKDOWN["deep emphasis"](10000))
+                self.assertEqual(32, max_nesting(html, "b"))
+                html = func(PATHOLOGICAL_MARKDOWN["deeply nested list"](1000))
+                self.assertEqual(32, max_nesting(html, "ul"))
+
+
+class TestRandomInputs(unittest.TestCase):
+    def test_random_documents_render(self):
+        rng = random.Random(35)
+        for _ in range(2000):
+            markdown = "".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(0, 80)))
+            for renderer, func in RENDERERS.items():
+                try:
+                    func(markdown)
+                except Exception as error:
+                    self.fail(f"{renderer}: {type(error).__name__}: {error} for {markdown!r}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,17 @@
+import hashlib
+import io
+import os
+import time
 import unittest
 
-from gencontent import extract_title
+import buildlog
+from budget import FAIL, PageBudget, PageBudgetExceeded
+from buildlog import log
+from extensions import registry
+from gencontent import (_render_page_in_worker, extract_title, generate_pages, generate_pages_recursive, render_page,
+                        stream_page)
+from memory import MB, MemoryBudget
+from testutil import TempDirTestCase
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -40,5 +51,141 @@ More content
         self.assertEqual(expected, str(context.exception))
 
 
+class TestGeneratePagesRecursive(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        log.configure(buildlog.WARNING, stream=io.StringIO())
+        self.content_dir = self.path("content")
+        self.template_path = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write_page("index.md", "# Home\n\n[Blog](/blog)")
+        self.write_page("blog/post.md", "# Post\n\n```python\nx = 1\n```")
+        self.write_page("blog/big.md", "# Big\n\n" + "word " * 1000)
+
+    def tearDown(self):
+        log.configure(buildlog.INFO)
+
+    def write_page(self, name: str, markdown: str):
+        self.write(os.path.join("content", name), markdown)
+
+    def build(self, name: str, **kwargs) -> dict[str, str]:
+        public_dir = self.path(name)
+        generate_pages_recursive("/site/", self.content_dir, self.template_path, public_dir, **kwargs)
+        pages = {}
+        for dir_path, _, file_names in os.walk(public_dir):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path) as file:
+                    pages[os.path.relpath(path, public_dir)] = file.read()
+        return pages
+
+    def test_generates_every_page(self):
+        pages = self.build("docs")
+        self.assertEqual({"index.html", os.path.join("blog", "post.html"), os.path.join("blog", "big.html")},
+                         set(pages))
+        self.assertEqual('<title>Home</title><div><h1 id="home">Home</h1><p><a href="/site/blog">Blog</a></p></div>', pages["index.html"])
+
+    def test_pool_matches_sequential(self):
+        self.assertEqual(self.build("sequential"), self.build("parallel", jobs=2))
+
+    def test_worker_writes_page_and_returns_metadata(self):
+        dest_path = self.path("index.html")
+        page = _render_page_in_worker("/site/", "index.md", dest_path, "# Home\n\n[Blog](/blog)",
+                                      "<title>{{ Title }}</title>{{ Content }}", False, True, None)
+        with open(dest_path, "rb") as file:
+            data = file.read()
+        self.assertEqual(len(data), page.size)
+        self.assertEqual(hashlib.sha256(data).hexdigest(), page.digest)
+        self.assertEqual(["/blog"], page.links)
+        self.assertEqual("Home", page.title)
+        self.assertIn("Blog", page.text)
+        self.assertFalse(hasattr(page, "html"))
+
+    def test_memory_budget_matches_sequential(self):
+        expected = self.build("sequential")
+        for jobs in (1, 2):
+            memory = MemoryBudget(1024 * MB, stream_threshold=100)
+            self.assertEqual(expected, self.build(f"memory-{jobs}", memory=memory, jobs=jobs))
+            if memory.largest_page is not None:
+                self.assertGreater(memory.largest_page[0], 0)
+
+    def test_streamed_page_matches_rendered_page(self):
+        markdown = ("# Home\n\n## Intro\n\n![Tom](/images/tom.png) [Blog](/blog) a < b\n\n"
+                    + "\n\n".join(f"Paragraph **{i}** [link](/p/{i})" for i in range(3000)) + "\n\n[^1]: note")
+        template = '<title>{{ Title }}</title><nav>{{ TOC }}</nav><a href="/">{{ Content }}</a>{{ Content }}'
+        dest_path = self.path("page.html")
+        title, context, digest, size = stream_page("/site/", "page.md", markdown, template, dest_path, True)
+        expected_title, html_page, expected_context = render_page("/site/", "page.md", markdown, template, False, True)
+        with open(dest_path, "rb") as file:
+            data = file.read()
+        self.assertEqual(html_page.encode("utf-8"), data)
+        self.assertEqual((expected_title, len(data), hashlib.sha256(data).hexdigest()), (title, size, digest))
+        self.assertEqual(expected_context.links, context.links)
+        self.assertEqual(expected_context.text, context.text)
+
+    def test_streamed_page_over_budget_leaves_no_file(self):
+        dest_path = self.path("page.html")
+        with self.assertRaises(PageBudgetExceeded):
+            stream_page("/", "page.md", "# Big\n\n" + "word " * 1000, "{{ Content }}", dest_path,
+                        budget=PageBudget(max_output_bytes=1000))
+        self.assertFalse(os.path.exists(dest_path))
+        self.assertEqual(["content", "template.html"], sorted(os.listdir(self.root)))
+
+    def test_budget_skips_page(self):
+        budget = PageBudget(max_source_bytes=1000)
+        pages = self.build("docs", budget=budget)
+        self.assertNotIn(os.path.join("blog", "big.html"), pages)
+        self.assertEqual(1, log.counts["page_skipped"])
+        pages = self.build("parallel", budget=budget, jobs=2)
+        self.assertNotIn(os.path.join("blog", "big.html"), pages)
+        self.assertIn("index.html", pages)
+
+    def test_budget_fails_build(self):
+        budget = PageBudget(max_output_bytes=1000, policy=FAIL)
+        with self.assertRaises(PageBudgetExceeded):
+            self.build("docs", budget=budget)
+        with self.assertRaises(PageBudgetExceeded):
+            self.build("parallel", budget=budget, jobs=2)
+
+    def test_missing_source_is_skipped(self):
+        # e.g. deleted after the site was scanned
+        pages = [(self.path("content/index.md"), self.path("index.html")),
+                 (self.path("content/gone.md"), self.path("gone.html"))]
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                log.counts.clear()
+                written = generate_pages("/", pages, self.template_path, jobs=jobs, search_index=None,
+                                         memory=MemoryBudget(1024 * MB))
+                self.assertEqual([self.path("content/index.md")], written)
+                self.assertEqual(1, log.counts["read_failed"])
+                self.assertFalse(os.path.exists(self.path("gone.html")))
+
+    def test_pool_terminates_page_stuck_past_the_watchdog(self):
+        # the hook stands in for C code the SIGALRM watchdog can't interrupt
+        plugin_path = self.path("stuck.py")
+        with open(plugin_path, "w") as file:
+            file.write("import signal, time\n\n\n"
+                       "def hang(html, source_path, context):\n"
+                       "    if 'stuck' in source_path:\n"
+                       "        signal.signal(signal.SIGALRM, signal.SIG_IGN)\n"
+                       "        time.sleep(60)\n"
+                       "    return html\n\n\n"
+                       "def register(registry):\n"
+                       "    registry.register_post_render(hang)\n")
+        self.write_page("stuck.md", "# Stuck")
+        registry.use_plugins([plugin_path])
+        try:
+            start = time.monotonic()
+            pages = self.build("parallel", budget=PageBudget(max_render_seconds=0.1), jobs=2)
+            self.assertLess(time.monotonic() - start, 30)
+            self.assertEqual({"index.html", os.path.join("blog", "post.html"), os.path.join("blog", "big.html")},
+                             set(pages))
+            self.assertEqual(1, log.counts["page_skipped"])
+            with self.assertRaises(PageBudgetExceeded) as context:
+                self.build("failed", budget=PageBudget(max_render_seconds=0.1, policy=FAIL), jobs=2)
+            self.assertEqual("render_time", context.exception.limit)
+        finally:
+            registry.clear()
+
+
 if __name__ == '__main__':
     unittest.main()
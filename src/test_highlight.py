@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import highlight
+from highlight import (cached_tokenize, highlight_to_html_nodes, load_highlight_cache, resolve_language,
+                       save_highlight_cache, tokenize)
+from markdown_blocks import markdown_to_html_node
+
+
+class TestResolveLanguage(unittest.TestCase):
+    def test_aliases(self):
+        self.assertEqual("python", resolve_language("py"))
+        self.assertEqual("bash", resolve_language("Shell"))
+        self.assertEqual("go", resolve_language("go"))
+
+    def test_unknown_language(self):
+        self.assertIsNone(resolve_language("elflang"))
+        self.assertIsNone(resolve_language(""))
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokens_concatenate_to_source(self):
+        code = 'def main():\n    # greet\n    print("Aiya", 42)\n'
+        tokens = tokenize("python", code)
+        self.assertEqual(code, "".join(text for _, text in tokens))
+
+    def test_python_tokens(self):
+        tokens = [token for token in tokenize("python", 'def f(): return "x"  # done') if token[0]]
+        self.assertEqual([["keyword", "def"], ["keyword", "return"], ["string", '"x"'], ["comment", "# done"]],
+                         tokens)
+
+    def test_keyword_inside_string_is_string(self):
+        tokens = tokenize("go", 'fmt.Println("func return")')
+        self.assertIn(["string", '"func return"'], tokens)
+        self.assertNotIn(["keyword", "func"], tokens)
+
+    def test_bash_variable_is_not_comment(self):
+        tokens = tokenize("bash", 'echo $# ${HOME} # note')
+        self.assertIn(["variable", "$#"], tokens)
+        self.assertIn(["variable", "${HOME}"], tokens)
+        self.assertIn(["comment", "# note"], tokens)
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_snippet_is_tokenized_once(self):
+        code = "package main // cached"
+        first = cached_tokenize("go", code)
+        original_tokenize = highlight.tokenize
+        highlight.tokenize = None
+        try:
+            self.assertIs(first, cached_tokenize("go", code))
+        finally:
+            highlight.tokenize = original_tokenize
+
+    def test_cache_survives_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "highlight.json")
+            load_highlight_cache(cache_path)
+            tokens = cached_tokenize("json", '{"a": 1}')
+            save_highlight_cache(cache_path)
+            highlight._token_cache.clear()
+
+            load_highlight_cache(cache_path)
+            original_tokenize = highlight.tokenize
+            highlight.tokenize = None
+            try:
+                self.assertEqual(tokens, cached_tokenize("json", '{"a": 1}'))
+            finally:
+                highlight.tokenize = original_tokenize
+
+    def test_worker_updates_are_merged(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "highlight.json")
+            load_highlight_cache(cache_path)
+            cached_tokenize("json", "[1]")
+            parent_tokens = highlight.highlight_cache_tokens()
+
+            # what a pool worker does with the cache it was started with
+            highlight.use_highlight_cache_tokens(parent_tokens)
+            cached_tokenize("json", "[1]")
+            tokens = cached_tokenize("json", "[2]")
+            used_keys, new_tokens = highlight.take_highlight_cache_updates()
+            self.assertEqual(2, len(used_keys))
+            self.assertEqual([tokens], list(new_tokens.values()))
+            self.assertEqual(([], {}), highlight.take_highlight_cache_updates())
+
+            load_highlight_cache(cache_path)
+            highlight.merge_highlight_cache_updates(used_keys, new_tokens)
+            save_highlight_cache(cache_path)
+            highlight._token_cache.clear()
+            load_highlight_cache(cache_path)
+            self.assertEqual(2, len(highlight.highlight_cache_tokens()))
+
+
+class TestHighlightedCodeBlock(unittest.TestCase):
+    def test_html_nodes(self):
+        html = "".join(node.to_html() for node in highlight_to_html_nodes("python", "x = None"))
+        self.assertEqual('x = <span class="tok-keyword">None</span>', html)
+
+    def test_fenced_block_with_language(self):
+        md = "```py\nimport os\n```"
+        html = markdown_to_html_node(md).to_html()
+        expected = ('<div><pre><code class="language-python"><span class="tok-keyword">import</span> os\n'
+                    '</code></pre></div>')
+        self.assertEqual(expected, html)
+
+    def test_fenced_block_with_unknown_language_is_plain(self):
+        md = "```elflang\nfunc main(){}\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual("<div><pre><code>func main(){}\n</code></pre></div>", html)
+
+
+if __name__ == '__main__':
+    unittest.main()
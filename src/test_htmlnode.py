@@ -1,6 +1,7 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import htmlnode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text, props_to_html, tag_fragments
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -136,5 +137,49 @@ class TestParentNode(unittest.TestCase):
         )
 
 
+class TestEscaping(unittest.TestCase):
+    def test_clean_text_is_returned_as_is(self):
+        text = "Plain text, with 'quotes' and \"double quotes\""
+        self.assertIs(text, escape_text(text))
+        self.assertIs("/blog/tom", escape_attribute("/blog/tom"))
+
+    def test_escape_text(self):
+        self.assertEqual("a &lt;b&gt; &amp;amp; c \"d\"", escape_text('a <b> &amp; c "d"'))
+
+    def test_escape_attribute(self):
+        self.assertEqual("/search?q=&quot;x&quot;&amp;page=&lt;1&gt;", escape_attribute('/search?q="x"&page=<1>'))
+
+    def test_leaf_and_props_are_escaped(self):
+        node = LeafNode("a", "< Back & forth", {"href": '/a?b=1&c="2"'})
+        self.assertEqual('<a href="/a?b=1&amp;c=&quot;2&quot;">&lt; Back &amp; forth</a>', node.to_html())
+        self.assertEqual("x &lt; y", LeafNode(None, "x < y").to_html())
+
+
+class TestFragmentCaches(unittest.TestCase):
+    def test_equal_props_share_one_string(self):
+        first = props_to_html({"href": "/blog", "class": "nav"})
+        self.assertEqual(' href="/blog" class="nav"', first)
+        self.assertIs(first, props_to_html({"href": "/blog", "class": "nav"}))
+        self.assertEqual(' class="nav" href="/blog"', props_to_html({"class": "nav", "href": "/blog"}))
+
+    def test_cached_props_are_escaped(self):
+        self.assertEqual(' title="&quot;x&quot;"', props_to_html({"title": '"x"'}))
+        self.assertEqual(' title="&quot;x&quot;"', props_to_html({"title": '"x"'}))
+
+    def test_props_cache_is_bounded(self):
+        for i in range(htmlnode.PROPS_CACHE_SIZE + 10):
+            props_to_html({"href": f"/page-{i}"})
+        self.assertLessEqual(len(htmlnode._props_html), htmlnode.PROPS_CACHE_SIZE)
+        self.assertEqual(' href="/page-1"', props_to_html({"href": "/page-1"}))
+
+    def test_tag_fragments(self):
+        self.assertEqual(("<code>", "</code>"), tag_fragments("code"))
+        self.assertIs(tag_fragments("code"), tag_fragments("code"))
+
+    def test_empty_props_render_no_attributes(self):
+        self.assertEqual("", HTMLNode("p", "x", None, {}).props_to_html())
+        self.assertEqual("<b>x</b>", LeafNode("b", "x", {}).to_html())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
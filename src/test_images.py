@@ -0,0 +1,152 @@
+import io
+import os
+import struct
+import unittest
+import zlib
+
+import buildlog
+import images
+from buildlog import log
+from gencontent import SRCSET_PATTERN, srcset_with_basepath
+from images import image_entry_to_props, image_props, process_images, read_image_size, register_images
+from testutil import TempDirTestCase
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+def make_png(width: int, height: int) -> bytes:
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        body = chunk_type + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    raw = b"".join(b"\x00" + b"\x00\x00\x00" * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+class TestReadImageSize(TempDirTestCase):
+
+    def test_png(self):
+        path = self.write("a.png", make_png(7, 3))
+        self.assertEqual((7, 3), read_image_size(path))
+
+    def test_gif(self):
+        path = self.write("a.gif", b"GIF89a" + struct.pack("<HH", 640, 480) + b"\x00" * 16)
+        self.assertEqual((640, 480), read_image_size(path))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof0 = b"\xff\xc0" + struct.pack(">HBHH", 11, 8, 200, 300) + b"\x00" * 4
+        path = self.write("a.jpg", b"\xff\xd8" + app0 + sof0)
+        self.assertEqual((300, 200), read_image_size(path))
+
+    def test_unknown_format(self):
+        path = self.write("a.png", b"not an image at all, just text")
+        self.assertIsNone(read_image_size(path))
+
+    def test_truncated_headers(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        for name, data in [("sof.jpg", b"\xff\xd8" + app0 + b"\xff\xc0\x00\x0b\x08\x00"),
+                           ("length.jpg", b"\xff\xd8\xff\xe0\x00"),
+                           ("zero.jpg", b"\xff\xd8\xff\xe0\x00\x00"),
+                           ("ihdr.png", make_png(7, 3)[:20])]:
+            with self.subTest(name):
+                self.assertIsNone(read_image_size(self.write(name, data)))
+
+
+class TestProcessImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.path("static")
+        self.public_dir = self.path("public")
+        self.cache_dir = self.path("cache")
+        os.makedirs(os.path.join(self.public_dir, "images"))
+        self.write("static/images/tom.png", make_png(12, 8))
+        self.write("static/index.css", "body {}")
+
+    def tearDown(self):
+        register_images({})
+
+    def test_records_dimensions(self):
+        manifest = process_images(self.static_dir, self.public_dir, self.cache_dir, workers=1)
+        self.assertEqual(["/images/tom.png"], list(manifest))
+        self.assertEqual(12, manifest["/images/tom.png"]["width"])
+        self.assertEqual(8, manifest["/images/tom.png"]["height"])
+
+    def test_unchanged_image_is_not_reprocessed(self):
+        first = process_images(self.static_dir, self.public_dir, self.cache_dir, workers=1)
+        original_read = images.read_image_size
+        images.read_image_size = None
+        try:
+            second = process_images(self.static_dir, self.public_dir, self.cache_dir, workers=1)
+        finally:
+            images.read_image_size = original_read
+        self.assertEqual(first, second)
+
+    def test_truncated_image_is_skipped_with_a_warning(self):
+        self.write("static/images/broken.jpg", b"\xff\xd8\xff\xe0\x00")
+        log.configure(buildlog.WARNING, stream=io.StringIO())
+        self.addCleanup(log.configure, buildlog.INFO)
+        manifest = process_images(self.static_dir, self.public_dir, self.cache_dir, workers=1)
+        self.assertEqual(["/images/tom.png"], list(manifest))
+        self.assertEqual(1, log.counts["image_skipped"])
+
+    def test_registered_image_props(self):
+        register_images(process_images(self.static_dir, self.public_dir, self.cache_dir, workers=1))
+        html_node = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"))
+        self.assertEqual("12", html_node.props["width"])
+        self.assertEqual("8", html_node.props["height"])
+        self.assertEqual("lazy", html_node.props["loading"])
+        self.assertEqual({}, image_props("https://example.com/tom.png"))
+
+
+@unittest.skipIf(images.Image is None, "Pillow is not installed")
+class TestEncodeVariants(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.path("static")
+        self.public_dir = self.path("public")
+        self.cache_dir = self.path("cache")
+        os.makedirs(os.path.join(self.public_dir, "images"))
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        images.Image.new("RGB", (1000, 500)).save(os.path.join(self.static_dir, "images", "tom.png"))
+
+    def test_encodes_a_variant_per_width(self):
+        manifest = process_images(self.static_dir, self.public_dir, self.cache_dir)
+        variants = manifest["/images/tom.png"]["variants"]
+        self.assertEqual([480, 960, 1000], [width for _, width in variants])
+        for name, width in variants:
+            with images.Image.open(os.path.join(self.public_dir, "images", name)) as variant:
+                self.assertEqual((width, width // 2), variant.size)
+
+    def test_single_image_is_encoded_without_a_pool(self):
+        original_executor = images.ProcessPoolExecutor
+        images.ProcessPoolExecutor = None
+        try:
+            manifest = process_images(self.static_dir, self.public_dir, self.cache_dir)
+        finally:
+            images.ProcessPoolExecutor = original_executor
+        self.assertEqual(3, len(manifest["/images/tom.png"]["variants"]))
+
+
+class TestImageProps(unittest.TestCase):
+    def test_srcset(self):
+        entry = {"hash": "abc", "width": 1000, "height": 500,
+                 "variants": [["tom-480w.abc.webp", 480], ["tom-1000w.abc.webp", 1000]]}
+        props = image_entry_to_props("/images/tom.png", entry)
+        self.assertEqual("/images/tom-480w.abc.webp 480w, /images/tom-1000w.abc.webp 1000w", props["srcset"])
+
+    def test_no_srcset_without_variants(self):
+        entry = {"hash": "abc", "width": 10, "height": 5, "variants": []}
+        props = image_entry_to_props("/images/tom.png", entry)
+        self.assertEqual({"width": "10", "height": "5", "loading": "lazy"}, props)
+
+    def test_srcset_with_basepath(self):
+        html = '<img srcset="/images/a-480w.webp 480w, /images/a-960w.webp 960w">'
+        result = SRCSET_PATTERN.sub(lambda match: srcset_with_basepath(match, "/base/"), html)
+        self.assertEqual('<img srcset="/base/images/a-480w.webp 480w, /base/images/a-960w.webp 960w">', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+
+from inline_parser import parse_inline
+from node_splitter import text_to_textnodes
+from test_fuzz import best_time
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+class TestParseInline(unittest.TestCase):
+    def test_matches_flat_splitter(self):
+        text = ("This is **text** with an _italic_ word and a `code block` and an "
+                "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)")
+        self.assertEqual(text_to_textnodes(text), parse_inline(text))
+
+    def test_empty_text(self):
+        self.assertEqual([], parse_inline(""))
+
+    def test_nested_emphasis(self):
+        expected = [TextNode("bold and italic", TextType.BOLD, None, [
+            TextNode("bold ", TextType.TEXT),
+            TextNode("and italic", TextType.ITALIC),
+        ])]
+        self.assertEqual(expected, parse_inline("**bold _and italic_**"))
+
+    def test_strong_inside_emphasis(self):
+        expected = [TextNode("a b c", TextType.ITALIC, None, [
+            TextNode("a ", TextType.TEXT),
+            TextNode("b", TextType.BOLD),
+            TextNode(" c", TextType.TEXT),
+        ])]
+        self.assertEqual(expected, parse_inline("*a **b** c*"))
+
+    def test_triple_delimiter(self):
+        expected = [TextNode("both", TextType.ITALIC, None, [TextNode("both", TextType.BOLD)])]
+        self.assertEqual(expected, parse_inline("***both***"))
+
+    def test_intra_word_underscores(self):
+        self.assertEqual([TextNode("call snake_case_name here", TextType.TEXT)],
+                         parse_inline("call snake_case_name here"))
+
+    def test_intra_word_asterisks(self):
+        expected = [TextNode("un", TextType.TEXT), TextNode("frigging", TextType.ITALIC),
+                    TextNode("believable", TextType.TEXT)]
+        self.assertEqual(expected, parse_inline("un*frigging*believable"))
+
+    def test_unmatched_delimiters_are_text(self):
+        self.assertEqual([TextNode("**not closed and a ` tick", TextType.TEXT)],
+                         parse_inline("**not closed and a ` tick"))
+        self.assertEqual([TextNode("a ** b", TextType.TEXT)], parse_inline("a ** b"))
+
+    def test_escapes(self):
+        self.assertEqual([TextNode("*not italic* and [not](a link)", TextType.TEXT)],
+                         parse_inline("\\*not italic\\* and \\[not](a link)"))
+        self.assertEqual([TextNode("C:\\Users", TextType.TEXT)], parse_inline("C:\\Users"))
+
+    def test_code_span_is_literal(self):
+        expected = [TextNode("use ", TextType.TEXT), TextNode("**kwargs and ` tick", TextType.CODE)]
+        self.assertEqual(expected, parse_inline("use ``**kwargs and ` tick``"))
+
+    def test_link_with_nested_markup(self):
+        expected = [TextNode("the bold docs", TextType.LINK, "/docs", [
+            TextNode("the ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode(" docs", TextType.TEXT),
+        ])]
+        self.assertEqual(expected, parse_inline("[the **bold** docs](/docs)"))
+
+    def test_emphasis_around_link(self):
+        expected = [TextNode("see docs", TextType.BOLD, None, [
+            TextNode("see ", TextType.TEXT),
+            TextNode("docs", TextType.LINK, "/docs"),
+        ])]
+        self.assertEqual(expected, parse_inline("**see [docs](/docs)**"))
+
+    def test_emphasis_does_not_cross_link_boundary(self):
+        expected = [TextNode("*a ", TextType.TEXT), TextNode("b* c", TextType.LINK, "/u")]
+        self.assertEqual(expected, parse_inline("*a [b* c](/u)"))
+
+    def test_no_links_inside_links(self):
+        expected = [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.LINK, "/u"),
+                    TextNode(" c](/v)", TextType.TEXT)]
+        self.assertEqual(expected, parse_inline("[a [b](/u) c](/v)"))
+
+    def test_sibling_links(self):
+        expected = [TextNode("a", TextType.LINK, "/u"), TextNode(" and ", TextType.TEXT),
+                    TextNode("b", TextType.LINK, "/v")]
+        self.assertEqual(expected, parse_inline("[a](/u) and [b](/v)"))
+        expected = [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.LINK, "/u"),
+                    TextNode(" ] ", TextType.TEXT), TextNode("c", TextType.LINK, "/v")]
+        self.assertEqual(expected, parse_inline("[a [b](/u) ] [c](/v)"))
+
+    def test_image_alt_is_raw_text(self):
+        self.assertEqual([TextNode("a *b*", TextType.IMAGE, "/i.png")], parse_inline("![a *b*](/i.png)"))
+
+    def test_footnote_reference(self):
+        expected = [TextNode("Claim", TextType.TEXT), TextNode("note", TextType.FOOTNOTE, "note")]
+        self.assertEqual(expected, parse_inline("Claim[^note]"))
+
+    def test_unmatched_brackets(self):
+        self.assertEqual([TextNode("a] [b (c)", TextType.TEXT)], parse_inline("a] [b (c)"))
+
+    def test_html(self):
+        node = parse_inline("**bold _and italic_** [**x**](/u)")
+        html = "".join(text_node_to_html_node(text_node).to_html() for text_node in node)
+        self.assertEqual('<b>bold <i>and italic</i></b> <a href="/u"><b>x</b></a>', html)
+
+
+class TestParseInlinePathological(unittest.TestCase):
+    def assert_linear(self, unit: str):
+        # quadratic behaviour would take ~16x longer for 4x the input
+        small_time = best_time(parse_inline, unit * 2000)
+        large_time = best_time(parse_inline, unit * 8000)
+        # the floor keeps timer noise on tiny inputs from failing the test
+        self.assertLess(large_time, max(small_time, 0.01) * 10)
+
+    def test_unmatched_asterisks(self):
+        self.assertEqual([TextNode("*" * 10000, TextType.TEXT)], parse_inline("*" * 10000))
+        self.assert_linear("*")
+
+    def test_alternating_delimiters(self):
+        self.assert_linear("*a")
+        self.assert_linear("_a ")
+        self.assert_linear("**a _b ")
+
+    def test_unmatched_backticks(self):
+        self.assert_linear("` ``")
+
+    def test_unmatched_brackets(self):
+        self.assert_linear("[")
+        self.assert_linear("[a](")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+import main
+from testutil import TempDirTestCase
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_build_is_the_default_command(self):
+        args = main.parse_args([])
+        self.assertEqual("build", args.command)
+        self.assertEqual("/", args.basepath)
+        self.assertIs(main.build_command, args.handler)
+
+    def test_build_options_without_command(self):
+        args = main.parse_args(["/blog/", "--minify", "-q", "-j", "3"])
+        self.assertEqual("build", args.command)
+        self.assertEqual("/blog/", args.basepath)
+        self.assertTrue(args.minify)
+        self.assertTrue(args.quiet)
+        self.assertEqual(3, args.jobs)
+        self.assertEqual([], args.plugins)
+        self.assertEqual(["a", "b.py"], main.parse_args(["--plugin", "a", "--plugin", "b.py"]).plugins)
+
+    def test_subcommands(self):
+        self.assertIs(main.clean_command, main.parse_args(["clean", "--cache"]).handler)
+        self.assertTrue(main.parse_args(["clean", "--cache"]).cache)
+        self.assertEqual(9000, main.parse_args(["serve", "--port", "9000"]).port)
+        self.assertIs(main.list_pages_command, main.parse_args(["list-pages"]).handler)
+        args = main.parse_args(["deploy-plan", "--target", "out", "--execute"])
+        self.assertIs(main.deploy_plan_command, args.handler)
+        self.assertEqual(("out", True, None), (args.target, args.execute, args.previous))
+
+
+class TestCommands(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_list_pages(self):
+        os.makedirs("content/blog/tom")
+        with open("content/index.md", "w") as file:
+            file.write("# Home")
+        with open("content/blog/tom/index.md", "w") as file:
+            file.write("---\nauthor: Frodo\n---\n# Tom Bombadil")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(0, main.list_pages_command(main.parse_args(["list-pages"])))
+        self.assertEqual([
+            "/\tcontent/index.md\tHome",
+            "/blog/tom/\tcontent/blog/tom/index.md\tTom Bombadil",
+        ], output.getvalue().splitlines())
+        self.assertFalse(os.path.exists("docs"))
+
+    def test_build_with_a_missing_plugin_fails(self):
+        stream = io.StringIO()
+        args = main.parse_args(["--plugin", "missing_plugin.py"])
+        self.assertEqual(1, main.run_build(main.create_builder(args), args, stream))
+        self.assertIn("missing_plugin.py", stream.getvalue())
+        self.assertFalse(os.path.exists("docs"))
+
+    def test_clean(self):
+        os.makedirs("docs/blog")
+        os.makedirs(".cache/images")
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.clean_command(main.parse_args(["clean"]))
+            self.assertFalse(os.path.exists("docs"))
+            self.assertTrue(os.path.exists(".cache"))
+            main.clean_command(main.parse_args(["clean", "--cache"]))
+        self.assertFalse(os.path.exists(".cache"))
+
+
+class TestStartup(unittest.TestCase):
+    def test_trivial_commands_import_no_build_modules(self):
+        code = ("import sys, main; main.parse_args(['build', '-q']); "
+                "print(','.join(sorted({'gencontent', 'builder', 'markdown_blocks'} & sys.modules.keys())))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+        self.assertEqual("", result.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -125,6 +125,36 @@ class TestBlockToBlockType(unittest.TestCase):
 
         self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(ordered_list))
 
+    def test_nested_list(self):
+        nested_list = "- one\n  - one.one\n    1. deep\n- two"
+
+        self.assertEqual(BlockType.UNORDERED_LIST, block_to_block_type(nested_list))
+
+    def test_invalid_nested_list(self):
+        """Test nested list with a non item line returns paragraph"""
+        nested_list = "- one\n  one continued\n- two"
+
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(nested_list))
+
+    def test_table(self):
+        table = "| Name | Race |\n| --- | :---: |\n| Frodo | Hobbit |"
+
+        self.assertEqual(BlockType.TABLE, block_to_block_type(table))
+        self.assertEqual(BlockType.TABLE, block_to_block_type("Name | Race\n--- | ---"))
+
+    def test_invalid_table(self):
+        """Test table with mismatched delimiter row returns paragraph"""
+        table = "| Name | Race |\n| --- |\n| Frodo | Hobbit |"
+
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(table))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("a | b\nnot a - delimiter"))
+
+    def test_footnote(self):
+        footnote = "[^1]: First note\n[^tom]: Second note\n    continued"
+
+        self.assertEqual(BlockType.FOOTNOTE, block_to_block_type(footnote))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("[^1]: note\nnot indented"))
+
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
 
@@ -161,7 +191,7 @@ This is another paragraph with _italic_ text and `code` here
 """
         node = markdown_to_html_node(md)
         html = node.to_html()
-        expected = '<div><h1>Heading with emphasis and <code>code</code></h1><h2>Level 2 with <b>stronger</b> emphasis</h2><h3>Level 3 with <code>inline</code> code</h3><h4>Level 4 with a <a href="/">simple link</a></h4><h5>Level 5 with an image <img src="http://localhost:8000" alt="string"></img></h5><h6>Level 6 with a <i>mix</i> of <b>everything</b> <code>and more</code> <a href="https://example.net">here</a></h6></div>'
+        expected = '<div><h1 id="heading-with-emphasis-and-code">Heading with emphasis and <code>code</code></h1><h2 id="level-2-with-stronger-emphasis">Level 2 with <b>stronger</b> emphasis</h2><h3 id="level-3-with-inline-code">Level 3 with <code>inline</code> code</h3><h4 id="level-4-with-a-simple-link">Level 4 with a <a href="/">simple link</a></h4><h5 id="level-5-with-an-image">Level 5 with an image <img src="http://localhost:8000" alt="string"></img></h5><h6 id="level-6-with-a-mix-of-everything-and-more-here">Level 6 with a <i>mix</i> of <b>everything</b> <code>and more</code> <a href="https://example.net">here</a></h6></div>'
         self.assertEqual(expected, html)
 
     def test_quote_markdown_text(self):
@@ -186,7 +216,7 @@ This is another paragraph with _italic_ text and `code` here
 """
         node = markdown_to_html_node(md)
         html = node.to_html()
-        expected = '<div><blockquote>This is a simple, single-line blockquote.</blockquote><blockquote>This is a blockquote that spans multiple lines. Notice that the <code>></code> symbol only needs to be at the beginning of the first line of the paragraph, but it\'s common practice to include it at the beginning of each line for better readability.</blockquote><blockquote>This is another multi-line blockquote. It demonstrates how you can continue a thought across several lines while still maintaining the quote formatting.</blockquote><blockquote>This is a blockquote with <b>bold</b> text inside.</blockquote><blockquote>This blockquote also contains <i>italicized</i> text.</blockquote><blockquote>Here\'s a blockquote with <code>inline code</code> within it.</blockquote><blockquote>This blockquote has a <a href="https://www.example.com">link</a> embedded.</blockquote></div>'
+        expected = '<div><blockquote>This is a simple, single-line blockquote.</blockquote><blockquote>This is a blockquote that spans multiple lines. Notice that the <code>&gt;</code> symbol only needs to be at the beginning of the first line of the paragraph, but it\'s common practice to include it at the beginning of each line for better readability.</blockquote><blockquote>This is another multi-line blockquote. It demonstrates how you can continue a thought across several lines while still maintaining the quote formatting.</blockquote><blockquote>This is a blockquote with <b>bold</b> text inside.</blockquote><blockquote>This blockquote also contains <i>italicized</i> text.</blockquote><blockquote>Here\'s a blockquote with <code>inline code</code> within it.</blockquote><blockquote>This blockquote has a <a href="https://www.example.com">link</a> embedded.</blockquote></div>'
         self.assertEqual(expected, html)
 
     def test_codeblock(self):
@@ -235,6 +265,67 @@ the **same** even with inline stuff
         expected = '<div><ol><li>First item in the ordered list.</li><li>Second item in the ordered list.</li><li>Third item in the ordered list.</li></ol><ol><li>Item with <b>bold</b> text.</li><li>Item with <i>italicized</i> text.</li><li>Item with <code>inline code</code>.</li><li>Item with a <a href="https://www.example.com">link</a>.</li></ol></div>'
         self.assertEqual(expected, html)
 
+    def test_nested_list_markdown(self):
+        md = """
+- Hobbits
+  - Frodo
+  - Sam
+    1. Gardener
+    2. Hero
+- Elves
+"""
+        html = markdown_to_html_node(md).to_html()
+        expected = ('<div><ul><li>Hobbits<ul><li>Frodo</li><li>Sam<ol><li>Gardener</li><li>Hero</li></ol></li></ul>'
+                    '</li><li>Elves</li></ul></div>')
+        self.assertEqual(expected, html)
+
+    def test_nested_ordered_list_start(self):
+        md = "1. One\n    3. Three\n    4. Four\n2. Two"
+        html = markdown_to_html_node(md).to_html()
+        expected = '<div><ol><li>One<ol start="3"><li>Three</li><li>Four</li></ol></li><li>Two</li></ol></div>'
+        self.assertEqual(expected, html)
+
+    def test_table_markdown(self):
+        md = """
+| Character | Race | Age |
+|:----------|:----:|----:|
+| **Gandalf** | Maia | 2000+ |
+| Pipe \\| name | Hobbit |
+"""
+        html = markdown_to_html_node(md).to_html()
+        expected = ('<div><table><thead><tr><th style="text-align: left">Character</th>'
+                    '<th style="text-align: center">Race</th><th style="text-align: right">Age</th></tr></thead>'
+                    '<tbody><tr><td style="text-align: left"><b>Gandalf</b></td><td style="text-align: center">Maia'
+                    '</td><td style="text-align: right">2000+</td></tr><tr><td style="text-align: left">Pipe | name'
+                    '</td><td style="text-align: center">Hobbit</td><td style="text-align: right"></td></tr></tbody>'
+                    '</table></div>')
+        self.assertEqual(expected, html)
+
+    def test_footnotes_markdown(self):
+        md = """
+Tom is old[^age] and merry[^merry].
+
+[^merry]: He sings a lot.
+[^age]: Eldest, that's what I am.
+"""
+        html = markdown_to_html_node(md).to_html()
+        expected = ('<div><p>Tom is old<sup class="footnote-ref"><a href="#fn-age" id="fnref-age">1</a></sup> and merry'
+                    '<sup class="footnote-ref"><a href="#fn-merry" id="fnref-merry">2</a></sup>.</p>'
+                    '<section class="footnotes"><ol><li id="fn-age">Eldest, that\'s what I am. '
+                    '<a href="#fnref-age" class="footnote-back">\u21a9</a></li><li id="fn-merry">He sings a lot. '
+                    '<a href="#fnref-merry" class="footnote-back">\u21a9</a></li></ol></section></div>')
+        self.assertEqual(expected, html)
+
+    def test_repeated_and_undefined_footnote_references(self):
+        html = markdown_to_html_node("a[^1] b[^1] c[^x] **d[^1]**\n\n[^1]: note").to_html()
+        expected = ('<div><p>a<sup class="footnote-ref"><a href="#fn-1" id="fnref-1">1</a></sup>'
+                    ' b<sup class="footnote-ref"><a href="#fn-1" id="fnref-1-2">1</a></sup> c[^x] '
+                    '<b>d<sup class="footnote-ref"><a href="#fn-1" id="fnref-1-3">1</a></sup></b></p>'
+                    '<section class="footnotes"><ol><li id="fn-1">note '
+                    '<a href="#fnref-1" class="footnote-back">\u21a9</a></li></ol></section></div>')
+        self.assertEqual(expected, html)
+        self.assertEqual("<div><p>Only [^x] here</p></div>", markdown_to_html_node("Only [^x] here").to_html())
+
 
 if __name__ == '__main__':
     unittest.main()
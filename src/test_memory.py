@@ -0,0 +1,60 @@
+import unittest
+
+from memory import MB, MemoryBudget, current_rss, parse_size, peak_rss, reset_peak_rss
+
+
+class TestParseSize(unittest.TestCase):
+    def test_sizes(self):
+        self.assertEqual(1024 * MB, parse_size("1G"))
+        self.assertEqual(800 * MB, parse_size("800m"))
+        self.assertEqual(1536 * MB, parse_size("1.5GB"))
+        self.assertEqual(512 * 1024, parse_size("512K"))
+        self.assertEqual(1000, parse_size("1000"))
+
+    def test_invalid_sizes(self):
+        for spec in ("", "G", "lots", "-1G", "0"):
+            with self.assertRaises(ValueError):
+                parse_size(spec)
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_plan_fits_workers_and_pages_in_flight(self):
+        budget = MemoryBudget(1024 * MB)
+        self.assertEqual((8, 16), budget.plan(8, [10_000] * 50, process_rss=60 * MB))
+        self.assertEqual((3, 6), budget.plan(4, [10_000] * 3, process_rss=60 * MB))
+        # 100 MB per worker with its largest page, not streamed; streamed it takes 20 MB
+        in_memory = MemoryBudget(1024 * MB, stream_threshold=1024 * MB)
+        self.assertEqual((9, 18), in_memory.plan(16, [40 * MB // 12] * 50, process_rss=60 * MB))
+        self.assertEqual((12, 12), budget.plan(16, [40 * MB // 12] * 50, process_rss=60 * MB))
+
+    def test_plan_falls_back_to_the_build_process(self):
+        budget = MemoryBudget(1024 * MB)
+        self.assertEqual((1, 1), budget.plan(8, [10_000] * 50, process_rss=600 * MB))
+        self.assertEqual((1, 1), budget.plan(8, [200 * MB], process_rss=60 * MB))
+        self.assertEqual((1, 1), budget.plan(1, [10_000] * 50, process_rss=60 * MB))
+        self.assertEqual((1, 1), budget.plan(8, [], process_rss=60 * MB))
+
+    def test_large_sources_are_streamed(self):
+        budget = MemoryBudget(1024 * MB, stream_threshold=1000)
+        self.assertFalse(budget.streams(999))
+        self.assertTrue(budget.streams(1000))
+        self.assertLess(budget.page_memory(1000), budget.page_memory(999) * 1000 / 999)
+
+    def test_record_keeps_the_largest_page(self):
+        budget = MemoryBudget(1024 * MB)
+        self.assertIsNone(budget.largest_page)
+        for path, peak in (("a.md", 20 * MB), ("b.md", 30 * MB), ("c.md", 25 * MB)):
+            budget.record(path, peak)
+        self.assertEqual((30 * MB, "b.md"), budget.largest_page)
+
+    def test_measurements(self):
+        reset_peak_rss()
+        rss = current_rss()
+        peak = peak_rss()
+        if rss is not None and peak is not None:
+            self.assertGreater(rss, 0)
+            self.assertGreaterEqual(peak, rss // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
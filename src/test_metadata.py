@@ -0,0 +1,81 @@
+import os
+import unittest
+
+from gencontent import extract_title, render_page
+from metadata import MetadataCache, PageMetadata, read_page_metadata, scan_metadata, split_front_matter
+from sitescan import scan_dir
+from testutil import TempDirTestCase
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_front_matter(self):
+        markdown = "---\ntitle: \"Tom: Bombadil\"\ndate: 2024-01-01\n# comment\n\n---\n# Tom\n\nText"
+        self.assertEqual(({"title": "Tom: Bombadil", "date": "2024-01-01"}, "# Tom\n\nText"),
+                         split_front_matter(markdown))
+
+    def test_crlf(self):
+        self.assertEqual(({"author": "Frodo"}, "# Tom\r\n"),
+                         split_front_matter("---\r\nauthor: Frodo\r\n---\r\n# Tom\r\n"))
+
+    def test_pages_without_front_matter_are_whole(self):
+        for markdown in ("# Tom\n\n---\n", "---\nauthor: Frodo\n# Tom", "", "text\n---\na: b\n---"):
+            self.assertEqual(({}, markdown), split_front_matter(markdown))
+
+
+class TestReadPageMetadata(TempDirTestCase):
+    def test_metadata(self):
+        path = self.write("a.md", "---\nauthor: 'Frodo'\n---\nIntro\n\n# Tom Bombadil\n\n# Second")
+        self.assertEqual(PageMetadata("Tom Bombadil", {"author": "Frodo"}), read_page_metadata(path))
+
+    def test_unclosed_front_matter_is_content(self):
+        path = self.write("a.md", "---\nauthor: Frodo\n# Tom")
+        self.assertEqual(PageMetadata("Tom", {}), read_page_metadata(path))
+        self.assertEqual(PageMetadata(None, {}), read_page_metadata(self.write("b.md", "no title")))
+
+    def test_scan_matches_extract_title(self):
+        pages = {
+            "index.md": "# Home\n\nText",
+            "blog/tom/index.md": "---\nauthor: Frodo\n---\n\n  # Tom Bombadil  \n",
+            "blog/glorfindel/index.md": "Text\n\n```\n# not a title\n```\n\n# Glorfindel",
+        }
+        for name, text in pages.items():
+            self.write(name, text)
+        files = scan_dir(self.root)
+        scanned = scan_metadata(files)
+        self.assertEqual([file.path for file in files], list(scanned))
+        for file in files:
+            with open(file.path, "r", encoding="utf-8") as handle:
+                _, markdown = split_front_matter(handle.read())
+            self.assertEqual(extract_title(markdown), scanned[file.path].title)
+
+    def test_cache(self):
+        path = self.write("pages/a.md", "# Tom")
+        self.write("pages/b.md", "# Goldberry")
+        pages_dir = os.path.dirname(path)
+        cache_path = self.path(os.path.join("cache", "metadata.json"))
+        cache = MetadataCache(cache_path)
+        scan_metadata(scan_dir(pages_dir), cache)
+        cache.save()
+
+        cache = MetadataCache(cache_path)
+        self.assertEqual(PageMetadata("Tom", {}), scan_metadata(scan_dir(pages_dir), cache)[path])
+        self.assertFalse(cache.changed)
+
+        self.write("pages/a.md", "# Tom Bombadil")
+        os.remove(os.path.join(pages_dir, "b.md"))
+        pages = scan_metadata(scan_dir(pages_dir), cache)
+        self.assertEqual({path: PageMetadata("Tom Bombadil", {})}, pages)
+        self.assertEqual([path], list(cache.entries))
+        self.assertTrue(cache.changed)
+
+
+class TestRenderPage(unittest.TestCase):
+    def test_front_matter_is_not_rendered(self):
+        title, html, _ = render_page("/", "a.md", "---\nauthor: Frodo\n---\n# Tom\n\nText",
+                                     "{{ Title }}|{{ Content }}")
+        self.assertEqual("Tom", title)
+        self.assertNotIn("Frodo", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
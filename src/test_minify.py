@@ -0,0 +1,60 @@
+import unittest
+
+from minify import minify_css, minify_html
+
+
+class TestMinifyHTML(unittest.TestCase):
+    def test_removes_template_indentation(self):
+        html = "<html>\n  <head>\n    <title>Tolkien</title>\n  </head>\n</html>\n"
+        self.assertEqual("<html><head><title>Tolkien</title></head></html>", minify_html(html))
+
+    def test_collapses_inline_whitespace_to_single_space(self):
+        html = "<p>Here's   the deal,  <b>I like</b> <i>Tolkien</i></p>"
+        self.assertEqual("<p>Here's the deal, <b>I like</b> <i>Tolkien</i></p>", minify_html(html))
+
+    def test_keeps_whitespace_between_inline_tags(self):
+        self.assertEqual("<p><b>a</b> <i>b</i></p>", minify_html("<p><b>a</b>\n<i>b</i></p>"))
+        self.assertEqual("<nav> <a href=\"/\">Home</a> <a href=\"/blog\">Blog</a> </nav>",
+                         minify_html("<nav>\n  <a href=\"/\">Home</a>\n  <a href=\"/blog\">Blog</a>\n</nav>"))
+        self.assertEqual("<p>a <code>x</code> <b>c</b></p>", minify_html("<p>a\n<code>x</code>\n<b>c</b></p>"))
+
+    def test_preserves_pre_and_code(self):
+        html = "<div>\n  <pre><code>func main(){\n    fmt.Println(1)\n}\n</code></pre>\n  <p>a  <code>x  y</code></p>\n</div>"
+        expected = "<div><pre><code>func main(){\n    fmt.Println(1)\n}\n</code></pre><p>a <code>x  y</code></p></div>"
+        self.assertEqual(expected, minify_html(html))
+
+    def test_removes_comments(self):
+        self.assertEqual("<p>a</p>", minify_html("<!-- note --><p>a</p>"))
+
+    def test_keeps_whitespace_in_attribute_values(self):
+        html = '<div\n  class="x">\n  <img alt="Tom   Bombadil\n  sings" src="/tom.png">\n  <p title=\'a  > b\' data-x="  1  2 ">a  b</p>\n</div>'
+        expected = '<div class="x"> <img alt="Tom   Bombadil\n  sings" src="/tom.png"> <p title=\'a  > b\' data-x="  1  2 ">a b</p></div>'
+        self.assertEqual(expected, minify_html(html))
+
+
+class TestMinifyCSS(unittest.TestCase):
+    def test_minify_rules(self):
+        css = """/* theme */
+body {
+  background-color: #1f1c25;
+  font-family: "Luminari", "Georgia", serif;
+}
+
+h1,
+h2 > a {
+  color: #dda15e;
+}
+"""
+        expected = 'body{background-color:#1f1c25;font-family:"Luminari","Georgia",serif}h1,h2>a{color:#dda15e}'
+        self.assertEqual(expected, minify_css(css))
+
+    def test_keeps_strings_intact(self):
+        css = 'a::after { content: "  /* not a comment */  "; }'
+        self.assertEqual('a::after{content:"  /* not a comment */  "}', minify_css(css))
+
+    def test_keeps_space_before_pseudo_class(self):
+        self.assertEqual("nav :hover{color:red}", minify_css("nav :hover { color: red; }"))
+
+
+if __name__ == '__main__':
+    unittest.main()
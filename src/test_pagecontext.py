@@ -0,0 +1,57 @@
+import unittest
+
+from markdown_blocks import markdown_to_html_node
+from pagecontext import PageContext, slugify
+from textnode import TextNode, TextType
+
+
+class TestSlugify(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual("why-tom-bombadil-was-a-mistake", slugify("Why Tom Bombadil Was a Mistake"))
+        self.assertEqual("the-lord-of-the-rings", slugify('The "Lord of the Rings"'))
+        self.assertEqual("part-2-the-return", slugify("Part 2 - The Return!"))
+        self.assertEqual("section", slugify("?!"))
+
+
+class TestHeadingAnchors(unittest.TestCase):
+    def test_repeated_headings_get_unique_slugs(self):
+        context = PageContext()
+        slugs = [context.add_heading(2, [TextNode(text, TextType.TEXT)])
+                 for text in ("Usage", "Usage", "Usage 1", "Usage")]
+        self.assertEqual(["usage", "usage-1", "usage-1-1", "usage-2"], slugs)
+
+    def test_heading_ids_in_html(self):
+        html = markdown_to_html_node("# Intro\n\n## Setup\n\n## Setup").to_html()
+        self.assertEqual('<div><h1 id="intro">Intro</h1><h2 id="setup">Setup</h2><h2 id="setup-1">Setup</h2></div>',
+                         html)
+
+
+class TestTableOfContents(unittest.TestCase):
+    def test_nested_toc(self):
+        context = PageContext()
+        markdown_to_html_node("# Title\n\n## First\n\n### Detail\n\n## Second", context)
+        expected = ('<nav class="toc"><ul><li><a href="#title">Title</a><ul>'
+                    '<li><a href="#first">First</a><ul><li><a href="#detail">Detail</a></li></ul></li>'
+                    '<li><a href="#second">Second</a></li></ul></li></ul></nav>')
+        self.assertEqual(expected, context.toc_to_html_node().to_html())
+
+    def test_level_jump_nests_one_list(self):
+        context = PageContext()
+        markdown_to_html_node("## A\n\n#### B\n\n## C", context)
+        expected = ('<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li></ul></li>'
+                    '<li><a href="#c">C</a></li></ul></nav>')
+        self.assertEqual(expected, context.toc_to_html_node().to_html())
+
+    def test_empty_toc(self):
+        self.assertEqual("", PageContext().toc_to_html_node().to_html())
+
+    def test_many_headings(self):
+        context = PageContext()
+        markdown = "\n\n".join(f"## Chapter {index % 50}\n\n### Part" for index in range(2500))
+        markdown_to_html_node(markdown, context)
+        self.assertEqual(5000, len(context.headings))
+        self.assertEqual("part-2499", context.headings[-1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from schedule import DEFAULT_SECONDS_PER_BYTE, PageScheduler, RenderTimes
+from testutil import TempDirTestCase
+
+
+class TestPageScheduler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.render_times = RenderTimes(self.path("render-times.json"))
+
+    def test_largest_first_without_history(self):
+        scheduler = PageScheduler()
+        order = scheduler.order([("a.md", 10), ("b.md", 1000), ("c.md", 10), ("d.md", 100)])
+        self.assertEqual([1, 3, 0, 2], order)
+        self.assertEqual(1000 * DEFAULT_SECONDS_PER_BYTE, scheduler.estimate("b.md", 1000))
+
+    def test_history_overrides_size(self):
+        # a small page that is slow to render, e.g. lots of highlighted code
+        self.render_times.record("slow.md", 2.0, 100)
+        self.render_times.record("big.md", 0.1, 10000)
+        scheduler = PageScheduler(self.render_times)
+        self.assertEqual([0, 1, 2], scheduler.order([("slow.md", 100), ("big.md", 10000), ("new.md", 50)]))
+        self.assertEqual(4.0, scheduler.estimate("slow.md", 200))
+
+    def test_unknown_pages_use_measured_cost_per_byte(self):
+        self.render_times.record("a.md", 1.0, 1000)
+        scheduler = PageScheduler(self.render_times)
+        self.assertAlmostEqual(0.5, scheduler.estimate("new.md", 500))
+
+    def test_render_times_are_saved(self):
+        self.render_times.record("a.md", 1.5, 10)
+        self.render_times.record("gone.md", 1.0, 10)
+        self.render_times.retain(["a.md", "b.md"])
+        self.render_times.save()
+        loaded = RenderTimes(self.render_times.path)
+        self.assertEqual((1.5, 10), loaded.get("a.md"))
+        self.assertIsNone(loaded.get("gone.md"))
+
+
+if __name__ == "__main__":
+    unittest.main()
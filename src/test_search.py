@@ -0,0 +1,117 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import unicodedata
+import unittest
+from collections import Counter
+
+import buildlog
+import search
+from buildlog import log
+from gencontent import generate_page
+from search import CLIENT_TOKEN_PATTERN, SearchIndex, shard_key, tokenize_text
+from testutil import TempDirTestCase
+
+
+class TestTokenizeText(unittest.TestCase):
+    def test_counts_lowercase_terms(self):
+        terms = tokenize_text(["Tom Bombadil", "tom is a mistake"])
+        self.assertEqual(2, terms["tom"])
+        self.assertEqual(1, terms["bombadil"])
+        self.assertNotIn("a", terms)
+
+    def test_shard_key(self):
+        self.assertEqual("t", shard_key("tom"))
+        self.assertEqual("4", shard_key("42"))
+        self.assertEqual("_", shard_key("élan"))
+
+
+class TestClientTokenizer(unittest.TestCase):
+    SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "static", "search.js")
+    TEXT = "Tom's 2nd_hobbit, Éowyn and ΣΊΣΥΦΟΣ ran 42km — x y; ﬁne ½ ٣٤ 漢字"
+
+    def test_search_js_uses_the_shared_pattern(self):
+        with open(self.SCRIPT_PATH, encoding="utf-8") as file:
+            script = file.read()
+        self.assertIn(f"/{CLIENT_TOKEN_PATTERN}/gu", script)
+
+    def test_word_characters_are_letters_digits_and_underscore(self):
+        word = re.compile(r"\w")
+        for code in range(sys.maxunicode + 1):
+            char = chr(code)
+            expected = char == "_" or unicodedata.category(char)[0] in "LN"
+            if expected != bool(word.match(char)):
+                self.fail(f"U+{code:04X} differs")
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_node_splits_queries_like_the_index(self):
+        script = f"console.log(JSON.stringify({json.dumps(self.TEXT)}.toLowerCase().match(/{CLIENT_TOKEN_PATTERN}/gu)))"
+        result = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True)
+        self.assertEqual(tokenize_text([self.TEXT]), Counter(json.loads(result.stdout)))
+
+
+class TestSearchIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        log.configure(buildlog.WARNING)
+        self.public_dir = self.path("docs")
+        self.cache_path = self.path(os.path.join("cache", "search.json"))
+        self.template_path = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        os.makedirs(os.path.join(self.public_dir, "blog"))
+        os.makedirs(self.path("blog"))
+
+    def tearDown(self):
+        log.configure(buildlog.INFO)
+
+    def build(self, pages: dict[str, str]) -> SearchIndex:
+        search_index = SearchIndex(self.public_dir, self.cache_path, "/site/")
+        for name, markdown in pages.items():
+            source_path = self.write(name + ".md", markdown)
+            dest_path = os.path.join(self.public_dir, name + ".html")
+            generate_page("/", source_path, self.template_path, dest_path, search_index=search_index)
+        search_index.write()
+        return search_index
+
+    def read_json(self, name: str):
+        with open(os.path.join(self.public_dir, "search", name), encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_page_url(self):
+        search_index = SearchIndex(self.public_dir, self.cache_path)
+        self.assertEqual("/blog/tom/", search_index.page_url(os.path.join(self.public_dir, "blog/tom/index.html")))
+        self.assertEqual("/about.html", search_index.page_url(os.path.join(self.public_dir, "about.html")))
+
+    def test_writes_docs_and_shards(self):
+        self.build({"index": "# Home\n\nWelcome to **Rivendell**", "blog/tom": "# Tom\n\nTom is _merry_"})
+
+        self.assertEqual([["/site/", "Home"], ["/site/blog/tom.html", "Tom"]], self.read_json("docs.json"))
+        self.assertEqual([1, 2], self.read_json("index-t.json")["tom"])
+        self.assertEqual([0, 1], self.read_json("index-r.json")["rivendell"])
+        self.assertEqual([1, 1], self.read_json("index-m.json")["merry"])
+
+    def test_unchanged_pages_are_not_tokenized_again(self):
+        self.build({"index": "# Home\n\nWelcome", "blog/tom": "# Tom\n\nTom"})
+
+        tokenized = []
+        original_tokenize = search.tokenize_text
+        search.tokenize_text = lambda chunks: tokenized.append(chunks) or original_tokenize(chunks)
+        try:
+            self.build({"index": "# Home\n\nWelcome back", "blog/tom": "# Tom\n\nTom"})
+        finally:
+            search.tokenize_text = original_tokenize
+
+        self.assertEqual(1, len(tokenized))
+        self.assertEqual([0, 1], self.read_json("index-b.json")["back"])
+        self.assertEqual([1, 2], self.read_json("index-t.json")["tom"])
+
+    def test_removed_pages_are_dropped(self):
+        self.build({"index": "# Home\n\nWelcome", "blog/tom": "# Tom\n\nTom"})
+        self.build({"index": "# Home\n\nWelcome"})
+        self.assertEqual([["/site/", "Home"]], self.read_json("docs.json"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import unittest
+
+import buildlog
+from builder import SiteBuilder
+from buildlog import log
+from shard import HASH, SIZE, Shard, ShardMergeError, merge_shards, parse_shard, partition
+from sitescan import SiteFile, scan_dir
+from testutil import TempDirTestCase
+
+
+def site_files(count: int) -> list[SiteFile]:
+    return [SiteFile(f"content/page{i}.md", f"page{i}.md", 0, (i * 37) % 101) for i in range(count)]
+
+
+class TestPartition(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual((2, 4), parse_shard("2/4"))
+        for spec in ("0/4", "5/4", "2", "a/b", "-1/2"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shards_cover_every_file_once(self):
+        files = site_files(50)
+        for strategy in (HASH, SIZE):
+            shards = partition(files, 4, strategy)
+            paths = sorted(file.rel_path for shard in shards for file in shard)
+            self.assertEqual(sorted(file.rel_path for file in files), paths)
+            self.assertTrue(all(shards))
+
+    def test_partition_is_deterministic(self):
+        files = site_files(50)
+        for strategy in (HASH, SIZE):
+            first = [[file.rel_path for file in shard] for shard in partition(files, 3, strategy)]
+            second = [[file.rel_path for file in shard] for shard in partition(list(reversed(files)), 3, strategy)]
+            self.assertEqual(first, second)
+
+    def test_size_strategy_balances_source_size(self):
+        loads = [sum(file.size for file in shard) for shard in partition(site_files(50), 4, SIZE)]
+        self.assertLessEqual(max(loads) - min(loads), 100)
+
+    def test_hash_strategy_keeps_pages_on_their_shard(self):
+        files = site_files(50)
+        before = Shard(1, 3).select(files)
+        after = Shard(1, 3).select(files + site_files(80)[50:])
+        self.assertTrue({file.rel_path for file in before} <= {file.rel_path for file in after})
+
+
+class TestShardedBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        log.configure(buildlog.INFO, stream=io.StringIO())
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body { color: red; }")
+        for i in range(6):
+            self.write(f"content/blog/post{i}/index.md", f"# Post {i}\n\nAbout hobbits number {i}.")
+        self.write("content/index.md", "# Home")
+
+    def tearDown(self):
+        log.configure(buildlog.INFO)
+
+    def build(self, public_dir: str, shard: Shard = None):
+        cache_dir = self.path(os.path.join(".cache", shard.name if shard else "full"))
+        builder = SiteBuilder(self.path("static"), public_dir, self.path("content"), self.path("template.html"),
+                              cache_dir, shard)
+        builder.build("/")
+
+    def read_tree(self, directory: str) -> dict[str, bytes]:
+        tree = {}
+        for file in scan_dir(directory):
+            with open(file.path, "rb") as handle:
+                tree[file.rel_path] = handle.read()
+        return tree
+
+    def test_merged_shards_match_full_build(self):
+        shard_dirs = []
+        for index in range(1, 4):
+            shard = Shard(index, 3, SIZE)
+            shard_dirs.append(self.path(f"shards/{shard.name}"))
+            self.build(shard_dirs[-1], shard)
+        pages = merge_shards(shard_dirs, self.path("merged"), self.path(".cache/merge"))
+        self.build(self.path("full"))
+
+        self.assertEqual(7, len(pages))
+        self.assertEqual(os.path.join(self.root, "content", "index.md"), pages["/"])
+        self.assertEqual(self.read_tree(self.path("full")), self.read_tree(self.path("merged")))
+
+    def test_missing_shard_fails(self):
+        shard = Shard(1, 2)
+        self.build(self.path("shards/1-of-2"), shard)
+        with self.assertRaises(ShardMergeError):
+            merge_shards([self.path("shards/1-of-2")], self.path("merged"), self.path(".cache/merge"))
+
+    def test_conflicting_files_fail(self):
+        shard_dirs = [self.path("shards/1-of-2"), self.path("shards/2-of-2")]
+        self.build(shard_dirs[0], Shard(1, 2))
+        self.write("static/index.css", "body { color: blue; }")
+        self.build(shard_dirs[1], Shard(2, 2))
+        with self.assertRaises(ShardMergeError):
+            merge_shards(shard_dirs, self.path("merged"), self.path(".cache/merge"))
+
+
+if __name__ == "__main__":
+    unittest.main()
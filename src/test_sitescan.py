@@ -0,0 +1,46 @@
+import os
+import unittest
+
+from sitescan import find_pages, page_url, scan_dir, scan_site
+from testutil import TempDirTestCase
+
+
+class TestSiteScan(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content_dir = self.path("content")
+        self.static_dir = self.path("static")
+        self.public_dir = self.path("docs")
+        for name in ("content/index.md", "content/blog/tom/index.md", "content/blog/majesty/index.md",
+                     "static/index.css", "static/images/tom.png"):
+            self.write(name, "# Page")
+
+    def test_scan_dir_is_sorted_and_carries_stat(self):
+        files = scan_dir(self.content_dir)
+        self.assertEqual([
+            os.path.join("blog", "majesty", "index.md"),
+            os.path.join("blog", "tom", "index.md"),
+            "index.md",
+        ], [file.rel_path for file in files])
+        stat = os.stat(os.path.join(self.content_dir, "index.md"))
+        self.assertEqual(os.path.join(self.content_dir, "index.md"), files[-1].path)
+        self.assertEqual((stat.st_mtime_ns, stat.st_size), files[-1].state)
+
+    def test_scan_site(self):
+        scan = scan_site(self.content_dir, self.static_dir)
+        self.assertEqual(3, len(scan.pages))
+        self.assertEqual([os.path.join("images", "tom.png"), "index.css"], [file.rel_path for file in scan.static])
+
+    def test_find_pages(self):
+        pages = find_pages(self.content_dir, self.public_dir, create_dirs=False)
+        self.assertFalse(os.path.exists(self.public_dir))
+        self.assertEqual(["/blog/majesty/", "/blog/tom/", "/"],
+                         [page_url(dest_path, self.public_dir) for _, dest_path in pages])
+
+        pages = find_pages(self.content_dir, self.public_dir)
+        for _, dest_path in pages:
+            self.assertTrue(os.path.isdir(os.path.dirname(dest_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
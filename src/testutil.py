@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A test case with a temporary directory, self.root, removed after every test.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = self.temp_dir.name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def write(self, name: str, text: str | bytes) -> str:
+        """
+        Writes text, or bytes, to the file name under self.root, creating its directories.
+
+        Returns:
+            str: Path of the file
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(text, bytes):
+            with open(path, "wb") as file:
+                file.write(text)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(text)
+        # make the change visible even on file systems with coarse timestamps
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+        return path
@@ -1,6 +1,8 @@
 from enum import Enum
 
-from htmlnode import LeafNode
+from extensions import InlineRule
+from htmlnode import LeafNode, ParentNode
+from images import image_props
 
 
 class TextType(Enum):
@@ -10,26 +12,51 @@ class TextType(Enum):
     CODE = "code"
     LINK = "link"
     IMAGE = "image"
+    FOOTNOTE = "footnote"
 
 
 class TextNode:
-    def __init__(self, text: str, text_type: TextType, url: str = None):
+    """
+    Inline markdown node. BOLD, ITALIC and LINK nodes produced by the inline
+    parser carry `children` when their content has nested markup; `text` is
+    then the plain text of the children. Nodes of an extensions.InlineRule
+    have the rule as text_type.
+    """
+
+    def __init__(self, text: str, text_type: TextType, url: str = None, children: list["TextNode"] = None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        self.children = children
 
     def __eq__(self, other):
         return (
             self.text == other.text
             and self.text_type == other.text_type
             and self.url == other.url
+            and self.children == other.children
         )
 
     def __repr__(self):
+        if self.children:
+            return f"TextNode({self.text}, {self.text_type.value}, {self.url}, {self.children})"
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
 def text_node_to_html_node(text_node: TextNode):
+    if text_node.children:
+        children = [text_node_to_html_node(child) for child in text_node.children]
+        match text_node.text_type:
+            case TextType.BOLD:
+                return ParentNode("b", children)
+            case TextType.ITALIC:
+                return ParentNode("i", children)
+            case TextType.LINK:
+                return ParentNode("a", children, {"href": text_node.url})
+            case InlineRule():
+                return text_node.text_type.render(text_node)
+            case _:
+                raise Exception(f"text type {text_node.text_type} can't have children")
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -42,6 +69,25 @@ def text_node_to_html_node(text_node: TextNode):
         case TextType.LINK:
             return LeafNode("a", text_node.text, {"href": text_node.url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            props = {"src": text_node.url, "alt": text_node.text}
+            props.update(image_props(text_node.url))
+            return LeafNode("img", "", props)
+        case TextType.FOOTNOTE:
+            label, reference_id = footnote_anchors(text_node)
+            link = LeafNode("a", text_node.text, {"href": f"#fn-{label}", "id": f"fnref-{reference_id}"})
+            return ParentNode("sup", [link], {"class": "footnote-ref"})
+        case InlineRule():
+            return text_node.text_type.render(text_node)
         case _:
-            raise Exception(f"invalid text type: {text_node.text_type}")
\ No newline at end of file
+            raise Exception(f"invalid text type: {text_node.text_type}")
+
+
+def footnote_anchors(text_node: TextNode) -> tuple[str, str]:
+    """
+    Returns the label and the reference id of a footnote reference, whose
+    text is the displayed marker and url the label; the n-th reference of a
+    label, n > 1, has "label n" as url (labels have no spaces) and the id
+    "label-n", so that the ids of the references are unique.
+    """
+    label, _, count = text_node.url.partition(" ")
+    return label, f"{label}-{count}" if count else label
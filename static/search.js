@@ -0,0 +1,73 @@
+// Client side query for the index generated by src/search.py.
+// Usage: siteSearch("tom bombadil").then(results => ...), results are [{url, title, score}]
+// On a page with #search-input and #search-results, the results of what is typed are listed as links.
+(function () {
+  const base = new URL("search/", document.currentScript.src);
+  const shards = {};
+  let docs = null;
+
+  function loadJson(name) {
+    return fetch(new URL(name, base)).then((response) => response.json());
+  }
+
+  function shardKey(term) {
+    return /^[a-z0-9]$/.test(term[0]) ? term[0] : "_";
+  }
+
+  function loadShard(key) {
+    if (!(key in shards)) {
+      shards[key] = loadJson(`index-${key}.json`).catch(() => ({}));
+    }
+    return shards[key];
+  }
+
+  // the terms of src/search.py: lowercase runs of two or more letters, digits or underscores
+  function tokenize(text) {
+    return text.toLowerCase().match(/[\p{L}\p{N}_]{2,}/gu) || [];
+  }
+
+  async function siteSearch(query) {
+    const terms = tokenize(query);
+    docs = docs || (await loadJson("docs.json"));
+    const scores = new Map();
+    for (const term of terms) {
+      const postings = (await loadShard(shardKey(term)))[term] || [];
+      const idf = Math.log(1 + docs.length / (postings.length / 2));
+      for (let i = 0; i < postings.length; i += 2) {
+        scores.set(postings[i], (scores.get(postings[i]) || 0) + postings[i + 1] * idf);
+      }
+    }
+    return [...scores.entries()]
+      .sort((a, b) => b[1] - a[1])
+      .map(([id, score]) => ({ url: docs[id][0], title: docs[id][1], score }));
+  }
+
+  function bindSearchBox() {
+    const input = document.getElementById("search-input");
+    const list = document.getElementById("search-results");
+    if (!input || !list) {
+      return;
+    }
+    let latest = 0;
+    input.addEventListener("input", async () => {
+      const query = ++latest;
+      const results = tokenize(input.value).length ? await siteSearch(input.value) : [];
+      if (query !== latest) {
+        return;
+      }
+      list.replaceChildren(
+        ...results.slice(0, 10).map(({ url, title }) => {
+          const link = document.createElement("a");
+          link.href = url;
+          link.textContent = title;
+          const item = document.createElement("li");
+          item.append(link);
+          return item;
+        })
+      );
+    });
+  }
+
+  window.siteSearch = siteSearch;
+  bindSearchBox();
+})();